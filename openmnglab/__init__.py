@@ -0,0 +1,12 @@
+from typing import Optional, Iterable
+
+
+def warmup(names: Optional[Iterable[str]] = None, parallel: bool = True, max_workers: Optional[int] = None) \
+        -> dict[str, float]:
+    """Precompiles the numba kernels of openMNGlab into the on-disk cache, so the first call of a kernel in this and
+    any following process does not have to compile it. Call this once before fanning out to a pool of workers.
+
+    See :func:`openmnglab.util.kernels.warmup`.
+    """
+    from openmnglab.util.kernels import warmup as warmup_kernels
+    return warmup_kernels(names=names, parallel=parallel, max_workers=max_workers)
@@ -0,0 +1,116 @@
+"""Converts DAPSYS files and Spike2 MATLAB exports into native recording stores (see
+:mod:`openmnglab.datamodel.pandas.store`), which can be loaded with
+:class:`~openmnglab.functions.input.readers.native_store_reader.NativeStoreReader`.
+
+Usage::
+
+    openmnglab-convert recordings/ -o stores/ --jobs 8
+
+Directories are searched for DAPSYS (``.dps``) and Spike2 (``.mat``) files, the store of each file keeps its path
+relative to the searched directory. The files are converted in parallel by a pool of processes.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from openmnglab.datamodel.pandas.chunks import CODECS
+from openmnglab.datamodel.pandas.store import DEFAULT_CHUNK_SIZE, MANIFEST, write_store
+
+FORMATS = {".dps": "dapsys", ".mat": "spike2"}
+"""Format of the files by their suffix"""
+
+
+def _reader(path: Path, file_format: str, quantized: bool):
+    if file_format == "dapsys":
+        from openmnglab.functions.input.readers.dapsys_reader import DapsysReader
+        return DapsysReader(path, quantized=quantized)
+    if file_format == "spike2":
+        from openmnglab.functions.input.readers.spike2_reader import Spike2Reader
+        return Spike2Reader(path, quantized=quantized)
+    raise ValueError(f"Unknown format '{file_format}'")
+
+
+def convert_file(path: str | Path, output: str | Path, file_format: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, quantized: bool = False,
+                 compression: Optional[str] = None) -> Path:
+    """Converts all outputs of a DAPSYS file or Spike2 export into a store.
+
+    :param path: path of the file
+    :param output: directory of the store
+    :param file_format: "dapsys" or "spike2", inferred from the suffix of the file if not given
+    :param chunk_size: number of samples of each chunk of the continuous signals
+    :param quantized: keep the quantized samples of the signals (see the ``quantized`` parameter of the readers)
+    :param compression: codec to compress the chunks of the signals with, they are not compressed by default
+    :return: the directory of the store
+    """
+    path = Path(path)
+    file_format = file_format if file_format is not None else FORMATS.get(path.suffix.lower())
+    if file_format is None:
+        raise ValueError(f"Can't infer the format of {path}")
+    definition = _reader(path, file_format, quantized)
+    func = definition.new_function()
+    func.set_input()
+    return write_store(output, func.execute(), definition.produces, source=str(path), chunk_size=chunk_size,
+                       compression=compression)
+
+
+def find_files(inputs: Iterable[str | Path], output: Path) -> Iterable[tuple[Path, Path]]:
+    """Finds the files to convert and the directories of their stores.
+
+    :param inputs: files or directories to search for files with a known suffix (see :data:`FORMATS`)
+    :param output: directory containing the stores
+    :return: pairs of a file and the directory of its store
+    """
+    for given in map(Path, inputs):
+        if given.is_dir():
+            for path in sorted(p for p in given.rglob("*") if p.suffix.lower() in FORMATS and p.is_file()):
+                yield path, output / path.relative_to(given).with_suffix("")
+        else:
+            yield given, output / given.stem
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="openmnglab-convert",
+                                     description="Converts DAPSYS files and Spike2 MATLAB exports into native "
+                                                 "openMNGlab recording stores")
+    parser.add_argument("inputs", nargs="+", type=Path, help="files or directories containing files to convert")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="directory to write the stores to")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), default=None,
+                        help="format of the files, inferred from their suffix by default")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="number of samples of each chunk of the continuous signals")
+    parser.add_argument("--quantized", action="store_true", help="keep the quantized samples of the signals")
+    parser.add_argument("--compression", choices=list(CODECS), default=None,
+                        help="compress the chunks of the signals, combine with --quantized for the best ratio")
+    parser.add_argument("--overwrite", action="store_true", help="convert files whose store already exists")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of files to convert in parallel, defaults to the number of processors")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    log = logging.getLogger("openmnglab-convert")
+    jobs = [(path, store) for path, store in find_files(args.inputs, args.output)
+            if args.overwrite or not (store / MANIFEST).exists()]
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(convert_file, path, store, file_format=args.format, chunk_size=args.chunk_size,
+                               quantized=args.quantized, compression=args.compression): path for path, store in jobs}
+        for future, path in futures.items():
+            try:
+                log.info("%s -> %s", path, future.result())
+            except Exception as e:
+                failed += 1
+                log.error("failed to convert %s: %s", path, e)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Summarizes the DAPSYS files and Spike2 MATLAB exports of directories without loading them.
+
+Usage::
+
+    openmnglab-inventory recordings/ -o inventory.csv --jobs 8
+
+Each file is summarized from its headers only (see the ``scan`` methods of
+:class:`~openmnglab.functions.input.readers.funcs.dapsys_reader.DapsysReaderFunc` and
+:class:`~openmnglab.functions.input.readers.funcs.spike2_reader.Spike2ReaderFunc`), the files are scanned in parallel
+by a pool of processes. The summaries are cached in a file inside of each directory (see :data:`CACHE`) along with the
+size and modification time of their file, so only new or changed files are scanned again.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Sequence
+
+import pandas as pd
+
+from openmnglab.cli.convert import FORMATS, _reader
+
+CACHE = ".openmnglab-inventory.json"
+"""Name of the cache file in a scanned directory"""
+COLUMNS = ("format", "size", "channels", "start", "end", "duration", "samples", "sampling_rate", "pulses", "tracks",
+           "comments", "error")
+"""Columns of the summary of a directory"""
+
+_log = logging.getLogger("openmnglab-inventory")
+
+
+def fingerprint(path: Path) -> list[int]:
+    """Size and modification time of a file, which change whenever it is rewritten"""
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def scan_file(path: str | Path, file_format: Optional[str] = None) -> dict:
+    """Summarizes a DAPSYS file or Spike2 export from its headers.
+
+    :param path: path of the file
+    :param file_format: "dapsys" or "spike2", inferred from the suffix of the file if not given
+    :return: the summary, see :data:`COLUMNS`
+    """
+    path = Path(path)
+    file_format = file_format if file_format is not None else FORMATS.get(path.suffix.lower())
+    if file_format is None:
+        raise ValueError(f"Can't infer the format of {path}")
+    summary = _reader(path, file_format, False).new_function().scan()
+    return dict(format=file_format, size=path.stat().st_size, duration=summary["end"] - summary["start"], **summary)
+
+
+def _scan(path: Path) -> dict:
+    try:
+        return scan_file(path)
+    except Exception as e:
+        return dict(format=FORMATS.get(path.suffix.lower()), error=f"{type(e).__name__}: {e}")
+
+
+def _load_cache(cache: Path) -> dict:
+    try:
+        entries = json.loads(cache.read_text())
+    except (OSError, ValueError):
+        return dict()
+    for entry in entries.values():
+        entry["summary"]["channels"] = tuple(entry["summary"]["channels"])
+    return entries
+
+
+def scan_directory(directory: str | Path, jobs: Optional[int] = None, cache: bool | str | Path = True) -> pd.DataFrame:
+    """Summarizes all files with a known suffix (see :data:`~openmnglab.cli.convert.FORMATS`) in a directory and its
+    subdirectories.
+
+    :param directory: the directory
+    :param jobs: number of files to scan in parallel, defaults to the number of processors
+    :param cache: path of the cache file, ``True`` to use :data:`CACHE` inside of the directory or ``False`` to scan
+        all files
+    :return: the summaries of the files as rows, indexed by the path of the files relative to the directory. Files
+        which could not be scanned have an ``error`` instead.
+    """
+    directory = Path(directory)
+    cache_path = (directory / CACHE if cache is True else Path(cache)) if cache is not False else None
+    cached = _load_cache(cache_path) if cache_path is not None else dict()
+    rows, pending = dict(), []
+    for path in sorted(p for p in directory.rglob("*") if p.suffix.lower() in FORMATS and p.is_file()):
+        key, current = path.relative_to(directory).as_posix(), fingerprint(path)
+        entry = cached.get(key)
+        if entry is not None and entry["fingerprint"] == current:
+            rows[key] = entry["summary"]
+        else:
+            pending.append((key, path, current))
+    if pending:
+        jobs = jobs if jobs is not None else os.cpu_count() or 1
+        paths = [path for _, path, _ in pending]
+        if jobs == 1 or len(pending) == 1:
+            summaries = list(map(_scan, paths))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                summaries = list(pool.map(_scan, paths, chunksize=max(1, len(paths) // (4 * jobs))))
+        for (key, _, current), summary in zip(pending, summaries):
+            rows[key] = summary
+            if "error" not in summary:
+                cached[key] = dict(fingerprint=current, summary=summary)
+        if cache_path is not None:
+            try:
+                cache_path.write_text(json.dumps({key: cached[key] for key in rows if key in cached}))
+            except OSError as e:
+                _log.warning("could not write the cache %s: %s", cache_path, e)
+    frame = pd.DataFrame.from_dict({key: rows[key] for key in sorted(rows)}, orient="index", columns=list(COLUMNS))
+    frame.index.name = "file"
+    return frame
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="openmnglab-inventory",
+                                     description="Summarizes the DAPSYS files and Spike2 MATLAB exports of directories "
+                                                 "from their headers")
+    parser.add_argument("directories", nargs="+", type=Path, help="directories containing the files")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="CSV file to write the summaries to, they are printed by default")
+    parser.add_argument("--no-cache", action="store_true", help="scan all files instead of only new or changed ones")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of files to scan in parallel, defaults to the number of processors")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    frames = {str(directory): scan_directory(directory, jobs=args.jobs, cache=not args.no_cache)
+              for directory in args.directories}
+    inventory = pd.concat(frames, names=["directory"])
+    if args.output is not None:
+        inventory.to_csv(args.output)
+    else:
+        print(inventory.to_string())
+    return 1 if inventory["error"].notna().any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pandera as pa
+import quantities as pq
+
+from openmnglab.datamodel.exceptions import DataSchemaConformityError
+from openmnglab.datamodel.pandas.model import PandasContainer, PandasDataSchema
+from openmnglab.model.datamodel.interface import IDataContainer
+from openmnglab.util.arrays import read_only
+
+
+class IndexColumn:
+    """A named index column of an :class:`ArrayContainer`.
+
+    Categorical index columns store integer codes into their categories, like the levels of a pandas multiindex, which
+    allows converting them from and to a multiindex without copying.
+
+    :param name: name of the index column
+    :param values: values of the index column, or the codes into the categories if ``categories`` is given
+    :param categories: categories of a categorical index column (i.e. the level of a multiindex)
+    """
+
+    def __init__(self, name: str, values: np.ndarray, categories: Optional[np.ndarray | pd.Index] = None):
+        if not name:
+            raise KeyError("Index column not named")
+        if categories is not None and not np.issubdtype(values.dtype, np.integer):
+            raise TypeError(f"Codes of the categorical index column '{name}' must be integers, are {values.dtype}")
+        self._name = name
+        self._values = values
+        self._categories = categories
+
+    @classmethod
+    def from_index(cls, index: pd.Index | pd.MultiIndex) -> tuple[IndexColumn, ...]:
+        """Index columns of a pandas index. The levels of a multiindex are categorical index columns."""
+        if isinstance(index, pd.MultiIndex):
+            return tuple(cls(name, codes, categories=level)
+                         for name, codes, level in zip(index.names, index.codes, index.levels))
+        return cls(index.name, index.values),
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def is_categorical(self) -> bool:
+        return self._categories is not None
+
+    @property
+    def codes(self) -> np.ndarray:
+        """The codes of a categorical index column"""
+        assert self.is_categorical, f"Index column '{self._name}' is not categorical"
+        return self._values
+
+    @property
+    def categories(self) -> Optional[np.ndarray | pd.Index]:
+        return self._categories
+
+    @property
+    def values(self) -> np.ndarray:
+        """The values of the index column, decoded for categorical index columns"""
+        if self._categories is None:
+            return self._values
+        return np.asarray(self._categories)[self._values]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._values.dtype if self._categories is None else self._categories.dtype
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def take(self, positions: np.ndarray) -> IndexColumn:
+        """Index column of the rows at ``positions``, sharing the categories"""
+        return IndexColumn(self._name, self._values[positions], categories=self._categories)
+
+    def read_only(self) -> IndexColumn:
+        """Index column sharing the values, which does not allow modifying them in place"""
+        return IndexColumn(self._name, read_only(self._values), categories=self._categories)
+
+    def level_and_codes(self) -> tuple[pd.Index, np.ndarray]:
+        """Level and codes of this column in a multiindex, non categorical columns are factorized"""
+        if self._categories is not None:
+            return pd.Index(self._categories, name=self._name, copy=False), self._values
+        codes, uniques = pd.factorize(self._values, sort=True)
+        return pd.Index(uniques, name=self._name, copy=False), codes
+
+    def __repr__(self):
+        kind = f"categorical, {len(self._categories)} categories" if self.is_categorical else str(self.dtype)
+        return f"IndexColumn('{self._name}', {len(self)} rows, {kind})"
+
+
+def pandas_index(index_columns: Sequence[IndexColumn]) -> pd.Index | pd.MultiIndex:
+    """Creates the pandas index of index columns, a multiindex if there are several"""
+    if len(index_columns) == 1:
+        return pd.Index(index_columns[0].values, name=index_columns[0].name, copy=False)
+    levels, codes = zip(*(index_column.level_and_codes() for index_column in index_columns))
+    return pd.MultiIndex(levels=levels, codes=codes, names=[index_column.name for index_column in index_columns],
+                         verify_integrity=False)
+
+
+def _shared_block(columns: Sequence[np.ndarray]) -> Optional[np.ndarray]:
+    """Returns the (rows, columns) shaped 2d array the columns are views of, if there is one. Columns which are the rows
+    of a 2d array (as computed by numba kernels) are returned as its transposition."""
+    base = getattr(columns[0], "base", None) if len(columns) > 0 else None
+    if not isinstance(base, np.ndarray) or base.ndim != 2:
+        return None
+    for block in (base, base.T):
+        if block.shape[1] == len(columns) and all(
+                getattr(column, "base", None) is base and column.shape == block[:, i].shape
+                and column.strides == block[:, i].strides
+                and column.__array_interface__["data"][0] == block[:, i].__array_interface__["data"][0]
+                for i, column in enumerate(columns)):
+            return block if all(column.flags.writeable for column in columns) else read_only(block)
+    return None
+
+
+def _column_values(series: pd.Series) -> np.ndarray | pd.api.extensions.ExtensionArray:
+    # the values of extension types (i.e. intervals) would be converted into an object array
+    return series.array if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) else series.values
+
+
+class ArrayContainer(PandasContainer):
+    """Container for tabular data stored as named NumPy columns and index columns, which functions can process without
+    the overhead of pandas. Columns of pandas extension types backed by NumPy arrays (i.e. the interval arrays of
+    :class:`~openmnglab.functions.processing.static_intervals.StaticIntervals`) are supported as well.
+
+    The series or dataframe is only created when :attr:`data` is accessed. The conversion does not copy the columns,
+    categorical index columns and single index columns. Non-categorical index columns of a multiindex are factorized.
+    :meth:`from_pandas` converts a pandas container without copying.
+
+    :param columns: the named data columns
+    :param index: the index columns, in the order of the index levels
+    :param units: units of all columns and index columns
+    :param series: the container represents a series (with a single data column) instead of a dataframe
+    """
+
+    def __init__(self, columns: Mapping[str, np.ndarray], index: Sequence[IndexColumn],
+                 units: dict[str, pq.Quantity], series: bool = False):
+        index = tuple(index)
+        if len(index) == 0:
+            raise KeyError("No index column")
+        if series and len(columns) != 1:
+            raise ValueError(f"A series must have exactly one column, got {len(columns)}")
+        names = [*(index_column.name for index_column in index), *columns.keys()]
+        if len(set(names)) != len(names):
+            raise KeyError(f"Names are not unique: {names}")
+        length = len(index[0])
+        for name, column in (*((i.name, i) for i in index), *columns.items()):
+            if not name:
+                raise KeyError("Column not named")
+            if len(column) != length:
+                raise ValueError(f"Column '{name}' has {len(column)} rows, expected {length}")
+        self.check_units(units, names)
+        self._columns = dict(columns)
+        self._index_columns = index
+        self._units = units
+        self._series = series
+        self._data: Optional[pd.Series | pd.DataFrame] = None
+
+    @classmethod
+    def from_pandas(cls, data: PandasContainer | pd.Series | pd.DataFrame,
+                    units: Optional[dict[str, pq.Quantity]] = None) -> ArrayContainer:
+        """Converts a pandas container (or a series or dataframe and its units) without copying the data.
+
+        :param data: the container, series or dataframe
+        :param units: the units of the series or dataframe, taken from the container if not given
+        """
+        if isinstance(data, ArrayContainer):
+            return data
+        if isinstance(data, PandasContainer):
+            units = data.units if units is None else units
+            data = data.data
+        index = IndexColumn.from_index(data.index)
+        if isinstance(data, pd.Series):
+            container = cls({data.name: _column_values(data)}, index, units, series=True)
+        else:
+            container = cls({name: _column_values(data[name]) for name in data.columns}, index, units)
+        container._data = data
+        return container
+
+    @property
+    def columns(self) -> Mapping[str, np.ndarray]:
+        return self._columns
+
+    @property
+    def index_columns(self) -> tuple[IndexColumn, ...]:
+        return self._index_columns
+
+    @property
+    def index_names(self) -> tuple[str, ...]:
+        return tuple(index_column.name for index_column in self._index_columns)
+
+    @property
+    def is_series(self) -> bool:
+        return self._series
+
+    def __len__(self) -> int:
+        return len(self._index_columns[0])
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def index_column(self, name: str) -> IndexColumn:
+        for index_column in self._index_columns:
+            if index_column.name == name:
+                return index_column
+        raise KeyError(f"No index column '{name}'")
+
+    def take(self, positions: np.ndarray) -> ArrayContainer:
+        """Container with the rows at ``positions``"""
+        return ArrayContainer({name: column[positions] for name, column in self._columns.items()},
+                              [index_column.take(positions) for index_column in self._index_columns], self._units,
+                              series=self._series)
+
+    @property
+    def data(self) -> pd.Series | pd.DataFrame:
+        if self._data is None:
+            index = pandas_index(self._index_columns)
+            if self._series:
+                name, column = next(iter(self._columns.items()))
+                self._data = pd.Series(column, index=index, name=name, copy=False)
+            else:
+                block = _shared_block(tuple(self._columns.values()))
+                if block is not None:
+                    self._data = pd.DataFrame(block, index=index, columns=list(self._columns.keys()), copy=False)
+                else:
+                    self._data = pd.DataFrame(self._columns, index=index, copy=False)
+        return self._data
+
+    def __repr__(self):
+        units = ",".join((f"'{name}':{self.units[name].dimensionality}"
+                          for name in (*self.index_names, *self._columns.keys())))
+        columns = ", ".join(f"'{name}': {column.dtype}" for name, column in self._columns.items())
+        return f"""ArrayContainer @{id(self)}
+Units: {units}
+{len(self)} rows, index {self._index_columns}, columns {{{columns}}}"""
+
+    def read_only(self) -> ArrayContainer:
+        view = ArrayContainer({name: read_only(column) if isinstance(column, np.ndarray) else column
+                               for name, column in self._columns.items()},
+                              [index_column.read_only() for index_column in self._index_columns], self._units,
+                              series=self._series)
+        view._data = None if self._data is None else self.read_only_data(self._data)
+        return view
+
+    def cow_copy(self) -> ArrayContainer:
+        """A deep copy, as NumPy arrays can not be copied on write"""
+        return self.deep_copy()
+
+    def deep_copy(self) -> ArrayContainer:
+        return ArrayContainer({name: column.copy() for name, column in self._columns.items()},
+                              [IndexColumn(i.name, i.codes.copy() if i.is_categorical else i.values.copy(),
+                                           categories=i.categories) for i in self._index_columns],
+                              self._units.copy(), series=self._series)
+
+
+class ArrayDataSchema(PandasDataSchema):
+    """Schema for :class:`ArrayContainer`. It is described by a pandera schema like :class:`PandasDataSchema`, so it is
+    accepted wherever the pandas schema is. The structure of array containers is validated from their columns instead
+    of a pandas object."""
+
+    @classmethod
+    def of(cls, schema: PandasDataSchema) -> ArrayDataSchema:
+        return cls(schema.pandera_schema)
+
+    def _check_array_structure(self, container: ArrayContainer):
+        if isinstance(self._schema, pa.SeriesSchema):
+            if not container.is_series:
+                raise DataSchemaConformityError("Expected a series, got a dataframe")
+            name = next(iter(container.columns))
+            if name != self._schema.name:
+                raise DataSchemaConformityError(f"Expected a series named '{self._schema.name}', got '{name}'")
+            self._check_dtype(f"Series {name}", self._schema.dtype, container.columns[name].dtype)
+        else:
+            if container.is_series:
+                raise DataSchemaConformityError("Expected a dataframe, got a series")
+            for col_name, column in self._schema.columns.items():
+                if col_name not in container.columns:
+                    if column.required:
+                        raise DataSchemaConformityError(f"Column '{col_name}' is missing")
+                    continue
+                self._check_dtype(f"Column {col_name}", column.dtype, container.columns[col_name].dtype)
+        index_schema = self._schema.index
+        levels = index_schema.indexes if isinstance(index_schema, pa.MultiIndex) else \
+            () if index_schema is None else (index_schema,)
+        for level in levels:
+            try:
+                index_column = container.index_column(level.name)
+            except KeyError as e:
+                raise DataSchemaConformityError(f"Index column '{level.name}' is missing") from e
+            self._check_dtype(f"Index column {level.name}", level.dtype, index_column.dtype,
+                              allow_object=len(container) == 0)
+
+    def validate_structure(self, data_container: IDataContainer) -> bool:
+        if not isinstance(data_container, ArrayContainer):
+            return super().validate_structure(data_container)
+        self._check_array_structure(data_container)
+        return True
+
+    def validate_sampled(self, data_container: IDataContainer, sample_size: int) -> bool:
+        if not isinstance(data_container, ArrayContainer):
+            return super().validate_sampled(data_container, sample_size)
+        self._check_array_structure(data_container)
+        if len(data_container) > sample_size:
+            positions = np.sort(np.random.default_rng(0).choice(len(data_container), sample_size, replace=False))
+            data_container = data_container.take(positions)
+        self._validate_pandera(data_container.data)
+        return True
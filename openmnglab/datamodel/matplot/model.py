@@ -1,17 +1,19 @@
 import copy
-
-import matplotlib.pyplot as plt
+from typing import TYPE_CHECKING
 
 from openmnglab.model.datamodel.interface import IDataContainer, T_co, IDataSchema
 
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
 
-class MatPlotLibContainer(IDataContainer[plt.Figure]):
+class MatPlotLibContainer(IDataContainer["Figure"]):
 
-    def __init__(self, figure: plt.Figure):
+    def __init__(self, figure: "Figure"):
         self.figure = figure
 
     @property
-    def data(self) -> plt.Figure:
+    def data(self) -> "Figure":
         return self.figure
 
     def deep_copy(self) -> IDataContainer[T_co]:
@@ -0,0 +1,181 @@
+"""Compressed chunks of one dimensional arrays.
+
+Each chunk is pre-filtered and compressed with a codec of the standard library (:data:`CODECS`). The filters make
+the values easier to compress:
+
+* ``delta`` stores the difference of each integer sample to its predecessor (wrapping around on overflow, so it is
+  lossless). Slowly changing signals, like quantized ADC traces, become runs of small numbers.
+* ``shuffle`` groups the n-th byte of all values together, which puts the mostly constant high bytes of neighbouring
+  values next to each other.
+
+:class:`ChunkedArray` decompresses the chunks on access, so only the chunks a slice touches are decompressed.
+"""
+from __future__ import annotations
+
+import bz2
+import lzma
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from openmnglab.datamodel.pandas.lazy import LazyArray
+
+CODECS = {"zlib": zlib, "bz2": bz2, "lzma": lzma}
+"""The available codecs by their name, all of them release the GIL while (de)compressing"""
+
+
+def filters_for(dtype: np.dtype) -> tuple[str, ...]:
+    """The filters applied to arrays of a dtype before compressing them"""
+    dtype = np.dtype(dtype)
+    filters = ("delta",) if np.issubdtype(dtype, np.integer) else ()
+    return filters + ("shuffle",) if dtype.itemsize > 1 else filters
+
+
+def encode(values: np.ndarray, codec: str, filters: Sequence[str]) -> bytes:
+    """Filters and compresses an array.
+
+    :param values: the array
+    :param codec: name of the codec, see :data:`CODECS`
+    :param filters: names of the filters to apply, in order
+    :return: the compressed bytes
+    """
+    values = np.ascontiguousarray(values)
+    for name in filters:
+        if name == "delta":
+            values = np.diff(values, prepend=values.dtype.type(0)) if len(values) > 0 else values
+        elif name == "shuffle":
+            values = values.view(np.uint8).reshape(-1, values.dtype.itemsize).T.copy()
+        else:
+            raise ValueError(f"Unknown filter '{name}'")
+    return CODECS[codec].compress(values.tobytes())
+
+
+def decode(data: bytes, dtype: np.dtype, codec: str, filters: Sequence[str]) -> np.ndarray:
+    """Decompresses an array compressed by :func:`encode`.
+
+    :param data: the compressed bytes
+    :param dtype: dtype of the array
+    :param codec: name of the codec the array was compressed with
+    :param filters: names of the filters applied to the array, in order
+    :return: the array
+    """
+    dtype = np.dtype(dtype)
+    buffer = np.frombuffer(CODECS[codec].decompress(data), dtype=np.uint8)
+    values = buffer.view(dtype) if "shuffle" not in filters else \
+        buffer.reshape(dtype.itemsize, -1).T.copy().view(dtype).reshape(-1)
+    for name in reversed(filters):
+        if name == "delta":
+            values = np.cumsum(values, dtype=dtype)
+    return values
+
+
+class ChunkedArray(LazyArray):
+    """A read only, one dimensional array stored as compressed chunks of a fixed length (except the last one).
+
+    Slicing it decompresses the chunks spanned by the slice, several chunks in parallel threads. The most recently
+    decompressed chunks are kept, so consecutive slices of the same chunk decompress it only once. Converting it into
+    a NumPy array decompresses all chunks.
+
+    :param directory: directory containing the chunk files
+    :param files: names of the chunk files, in order
+    :param chunk_size: number of values of each chunk
+    :param length: number of values of all chunks
+    :param dtype: dtype of the values
+    :param codec: codec the chunks were compressed with
+    :param filters: filters applied to the chunks before compressing them
+    :param start: position of the first value of the array in the chunks, allows an array to cover a range of them
+    :param stop: position after the last value of the array in the chunks, defaults to ``length``
+    :param threads: maximum number of threads decompressing chunks, defaults to the number of processors
+    :param cached_chunks: number of decompressed chunks to keep
+    """
+
+    def __init__(self, directory: str | Path, files: Sequence[str], chunk_size: int, length: int, dtype,
+                 codec: str, filters: Sequence[str], start: int = 0, stop: Optional[int] = None,
+                 threads: Optional[int] = None, cached_chunks: int = 4):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}'")
+        self._directory = Path(directory)
+        self._files = tuple(files)
+        self._chunk_size = chunk_size
+        self._codec = codec
+        self._filters = tuple(filters)
+        self._start, self._stop, _ = slice(start, stop).indices(length)
+        self._stop = max(self._start, self._stop)
+        super().__init__(self._stop - self._start, dtype)
+        self._threads = threads if threads is not None else os.cpu_count() or 1
+        self._cached_chunks = cached_chunks
+        self._cache: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _read_chunk(self, i: int) -> np.ndarray:
+        with self._lock:
+            cached = self._cache.get(i)
+            if cached is not None:
+                self._cache.move_to_end(i)
+                return cached
+        chunk = decode((self._directory / self._files[i]).read_bytes(), self._dtype, self._codec, self._filters)
+        chunk.flags.writeable = False
+        with self._lock:
+            self._cache[i] = chunk
+            while len(self._cache) > self._cached_chunks:
+                self._cache.popitem(last=False)
+        return chunk
+
+    def _read_chunks(self, start: int, stop: int) -> np.ndarray:
+        """Values of the positions ``start:stop`` of the chunks"""
+        if stop <= start:
+            return np.empty(0, dtype=self._dtype)
+        first, last = start // self._chunk_size, (stop - 1) // self._chunk_size + 1
+        chunk_ids = range(first, last)
+        if len(chunk_ids) == 1 or self._threads == 1:
+            chunks = [self._read_chunk(i) for i in chunk_ids]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self._threads, len(chunk_ids))) as pool:
+                chunks = list(pool.map(self._read_chunk, chunk_ids))
+        offset = first * self._chunk_size
+        if len(chunks) == 1:
+            return chunks[0][start - offset:stop - offset]
+        return np.concatenate(chunks)[start - offset:stop - offset]
+
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        return self._read_chunks(self._start + start, self._start + stop)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cache"], state["_lock"] = OrderedDict(), None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"ChunkedArray(length={len(self)}, dtype={self._dtype}, codec={self._codec!r}, " \
+               f"chunks={len(self._files)})"
+
+
+def save_compressed_chunks(directory: Path, stem: str, values: np.ndarray, chunk_size: int, codec: str) -> dict:
+    """Compresses an array in chunks of ``chunk_size`` values, each saved as a file ``<stem>_<i>.<codec>``
+
+    :return: description of the chunks, which :func:`chunked_array` opens
+    """
+    values = np.asarray(values)
+    filters = filters_for(values.dtype)
+    files = []
+    for i, start in enumerate(range(0, len(values), chunk_size)):
+        files.append(f"{stem}_{i:05d}.{codec}")
+        (directory / files[-1]).write_bytes(encode(values[start:start + chunk_size], codec, filters))
+    return dict(files=files, dtype=str(values.dtype), codec=codec, filters=list(filters), length=len(values))
+
+
+def chunked_array(directory: Path, entry: dict, chunk_size: int, start: int = 0, stop: Optional[int] = None,
+                  threads: Optional[int] = None) -> ChunkedArray:
+    """Opens chunks saved by :func:`save_compressed_chunks` as an array covering the values ``start:stop``"""
+    return ChunkedArray(directory, entry["files"], chunk_size, entry["length"], entry["dtype"], entry["codec"],
+                        entry["filters"], start=start, stop=stop, threads=threads)
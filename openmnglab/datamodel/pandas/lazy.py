@@ -0,0 +1,128 @@
+"""Read only, one dimensional arrays whose values are read from disk when they are accessed.
+
+They implement the parts of the NumPy array interface the containers use (``len``, ``dtype``, slicing, ``copy``,
+``astype`` and conversion with :func:`numpy.asarray`), so they can be passed as the values of a
+:class:`~openmnglab.datamodel.pandas.signal.ContinuousContainer`. Consumers which only need parts of a signal (i.e.
+:class:`~openmnglab.functions.processing.windows.Windows`) then only read these parts.
+"""
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+import h5py
+import numpy as np
+
+
+class LazyArray(ABC):
+    """Base class of lazily read arrays, subclasses implement :meth:`_read`.
+
+    :param length: number of values
+    :param dtype: dtype of the values
+    """
+
+    def __init__(self, length: int, dtype):
+        self._length = int(length)
+        self._dtype = np.dtype(dtype)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def shape(self) -> tuple[int]:
+        return len(self),
+
+    @property
+    def ndim(self) -> int:
+        return 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    @abstractmethod
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        """Reads the values ``start:stop``, with ``0 <= start <= stop <= len(self)``"""
+        ...
+
+    def __getitem__(self, item: int | slice) -> np.ndarray | np.generic:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            values = self._read(start, max(start, stop))
+            return values if step == 1 else values[::step]
+        pos = item + len(self) if item < 0 else item
+        if not 0 <= pos < len(self):
+            raise IndexError(f"index {item} is out of bounds for an array of length {len(self)}")
+        return self._read(pos, pos + 1)[0]
+
+    def __array__(self, dtype=None) -> np.ndarray:
+        values = self._read(0, len(self))
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    def copy(self) -> np.ndarray:
+        """Reads all values into a writable array"""
+        return self._read(0, len(self)).copy()
+
+    def astype(self, dtype, copy: bool = True) -> np.ndarray:
+        return np.asarray(self).astype(dtype, copy=copy)
+
+
+class HDF5Array(LazyArray):
+    """The values of a range of a one dimensional HDF5 dataset. MATLAB stores vectors as (1, n) or (n, 1) matrices,
+    the longer axis holds the values.
+
+    The file is opened on the first access and kept open, each process (i.e. after unpickling the array) opens it
+    again.
+
+    :param path: path of the HDF5 file
+    :param dataset: path of the dataset inside of the file
+    :param start: position of the first value of the array in the dataset
+    :param stop: position after the last value of the array in the dataset, defaults to the length of the dataset
+    :param dtype: dtype to convert the values to, defaults to the dtype of the dataset
+    """
+
+    def __init__(self, path: str | Path, dataset: str, start: int = 0, stop: Optional[int] = None, dtype=None):
+        self._path = Path(path)
+        self._dataset_path = dataset
+        self._file: Optional[h5py.File] = None
+        self._lock = threading.Lock()
+        dataset_obj = self._dataset()
+        self._axis = int(np.argmax(dataset_obj.shape))
+        self._start, self._stop, _ = slice(start, stop).indices(dataset_obj.shape[self._axis])
+        self._stop = max(self._start, self._stop)
+        super().__init__(self._stop - self._start, dataset_obj.dtype if dtype is None else dtype)
+
+    def _dataset(self) -> h5py.Dataset:
+        if self._file is None:
+            self._file = h5py.File(self._path, "r")
+        return self._file[self._dataset_path]
+
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        # h5py handles are not safe to share between threads
+        with self._lock:
+            dataset = self._dataset()
+            selection = [0] * dataset.ndim
+            selection[self._axis] = slice(self._start + start, self._start + stop)
+            values = dataset[tuple(selection)]
+        return values.astype(self._dtype, copy=False)
+
+    def close(self):
+        """Closes the file, it is opened again on the next access"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_file"], state["_lock"] = None, None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"HDF5Array(path={str(self._path)!r}, dataset={self._dataset_path!r}, " \
+               f"range={self._start}:{self._stop}, dtype={self._dtype})"
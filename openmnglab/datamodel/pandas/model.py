@@ -1,16 +1,19 @@
 from __future__ import annotations
 
+import copy
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Iterable, Optional
 
 import numpy as np
 import pandas as pd
 import pandera as pa
 import quantities as pq
+from pandera.engines import pandas_engine
 
 from openmnglab.datamodel.exceptions import DataSchemaCompatibilityError, DataSchemaConformityError
 from openmnglab.datamodel.pandas.verification import compare_schemas
 from openmnglab.model.datamodel.interface import IDataContainer, ISchemaAcceptor, IDataSchema
+from openmnglab.util.arrays import read_only
 from openmnglab.util.pandas import pandas_names
 
 TPandas = TypeVar('TPandas', pd.Series, pd.DataFrame)
@@ -43,10 +46,8 @@ class PandasContainer(IDataContainer[TPandas], Generic[TPandas]):
         else:
             raise TypeError("Passed object is neither a pandas dataframe nor a series")
 
-    def __init__(self, data: TPandas, units: dict[str, pq.Quantity]):
-        if not isinstance(data, (pd.Series, pd.DataFrame)):
-            raise TypeError(
-                f"Argument 'data' must be either a pandas series or a dataframe, is {type(data).__qualname__}")
+    @staticmethod
+    def check_units(units: dict[str, pq.Quantity], names: Iterable[str]):
         for k, v in units.items():
             if not isinstance(k, str):
                 raise TypeError(
@@ -54,10 +55,16 @@ class PandasContainer(IDataContainer[TPandas], Generic[TPandas]):
             if not isinstance(v, pq.Quantity):
                 raise TypeError(
                     f"Value of key {k} in the 'units' dictionary is of type {type(v).__qualname__}, but must be of type {pq.Quantity.__qualname__} or a subtype thereof.")
-        self.check_all_named(data)
-        for col_name in pandas_names(data):
+        for col_name in names:
             if col_name not in units:
                 raise KeyError(f"No quantity for element \'{col_name}\' in unit dict")
+
+    def __init__(self, data: TPandas, units: dict[str, pq.Quantity]):
+        if not isinstance(data, (pd.Series, pd.DataFrame)):
+            raise TypeError(
+                f"Argument 'data' must be either a pandas series or a dataframe, is {type(data).__qualname__}")
+        self.check_all_named(data)
+        self.check_units(units, pandas_names(data))
         self._data = data
         self._units = units
 
@@ -69,6 +76,25 @@ class PandasContainer(IDataContainer[TPandas], Generic[TPandas]):
     def units(self) -> dict[str, pq.Quantity]:
         return self._units
 
+    @property
+    def structure_data(self) -> TPandas:
+        """The pandas object whose names and dtypes are checked by :meth:`PandasDataSchema.validate_structure`.
+        Subclasses which create :attr:`data` on demand can return an object with the same structure and dtypes here, so
+        checking the structure does not have to create the data."""
+        return self.data
+
+    @property
+    def validation_data(self) -> TPandas:
+        """The pandas object validated by :meth:`PandasDataSchema.validate`, it must contain the values of
+        :attr:`data`."""
+        return self.data
+
+    def validation_sample(self, sample_size: int) -> TPandas:
+        """A random sample of at most ``sample_size`` rows of :attr:`validation_data`, validated by
+        :meth:`PandasDataSchema.validate_sampled`"""
+        data = self.validation_data
+        return data if len(data) <= sample_size else data.sample(sample_size, random_state=0)
+
     def __repr__(self):
         index_names = (self.data.index.name,) if not isinstance(self.data.index, pd.MultiIndex) else (idx.name for idx
                                                                                                       in
@@ -82,6 +108,33 @@ Units: {units}
     def deep_copy(self) -> PandasContainer[TPandas]:
         return PandasContainer(self.data.copy(), self.units.copy())
 
+    @staticmethod
+    def read_only_data(data: TPandas) -> TPandas:
+        """Creates a series or dataframe sharing the data of the passed one, whose NumPy arrays are read only. Columns
+        of pandas extension types are shared as they are."""
+        if isinstance(data, pd.Series):
+            if not isinstance(data.values, np.ndarray):
+                return data.copy(deep=False)
+            return pd.Series(read_only(data.values), index=data.index, name=data.name, copy=False)
+        columns = [data[name].values for name in data.columns]
+        if len(columns) > 0 and all(isinstance(column, np.ndarray) for column in columns):
+            # keep the 2d block of dataframes with a single dtype, so their values can still be accessed without copying
+            block = data.to_numpy()
+            if all(np.may_share_memory(block, column) for column in columns):
+                return pd.DataFrame(read_only(block), index=data.index, columns=data.columns, copy=False)
+        return pd.DataFrame({name: read_only(column) if isinstance(column, np.ndarray) else data[name].array
+                             for name, column in zip(data.columns, columns)}, index=data.index, copy=False)
+
+    def read_only(self) -> PandasContainer[TPandas]:
+        """A container sharing the data, whose arrays are read only (see :meth:`read_only_data`)"""
+        view = copy.copy(self)
+        view._data = self.read_only_data(self._data)
+        return view
+
+    def cow_copy(self) -> PandasContainer[TPandas]:
+        """A copy-on-write clone if pandas' copy-on-write mode is enabled, otherwise a deep copy"""
+        return PandasContainer(self.data.copy(deep=not pd.options.mode.copy_on_write), self.units.copy())
+
 
 TPanderaSchema = TypeVar("TPanderaSchema", pa.DataFrameSchema, pa.SeriesSchema)
 
@@ -141,26 +194,94 @@ class PandasDataSchema(Generic[TPanderaSchema], IPandasDataSchema[TPanderaSchema
     def pandera_schema(self) -> TPanderaSchema:
         return self._schema
 
-    def validate(self, data_container: IDataContainer) -> bool:
+    @staticmethod
+    def _pandas_container(data_container: IDataContainer) -> PandasContainer:
         if not isinstance(data_container, PandasContainer):
             raise DataSchemaConformityError(
                 f"PandasDataSchema expects a PandasContainer for validation but got an object of type {type(data_container).__qualname__}")
+        return data_container
+
+    def _validate_pandera(self, validation_data: pd.Series | pd.DataFrame, **kwargs):
         try:
-            _ = self._schema.validate(data_container.data)
+            _ = self._schema.validate(validation_data, **kwargs)
         except pa.errors.SchemaError as schema_err:
             # zero length multiindeces are currently not correctly evaluated by
             if schema_err.reason_code == pa.errors.SchemaErrorReason.WRONG_DATATYPE and len(
-                    data_container.data) == 0 and isinstance(data_container.data.index, pd.MultiIndex) and isinstance(
+                    validation_data) == 0 and isinstance(validation_data.index, pd.MultiIndex) and isinstance(
                 self.pandera_schema.index, pa.MultiIndex):
-                for index_name, index_dtype in data_container.data.index.dtypes.items():
+                for index_name, index_dtype in validation_data.index.dtypes.items():
                     if index_name in self._schema.index.columns:
                         expected_dtype = self._schema.index.columns[index_name].dtype
                         if not (index_dtype == np.dtype(object) or expected_dtype == index_dtype or np.issubdtype(
                                 index_dtype, expected_dtype)):
-                            raise Exception(
+                            raise DataSchemaConformityError(
                                 f"Index column {index_name} was expected to be type '{expected_dtype}', but is '{index_dtype}")
+            else:
+                raise DataSchemaConformityError("Pandera model validation failed") from schema_err
 
         except Exception as e:
             raise DataSchemaConformityError("Pandera model validation failed") from e
 
+    def validate(self, data_container: IDataContainer) -> bool:
+        self._validate_pandera(self._pandas_container(data_container).validation_data)
+        return True
+
+    @staticmethod
+    def _check_dtype(element: str, expected: Optional[pa.DataType], actual, allow_object=False):
+        if expected is None or (allow_object and actual == np.dtype(object)):
+            return
+        # labels (i.e. tracks) may be dictionary encoded or plain strings, like the full validation accepts
+        if isinstance(expected, pa.dtypes.Category) and pd.api.types.is_string_dtype(actual):
+            return
+        try:
+            matches = expected.check(pandas_engine.Engine.dtype(actual))
+        except TypeError:
+            matches = False
+        if not matches:
+            raise DataSchemaConformityError(f"{element} was expected to be of type '{expected}', but is '{actual}'")
+
+    def _check_structure(self, data: pd.Series | pd.DataFrame):
+        if isinstance(self._schema, pa.SeriesSchema):
+            if not isinstance(data, pd.Series):
+                raise DataSchemaConformityError(f"Expected a series, got {type(data).__qualname__}")
+            if data.name != self._schema.name:
+                raise DataSchemaConformityError(f"Expected a series named '{self._schema.name}', got '{data.name}'")
+            self._check_dtype(f"Series {data.name}", self._schema.dtype, data.dtype)
+        else:
+            if not isinstance(data, pd.DataFrame):
+                raise DataSchemaConformityError(f"Expected a dataframe, got {type(data).__qualname__}")
+            for col_name, column in self._schema.columns.items():
+                if col_name not in data.columns:
+                    if column.required:
+                        raise DataSchemaConformityError(f"Column '{col_name}' is missing")
+                    continue
+                self._check_dtype(f"Column {col_name}", column.dtype, data.dtypes[col_name])
+        index_schema = self._schema.index
+        if isinstance(index_schema, pa.MultiIndex):
+            if not isinstance(data.index, pd.MultiIndex):
+                raise DataSchemaConformityError("Expected a multiindex")
+            index_dtypes = data.index.dtypes
+            for level in index_schema.indexes:
+                if level.name not in index_dtypes:
+                    raise DataSchemaConformityError(f"Index level '{level.name}' is missing")
+                # zero length multiindeces have levels of type object
+                self._check_dtype(f"Index level {level.name}", level.dtype, index_dtypes[level.name],
+                                  allow_object=len(data) == 0)
+        elif index_schema is not None:
+            if isinstance(data.index, pd.MultiIndex) or data.index.name != index_schema.name:
+                raise DataSchemaConformityError(f"Expected an index named '{index_schema.name}'")
+            self._check_dtype(f"Index {index_schema.name}", index_schema.dtype, data.index.dtype)
+
+    def validate_structure(self, data_container: IDataContainer) -> bool:
+        """Validates names, index levels and dtypes of the data container from its metadata, without scanning the
+        data. Checks which need the data (i.e. nullability) are skipped."""
+        self._check_structure(self._pandas_container(data_container).structure_data)
+        return True
+
+    def validate_sampled(self, data_container: IDataContainer, sample_size: int) -> bool:
+        """Validates the structure of the data container and runs the full validation on a random sample of at most
+        ``sample_size`` rows."""
+        container = self._pandas_container(data_container)
+        self._check_structure(container.structure_data)
+        self._validate_pandera(container.validation_sample(sample_size))
         return True
@@ -0,0 +1,178 @@
+"""Saves data containers to and loads them from directories, in a format which can be memory mapped.
+
+A saved container is a directory with one ``.npy`` file for each array (values, index values, codes and categories of
+categorical index levels, ...) and a JSON sidecar (:data:`SIDECAR`) describing how to reassemble them: the type of the
+container, the names and dtypes of its columns and index levels and its units. Strings are stored as fixed width
+unicode arrays, so no file requires pickling.
+
+The arrays are loaded with ``np.load(mmap_mode="r")``, so loading is independent of the size of the data and only the
+pages which are accessed are read from the disk. The loaded arrays are read only.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import quantities as pq
+
+from openmnglab.datamodel.array.model import ArrayContainer, IndexColumn
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer, SignalContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+
+SIDECAR = "container.json"
+"""Name of the JSON file describing a saved container"""
+FORMAT = "openmnglab.container"
+VERSION = 1
+
+_Entry = dict[str, Any]
+
+
+def _save_array(directory: Path, stem: str, values) -> _Entry:
+    if isinstance(values, (pd.Categorical, pd.CategoricalIndex)) or \
+            isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        values = pd.Categorical(values)
+        return dict(kind="categorical", ordered=bool(values.ordered),
+                    codes=_save_array(directory, f"{stem}_codes", values.codes),
+                    categories=_save_array(directory, f"{stem}_categories", values.categories))
+    if isinstance(values, (pd.arrays.IntervalArray, pd.IntervalIndex)):
+        return dict(kind="interval", closed=values.closed, left=_save_array(directory, f"{stem}_left", values.left),
+                    right=_save_array(directory, f"{stem}_right", values.right))
+    values = np.asarray(values)
+    kind = "array"
+    if values.dtype == np.dtype(object):
+        if not all(isinstance(value, str) for value in values):
+            raise TypeError(f"Array '{stem}' contains objects which are not strings and can not be saved")
+        values = values.astype(str) if len(values) > 0 else np.empty(0, dtype=str)
+        kind = "strings"
+    file_name = f"{stem}.npy"
+    np.save(directory / file_name, values, allow_pickle=False)
+    return dict(kind=kind, file=file_name, dtype=str(values.dtype))
+
+
+def _load_array(directory: Path, entry: _Entry, mmap: bool):
+    kind = entry["kind"]
+    if kind == "categorical":
+        return pd.Categorical.from_codes(_load_array(directory, entry["codes"], mmap),
+                                         categories=pd.Index(_load_array(directory, entry["categories"], mmap)),
+                                         ordered=entry["ordered"])
+    if kind == "interval":
+        return pd.arrays.IntervalArray.from_arrays(_load_array(directory, entry["left"], mmap),
+                                                   _load_array(directory, entry["right"], mmap),
+                                                   closed=entry["closed"])
+    values = np.load(directory / entry["file"], mmap_mode="r" if mmap else None, allow_pickle=False)
+    if str(values.dtype) != entry["dtype"]:
+        raise ValueError(f"Array {entry['file']} is of type {values.dtype}, expected {entry['dtype']}")
+    # memory mapped arrays are passed on as plain arrays, which still read from the memory map
+    return values.astype(object) if kind == "strings" else np.asarray(values)
+
+
+def _save_index_column(directory: Path, i: int, index_column: IndexColumn) -> _Entry:
+    if index_column.is_categorical:
+        return dict(name=index_column.name,
+                    codes=_save_array(directory, f"index{i}_codes", index_column.codes),
+                    categories=_save_array(directory, f"index{i}_categories", index_column.categories))
+    return dict(name=index_column.name, values=_save_array(directory, f"index{i}", index_column.values))
+
+
+def _load_index_column(directory: Path, entry: _Entry, mmap: bool) -> IndexColumn:
+    if "codes" in entry:
+        return IndexColumn(entry["name"], _load_array(directory, entry["codes"], mmap),
+                           categories=_load_array(directory, entry["categories"], mmap))
+    return IndexColumn(entry["name"], _load_array(directory, entry["values"], mmap))
+
+
+def _save_time_index(directory: Path, time_index: pd.Index | RegularTimeBase) -> _Entry:
+    if isinstance(time_index, RegularTimeBase):
+        return dict(name=time_index.name, length=len(time_index),
+                    positions=_save_array(directory, "timebase_positions", time_index.positions),
+                    starts=_save_array(directory, "timebase_starts", time_index.starts),
+                    intervals=_save_array(directory, "timebase_intervals", time_index.intervals))
+    return dict(name=time_index.name, values=_save_array(directory, "index0", time_index))
+
+
+def _load_time_index(directory: Path, entry: _Entry, mmap: bool) -> pd.Index | RegularTimeBase:
+    if "values" in entry:
+        return pd.Index(_load_array(directory, entry["values"], mmap), name=entry["name"], copy=False)
+    return RegularTimeBase(*(_load_array(directory, entry[key], False) for key in ("positions", "starts", "intervals")),
+                           entry["length"], name=entry["name"])
+
+
+def _save_units(units: dict[str, pq.Quantity]) -> dict[str, _Entry]:
+    return {name: dict(magnitude=float(quantity.magnitude), unit=quantity.dimensionality.string)
+            for name, quantity in units.items()}
+
+
+def _load_units(units: dict[str, _Entry]) -> dict[str, pq.Quantity]:
+    return {name: pq.Quantity(entry["magnitude"], entry["unit"]) for name, entry in units.items()}
+
+
+def save(container: PandasContainer, path: str | Path) -> Path:
+    """Saves a pandas container (including :class:`~openmnglab.datamodel.array.model.ArrayContainer`,
+    :class:`~openmnglab.datamodel.pandas.signal.ContinuousContainer` and
+    :class:`~openmnglab.datamodel.pandas.signal.SignalContainer`) into a directory. Files of a previously saved
+    container in the directory are overwritten.
+
+    Continuous signals are saved without creating their series, quantized signals keep their quantized samples and
+    time bases are saved instead of the timestamps they calculate.
+
+    :param container: the container to save
+    :param path: the directory to save the container to, created if it does not exist
+    :return: the path of the directory
+    """
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    sidecar: _Entry = dict(format=FORMAT, version=VERSION, units=_save_units(container.units))
+    if isinstance(container, ContinuousContainer):
+        sidecar.update(name=container.name, time_index=_save_time_index(directory, container.time_index))
+        if isinstance(container, SignalContainer):
+            sidecar.update(container="signal", scale=container.scale, offset=container.offset,
+                           dtype=str(container.dtype), values=_save_array(directory, "raw", container.raw))
+        else:
+            sidecar.update(container="continuous", values=_save_array(directory, "values", container.samples()))
+    else:
+        is_array_container = isinstance(container, ArrayContainer)
+        # the columns and index columns of an array container are the arrays of the series or dataframe
+        arrays = ArrayContainer.from_pandas(container)
+        sidecar.update(container="array" if is_array_container else "pandas", series=arrays.is_series,
+                       index=[_save_index_column(directory, i, index_column)
+                              for i, index_column in enumerate(arrays.index_columns)],
+                       columns=[dict(name=name, values=_save_array(directory, f"column{i}", column))
+                                for i, (name, column) in enumerate(arrays.columns.items())])
+    with open(directory / SIDECAR, "w") as sidecar_file:
+        json.dump(sidecar, sidecar_file, indent=2)
+    return directory
+
+
+def load(path: str | Path, mmap: bool = True) -> PandasContainer:
+    """Loads a container saved by :func:`save`.
+
+    :param path: the directory the container was saved to
+    :param mmap: memory map the arrays instead of reading them into memory. Memory mapped arrays are read only.
+    :return: a container of the same type as the saved one
+    """
+    directory = Path(path)
+    with open(directory / SIDECAR) as sidecar_file:
+        sidecar: _Entry = json.load(sidecar_file)
+    if sidecar.get("format") != FORMAT:
+        raise ValueError(f"{directory} does not contain a saved container")
+    if sidecar["version"] > VERSION:
+        raise ValueError(f"Container was saved in version {sidecar['version']} of the format, which is not supported")
+    units = _load_units(sidecar["units"])
+    kind = sidecar["container"]
+    if kind in ("signal", "continuous"):
+        time_index = _load_time_index(directory, sidecar["time_index"], mmap)
+        values = _load_array(directory, sidecar["values"], mmap)
+        if kind == "signal":
+            return SignalContainer(values, time_index, sidecar["name"], units, sidecar["scale"], sidecar["offset"],
+                                   dtype=sidecar["dtype"])
+        return ContinuousContainer(values, time_index, sidecar["name"], units)
+    container = ArrayContainer({column["name"]: _load_array(directory, column["values"], mmap)
+                                for column in sidecar["columns"]},
+                               [_load_index_column(directory, entry, mmap) for entry in sidecar["index"]], units,
+                               series=sidecar["series"])
+    return container if kind == "array" else PandasContainer(container.data, units)
+
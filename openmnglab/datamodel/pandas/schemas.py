@@ -1,3 +1,5 @@
+from functools import cache
+
 from pandera import Column, Index, DataFrameSchema, SeriesSchema, MultiIndex, Category
 
 from openmnglab.datamodel.pandas.model import PandasDataSchema
@@ -15,23 +17,28 @@ STIM_TYPE = "stimulus type"
 COMMENT = "comment"
 
 
-def float_timeseries(name: str, index_name: str = TIMESTAMP) -> PandasDataSchema[SeriesSchema]:
-    return PandasDataSchema(SeriesSchema(float, index=Index(float, name=index_name), name=name))
+# the schemas are cached, so the sources of a plan share them and planners compare them with acceptors only once
+@cache
+def float_timeseries(name: str, index_name: str = TIMESTAMP, dtype=float) -> PandasDataSchema[SeriesSchema]:
+    return PandasDataSchema(SeriesSchema(dtype, index=Index(float, name=index_name), name=name))
 
 
+@cache
 def str_eventseries(name: str, index_name: str = TIMESTAMP) -> PandasDataSchema[SeriesSchema]:
     return PandasDataSchema(SeriesSchema(str, index=Index(float, name=index_name), name=name))
 
 
+@cache
 def stimulus_list() -> PandasDataSchema[SeriesSchema]:
     return PandasDataSchema(SeriesSchema(float, index=MultiIndex(
         indexes=[Index(int, name=STIM_IDX), Index(Category, name=STIM_TYPE)]),
                                          name=STIM_TS))
 
 
+@cache
 def sorted_spikes() -> PandasDataSchema[SeriesSchema]:
     return PandasDataSchema(SeriesSchema(float,
                                          index=MultiIndex(
-                                             indexes=[Index(int, name=STIM_IDX), Index(str, name=TRACK),
+                                             indexes=[Index(int, name=STIM_IDX), Index(Category, name=TRACK),
                                                       Index(int, name=TRACK_SPIKE_IDX)]),
                                          name=SPIKE_TS))
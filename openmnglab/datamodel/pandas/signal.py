@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import copy
+from typing import Optional, Iterable
+
+import numpy as np
+import pandas as pd
+import quantities as pq
+
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase, materialize, time_values
+from openmnglab.util.arrays import read_only
+from openmnglab.util.dtypes import float_dtype
+
+# number of samples (de-)quantized at once, bounds the size of temporary float arrays
+QUANTIZATION_BLOCK = 2 ** 20
+
+
+def dequantize(raw: np.ndarray, scale: float, offset: float, dtype=np.float64) -> np.ndarray:
+    """Converts quantized samples into values: ``raw * scale + offset``, calculated in float64.
+
+    :param raw: integer samples
+    :param scale: value of one quantization step
+    :param offset: value of the sample 0
+    :param dtype: dtype of the returned values
+    :return: the values of the samples
+    """
+    return (raw * np.float64(scale) + np.float64(offset)).astype(dtype, copy=False)
+
+
+def quantize(values: np.ndarray, scale: float, offset: float = 0., dtype=np.int16) -> np.ndarray:
+    """Quantizes values to integer samples, so that ``dequantize(raw, scale, offset, values.dtype)`` reproduces them
+    exactly.
+
+    :param values: float values to quantize
+    :param scale: value of one quantization step
+    :param offset: value of the sample 0
+    :param dtype: integer dtype of the samples
+    :raise ValueError: if the values can not be quantized losslessly with the given parameters
+    :return: the quantized samples
+    """
+    info = np.iinfo(dtype)
+    raw = np.empty(len(values), dtype=dtype)
+    for start in range(0, len(values), QUANTIZATION_BLOCK):
+        block = values[start:start + QUANTIZATION_BLOCK]
+        steps = np.rint((block.astype(np.float64) - offset) / scale)
+        if len(steps) > 0 and (steps.min() < info.min or steps.max() > info.max):
+            raise ValueError(f"Values exceed the range of {np.dtype(dtype)} with a scale of {scale}")
+        raw[start:start + len(block)] = steps
+        if not np.array_equal(dequantize(raw[start:start + len(block)], scale, offset, values.dtype), block):
+            raise ValueError(f"Values are not quantized with a scale of {scale} and an offset of {offset}")
+    return raw
+
+
+def _snapped(value: float) -> Iterable[float]:
+    """Yields the value and shorter representations of it, which a fit can only approximate"""
+    yield value
+    yield float(np.float32(value))
+    for digits in range(3, 13):
+        yield float(f"{value:.{digits}g}")
+
+
+def infer_quantization(values: np.ndarray, sample_size: int = 2 ** 16, dtype=np.int16) \
+        -> Optional[tuple[float, float]]:
+    """Estimates the scale and offset of values which were recorded by an ADC from a sample of them. The estimate is
+    verified to quantize the sample losslessly.
+
+    :param values: values to estimate the quantization for
+    :param sample_size: number of values to estimate the quantization from
+    :param dtype: integer dtype of the samples
+    :return: the scale and offset, or ``None`` if the values of the sample can not be quantized losslessly
+    """
+    sample = values[:sample_size]
+    distinct = np.unique(sample.astype(np.float64))
+    distinct = distinct[np.isfinite(distinct)]
+    if len(distinct) < 2:
+        return None
+    # most neighbouring values are a single step apart
+    diffs = np.diff(distinct)
+    scale = diffs[diffs < 1.5 * diffs.min()].mean()
+    # refine the estimate by a least squares fit, as the differences between rounded float values are not exact
+    scale, offset = np.polyfit(np.rint((distinct - distinct[0]) / scale), distinct, 1)
+    # move the offset next to zero, so the samples are centered around it like the samples of an ADC
+    offset -= np.rint(offset / scale) * scale
+    for candidate_offset in (0., *_snapped(offset)):
+        for candidate_scale in _snapped(scale):
+            try:
+                quantize(sample, candidate_scale, candidate_offset, dtype=dtype)
+            except ValueError:
+                continue
+            return candidate_scale, candidate_offset
+    return None
+
+
+class ContinuousContainer(PandasContainer[pd.Series]):
+    """Container for a continuous signal, which keeps its values and timestamps apart and only creates the series when
+    :attr:`data` is accessed. The timestamps can be a :class:`~openmnglab.datamodel.pandas.timebase.RegularTimeBase`,
+    which calculates them instead of storing them.
+
+    Consumers which only need parts of the signal should use :attr:`time_index`, :meth:`samples` and :meth:`times`
+    instead of :attr:`data`.
+
+    :param values: values of the samples
+    :param index: index of the samples (i.e. the timestamps) or a time base
+    :param name: name of the signal
+    :param units: units of the signal and its index
+    """
+
+    def __init__(self, values: np.ndarray, index: pd.Index | RegularTimeBase, name: str,
+                 units: dict[str, pq.Quantity]):
+        if len(values) != len(index):
+            raise ValueError(f"Got {len(values)} samples, but an index of length {len(index)}")
+        if not name:
+            raise KeyError("Series not named")
+        if isinstance(index, RegularTimeBase):
+            if not index.name:
+                raise KeyError("Time base not named")
+        else:
+            self.check_all_indexes_named(index)
+        self.check_units(units, (index.name, name))
+        self._values = values
+        self._time_index = index
+        self._index: Optional[pd.Index] = index if isinstance(index, pd.Index) else None
+        self._name = name
+        self._units = units
+        self._data: Optional[pd.Series] = None
+
+    @property
+    def time_index(self) -> pd.Index | RegularTimeBase:
+        """The index of the samples or, for regularly sampled signals, the time base calculating it"""
+        return self._time_index
+
+    @property
+    def index(self) -> pd.Index:
+        if self._index is None:
+            self._index = materialize(self._time_index)
+        return self._index
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._values.dtype
+
+    def samples(self, start: int = 0, stop: Optional[int] = None, dtype=None) -> np.ndarray:
+        """Returns the values of the samples ``start:stop``.
+
+        :param dtype: dtype of the values, defaults to the dtype of the container
+        """
+        return self._values[start:stop].astype(self.dtype if dtype is None else dtype, copy=False)
+
+    def times(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Returns the timestamps of the samples ``start:stop``"""
+        return time_values(self._time_index, start, stop)
+
+    @property
+    def data(self) -> pd.Series:
+        if self._data is None:
+            self._data = pd.Series(self.samples(), index=self.index, name=self._name, copy=False)
+        return self._data
+
+    def _validation_index(self, positions: Optional[np.ndarray] = None) -> pd.Index:
+        if self._index is not None:
+            return self._index if positions is None else self._index[positions]
+        # the timestamps calculated by a time base are never NaN, so zeros of the same dtype are validated instead
+        length = len(self._time_index) if positions is None else len(positions)
+        return pd.Index(np.broadcast_to(np.zeros(1), length), name=self._time_index.name, copy=False)
+
+    def _take_raw(self, positions: np.ndarray) -> np.ndarray:
+        if isinstance(self._values, np.ndarray):
+            return self._values[positions]
+        # lazily read values only support slicing, so only the sampled values are read
+        return np.fromiter((self._values[pos] for pos in positions), dtype=self._values.dtype, count=len(positions))
+
+    def _take_samples(self, positions: np.ndarray) -> np.ndarray:
+        """Returns the values of the samples at the positions"""
+        return self._take_raw(positions).astype(self.dtype, copy=False)
+
+    @property
+    def structure_data(self) -> pd.Series:
+        # only names and dtypes are checked, so zeros of the same dtype are sufficient
+        index = self._validation_index()
+        return pd.Series(np.broadcast_to(np.zeros(1, dtype=self.dtype), len(index)), index=index, name=self._name,
+                         copy=False)
+
+    @property
+    def validation_data(self) -> pd.Series:
+        return pd.Series(self.samples(), index=self._validation_index(), name=self._name, copy=False)
+
+    def validation_sample(self, sample_size: int) -> pd.Series:
+        if len(self._values) <= sample_size:
+            return self.validation_data
+        positions = np.sort(np.random.default_rng(0).choice(len(self._values), sample_size, replace=False))
+        return pd.Series(self._take_samples(positions), index=self._validation_index(positions), name=self._name,
+                         copy=False)
+
+    def _describe(self) -> str:
+        return f"{len(self._values)} samples of {self.dtype}"
+
+    def __repr__(self):
+        return f"""{type(self).__name__} @{id(self)}
+Units: '{self._time_index.name}':{self.units[self._time_index.name].dimensionality},'{self._name}':{self.units[self._name].dimensionality}
+{self._describe()}, index {self._time_index!r}"""
+
+    def read_only(self) -> ContinuousContainer:
+        view = copy.copy(self)
+        view._values = read_only(self._values)
+        view._data = None
+        return view
+
+    def cow_copy(self) -> ContinuousContainer:
+        """A deep copy, as NumPy arrays can not be copied on write"""
+        return self.deep_copy()
+
+    def deep_copy(self) -> ContinuousContainer:
+        return ContinuousContainer(self._values.copy(), self._time_index if isinstance(self._time_index, RegularTimeBase)
+                                   else self._time_index.copy(), self._name, self._units.copy())
+
+
+class SignalContainer(ContinuousContainer):
+    """Container for a continuous signal, which stores its samples quantized as integers (i.e. the int16 samples of an
+    ADC) together with the scale and offset to convert them into values: ``value = raw * scale + offset``.
+
+    The float series is only created when :attr:`data` is accessed. Consumers which only need parts of the signal should
+    use :meth:`samples` to dequantize it blockwise instead.
+
+    :param raw: quantized samples
+    :param index: index of the samples (i.e. the timestamps) or a time base
+    :param name: name of the signal
+    :param units: units of the signal and its index
+    :param scale: value of one quantization step
+    :param offset: value of the sample 0
+    :param dtype: dtype of the values, float32 or float64
+    """
+
+    def __init__(self, raw: np.ndarray, index: pd.Index | RegularTimeBase, name: str, units: dict[str, pq.Quantity],
+                 scale: float, offset: float = 0., dtype=np.float64):
+        if not np.issubdtype(raw.dtype, np.integer):
+            raise TypeError(f"Quantized samples must be integers, are {raw.dtype}")
+        super().__init__(raw, index, name, units)
+        self._scale = float(scale)
+        self._offset = float(offset)
+        self._dtype = float_dtype(dtype)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, index: pd.Index | RegularTimeBase, name: str,
+                    units: dict[str, pq.Quantity], scale: Optional[float] = None, offset: Optional[float] = None,
+                    raw_dtype=np.int16) -> SignalContainer:
+        """Quantizes float values losslessly.
+
+        :param values: float values
+        :param index: index of the values or a time base
+        :param name: name of the signal
+        :param units: units of the signal and its index
+        :param scale: value of one quantization step, estimated from the values if not given
+        :param offset: value of the sample 0, estimated from the values if not given
+        :param raw_dtype: integer dtype to store the samples as
+        :raise ValueError: if the values can not be quantized losslessly
+        :return: a container with the quantized values
+        """
+        if scale is None:
+            inferred = infer_quantization(values, dtype=raw_dtype)
+            if inferred is None:
+                raise ValueError("Could not infer a lossless quantization of the values")
+            scale, inferred_offset = inferred
+            offset = inferred_offset if offset is None else offset
+        offset = 0. if offset is None else offset
+        raw = quantize(values, scale, offset, dtype=raw_dtype)
+        return cls(raw, index, name, units, scale, offset, dtype=values.dtype)
+
+    @classmethod
+    def from_series(cls, series: pd.Series, units: dict[str, pq.Quantity], scale: Optional[float] = None,
+                    offset: Optional[float] = None, raw_dtype=np.int16) -> SignalContainer:
+        """Quantizes a float series losslessly, see :meth:`from_values`"""
+        return cls.from_values(series.values, series.index, series.name, units, scale=scale, offset=offset,
+                               raw_dtype=raw_dtype)
+
+    @property
+    def raw(self) -> np.ndarray:
+        return self._values
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+    @property
+    def offset(self) -> float:
+        return self._offset
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self._dtype)
+
+    def samples(self, start: int = 0, stop: Optional[int] = None, dtype=None) -> np.ndarray:
+        """Dequantizes the samples ``start:stop``.
+
+        :param dtype: dtype of the values, defaults to the dtype of the container
+        """
+        return dequantize(self._values[start:stop], self._scale, self._offset,
+                          self._dtype if dtype is None else dtype)
+
+    def _take_samples(self, positions: np.ndarray) -> np.ndarray:
+        return dequantize(self._take_raw(positions), self._scale, self._offset, self._dtype)
+
+    @property
+    def validation_data(self) -> pd.Series:
+        # dequantized integers are never NaN, so validating the structure is sufficient and avoids dequantizing
+        return self.structure_data
+
+    def _describe(self) -> str:
+        return f"{len(self._values)} samples of {self._values.dtype}, scale {self._scale}, offset {self._offset}"
+
+    def deep_copy(self) -> SignalContainer:
+        return SignalContainer(self._values.copy(), self._time_index if isinstance(self._time_index, RegularTimeBase)
+                               else self._time_index.copy(), self._name, self._units.copy(), self._scale,
+                               self._offset, dtype=self._dtype)
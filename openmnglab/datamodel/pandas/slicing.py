@@ -0,0 +1,158 @@
+"""Slicing of pandas containers by time.
+
+Containers are either signals or events:
+
+* Signals are continuous: :class:`~openmnglab.datamodel.pandas.signal.ContinuousContainer` or float series indexed only
+  by their timestamps. A slice of a signal contains all samples between two timestamps.
+* Events are all other containers with timestamps, either as an index level named
+  :data:`~openmnglab.datamodel.pandas.schemas.TIMESTAMP` or as their values (i.e. spike timestamps, which have a time
+  unit, or intervals, whose left edge is their timestamp). A slice of events contains the rows whose timestamp is
+  between two timestamps, so slicing events into consecutive ranges puts each row into exactly one slice.
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.array.model import ArrayContainer
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer, SignalContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+
+
+def is_signal(container: PandasContainer) -> bool:
+    """Whether the container holds a continuous signal"""
+    if isinstance(container, ContinuousContainer):
+        return True
+    if isinstance(container, ArrayContainer):
+        return False
+    data = container.data
+    return isinstance(data, pd.Series) and data.index.names == [schema.TIMESTAMP] and pd.api.types.is_float_dtype(data)
+
+
+def time_element(container: PandasContainer) -> Optional[str]:
+    """Name of the index level or values of an event container which contain its timestamps, if any"""
+    names = container.index_names if isinstance(container, ArrayContainer) else container.data.index.names
+    if schema.TIMESTAMP in names:
+        return schema.TIMESTAMP
+    name = next(iter(container.columns)) if isinstance(container, ArrayContainer) and container.is_series else \
+        container.data.name if isinstance(container.data, pd.Series) else None
+    if name is not None and name in container.units and \
+            container.units[name].simplified.dimensionality == pq.s.dimensionality:
+        return name
+    return None
+
+
+def event_times(container: PandasContainer, element: str) -> np.ndarray:
+    """The timestamps of the rows of an event container, see :func:`time_element`"""
+    if isinstance(container, ArrayContainer):
+        values = container.columns[element] if element in container.columns else \
+            container.index_column(element).values
+    else:
+        data = container.data
+        values = data.array if element == data.name else data.index.get_level_values(element)
+    if isinstance(values, (pd.arrays.IntervalArray, pd.IntervalIndex)):
+        return np.asarray(values.left)
+    return np.asarray(values)
+
+
+def time_extent(container: PandasContainer) -> Optional[tuple[float, float]]:
+    """The first and last timestamp of a signal or event container, ``None`` if it has no timestamps or is empty"""
+    if is_signal(container):
+        index = container.time_index if isinstance(container, ContinuousContainer) else container.data.index
+        return (index[0], index[len(index) - 1]) if len(index) > 0 else None
+    element = time_element(container)
+    if element is None:
+        return None
+    times = event_times(container, element)
+    return (float(np.nanmin(times)), float(np.nanmax(times))) if len(times) > 0 else None
+
+
+def slice_signal(container: PandasContainer, start: float, end: float) -> PandasContainer:
+    """The samples of a signal between two timestamps (both inclusive) without copying them"""
+    if not isinstance(container, ContinuousContainer):
+        return PandasContainer(container.data.loc[start:end], container.units)
+    time_index = container.time_index
+    lo, hi = time_index.slice_locs(start, end)
+    sliced_index = time_index.slice(lo, hi) if isinstance(time_index, RegularTimeBase) else time_index[lo:hi]
+    if isinstance(container, SignalContainer):
+        return SignalContainer(container.raw[lo:hi], sliced_index, container.name, container.units, container.scale,
+                               container.offset, dtype=container.dtype)
+    return ContinuousContainer(container.samples(lo, hi), sliced_index, container.name, container.units)
+
+
+def slice_events(container: PandasContainer, start: float, end: float, element: Optional[str] = None,
+                 closed: str = "both") -> PandasContainer:
+    """The rows of an event container whose timestamps are between two timestamps.
+
+    :param container: the event container
+    :param start: first timestamp
+    :param end: last timestamp
+    :param element: index level or values containing the timestamps, see :func:`time_element`
+    :param closed: which of the timestamps are included: "both" or "left"
+    :return: the container itself if all rows are between the timestamps, otherwise a container of the same type with
+        the selected rows
+    """
+    element = time_element(container) if element is None else element
+    times = event_times(container, element)
+    mask = (times >= start) & ((times <= end) if closed == "both" else (times < end))
+    if mask.all():
+        return container
+    if isinstance(container, ArrayContainer):
+        return container.take(np.flatnonzero(mask))
+    return PandasContainer(container.data[mask], container.units)
+
+
+def take_rows(container: PandasContainer, positions: np.ndarray) -> PandasContainer:
+    """The rows of a container at positions, in their order. Returns the container itself if they are all of its rows
+    in order."""
+    n_rows = len(container) if isinstance(container, ArrayContainer) else len(container.data)
+    if len(positions) == n_rows and np.array_equal(positions, np.arange(n_rows)):
+        return container
+    if isinstance(container, ArrayContainer):
+        return container.take(positions)
+    return PandasContainer(container.data.iloc[positions], container.units)
+
+
+class EventSlicer:
+    """Slices an event container by time repeatedly. The timestamps are sorted once, so each slice only takes a binary
+    search instead of comparing all timestamps. Events don't have to be sorted by time, i.e. spikes grouped by their
+    track.
+
+    :param container: the event container
+    :param element: index level or values containing the timestamps, see :func:`time_element`
+    """
+
+    def __init__(self, container: PandasContainer, element: Optional[str] = None):
+        self._container = container
+        times = event_times(container, time_element(container) if element is None else element)
+        self._order = np.argsort(times, kind="stable")
+        self._times = times[self._order]
+
+    def positions(self, start: float, end: float, closed: str = "both") -> np.ndarray:
+        """Positions of the rows whose timestamps are between two timestamps, in the order of the rows
+
+        :param closed: which of the timestamps are included: "both" or "left"
+        """
+        lo = np.searchsorted(self._times, start, side="left")
+        hi = np.searchsorted(self._times, end, side="right" if closed == "both" else "left")
+        return np.sort(self._order[lo:hi])
+
+    def slice(self, start: float, end: float, closed: str = "both") -> PandasContainer:
+        """The rows whose timestamps are between two timestamps, like :func:`slice_events`"""
+        return take_rows(self._container, self.positions(start, end, closed=closed))
+
+
+def concat(containers: Sequence[PandasContainer]) -> PandasContainer:
+    """Concatenates the rows of containers with the same structure and units.
+
+    :return: a container of the same type as the first one (an array or a pandas container)
+    """
+    if len(containers) == 1:
+        return containers[0]
+    combined = PandasContainer(pd.concat([container.data for container in containers]), containers[0].units)
+    return ArrayContainer.from_pandas(combined) if isinstance(containers[0], ArrayContainer) else combined
@@ -0,0 +1,279 @@
+"""A native recording store, which keeps all outputs of a reader (e.g. of a DAPSYS file or Spike2 export) in a
+directory, so they can be loaded without parsing the vendor format again.
+
+The directory contains a manifest (:data:`MANIFEST`) listing the outputs in the order of the reader together with a
+description of their schemas, and a subdirectory for each output:
+
+* Continuous signals are split into chunks of a fixed number of samples, each saved as its own ``.npy`` file or
+  compressed (see :mod:`openmnglab.datamodel.pandas.chunks`). The timestamp of the first sample of each chunk is kept
+  in a chunk index, so the chunks spanning a time range can be found without reading any samples. Regular time bases are
+  saved as their segments instead of timestamps, quantized signals keep their quantized samples.
+* All other outputs (spikes, stimuli, comments, ...) are saved with :func:`~openmnglab.datamodel.pandas.persistence.save`
+  and filtered by their timestamps when loading a time range.
+
+Uncompressed arrays are memory mapped when loading, so loading a time range only reads the chunks it spans. Compressed
+signals are loaded as :class:`~openmnglab.datamodel.pandas.chunks.ChunkedArray`, which decompress a chunk only when a
+slice of the signal touching it is accessed (i.e. by a window). Stores are only read, so any number of processes can
+load from the same store at once.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pandera as pa
+import quantities as pq
+
+from openmnglab.datamodel.pandas import persistence
+from openmnglab.datamodel.pandas.chunks import CODECS, ChunkedArray, chunked_array, save_compressed_chunks
+from openmnglab.datamodel.pandas.model import PandasContainer, PandasDataSchema
+from openmnglab.datamodel.pandas.persistence import _save_units, _load_units, _save_time_index, _load_time_index
+from openmnglab.datamodel.pandas.signal import ContinuousContainer, SignalContainer
+from openmnglab.datamodel.pandas.slicing import is_signal, slice_events, time_element
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+
+MANIFEST = "store.json"
+"""Name of the JSON file describing a store"""
+FORMAT = "openmnglab.store"
+VERSION = 2
+"""Latest version of the format, version 2 added compressed signals. Stores without compressed signals are written in
+version 1, so older readers can load them."""
+DEFAULT_CHUNK_SIZE = 2 ** 20
+"""Default number of samples of each chunk of a continuous signal"""
+CHUNK_INDEX = "chunk_starts.npy"
+"""Name of the file containing the timestamp of the first sample of each chunk"""
+
+_Entry = dict[str, Any]
+
+
+def _describe_index(index: pa.Index) -> _Entry:
+    return dict(name=index.name, dtype=str(index.dtype))
+
+
+def describe_schema(data_schema: PandasDataSchema) -> _Entry:
+    """Describes the structure of a pandas data schema (type, names and dtypes of its values and index levels) as a
+    JSON serializable dictionary. Checks of the schema are not part of the description.
+
+    :param data_schema: the schema to describe
+    :return: the description, see :func:`schema_from_description`
+    """
+    pandera_schema = data_schema.pandera_schema
+    index = pandera_schema.index
+    indexes = index.indexes if isinstance(index, pa.MultiIndex) else [index]
+    description = dict(index=[_describe_index(level) for level in indexes])
+    if isinstance(pandera_schema, pa.SeriesSchema):
+        return dict(type="series", name=pandera_schema.name, dtype=str(pandera_schema.dtype), **description)
+    return dict(type="dataframe", columns=[dict(name=name, dtype=str(column.dtype))
+                                           for name, column in pandera_schema.columns.items()], **description)
+
+
+def schema_from_description(description: _Entry) -> PandasDataSchema:
+    """Builds a pandas data schema from a description created by :func:`describe_schema`"""
+    indexes = [pa.Index(level["dtype"], name=level["name"]) for level in description["index"]]
+    index = pa.MultiIndex(indexes) if len(indexes) > 1 else indexes[0]
+    if description["type"] == "series":
+        return PandasDataSchema(pa.SeriesSchema(description["dtype"], index=index, name=description["name"]))
+    return PandasDataSchema(pa.DataFrameSchema({column["name"]: pa.Column(column["dtype"])
+                                                for column in description["columns"]}, index=index))
+
+
+def _as_continuous(container: PandasContainer) -> Optional[ContinuousContainer]:
+    """The container as a continuous signal, if it is one"""
+    if isinstance(container, ContinuousContainer):
+        return container
+    if not is_signal(container):
+        return None
+    data = container.data
+    return ContinuousContainer(data.values, data.index, data.name, container.units)
+
+
+def _save_chunked(directory: Path, stem: str, values: np.ndarray, chunk_size: int, codec: Optional[str]) -> _Entry:
+    if codec is not None:
+        return save_compressed_chunks(directory, stem, values, chunk_size, codec)
+    files = []
+    for i, start in enumerate(range(0, len(values), chunk_size)):
+        files.append(f"{stem}_{i:05d}.npy")
+        np.save(directory / files[-1], values[start:start + chunk_size], allow_pickle=False)
+    return dict(files=files, dtype=str(values.dtype))
+
+
+def _load_chunks(directory: Path, entry: _Entry, first: int, last: int, mmap: bool) -> np.ndarray:
+    chunks = [np.load(directory / file, mmap_mode="r" if mmap else None, allow_pickle=False)
+              for file in entry["files"][first:last]]
+    if not chunks:
+        return np.empty(0, dtype=entry["dtype"])
+    # a single chunk is passed on without copying, which keeps it memory mapped
+    return np.asarray(chunks[0]) if len(chunks) == 1 else np.concatenate(chunks)
+
+
+def _load_values(directory: Path, entry: _Entry, chunk_size: int, start: int, stop: int, mmap: bool,
+                 threads: Optional[int]) -> np.ndarray | ChunkedArray:
+    """The values ``start:stop`` of chunked values, compressed ones are decompressed on access"""
+    if "codec" in entry:
+        return chunked_array(directory, entry, chunk_size, start=start, stop=stop, threads=threads)
+    first, last = start // chunk_size, -(-stop // chunk_size)
+    return _load_chunks(directory, entry, first, last, mmap)[start - first * chunk_size:stop - first * chunk_size]
+
+
+def _save_continuous(directory: Path, container: ContinuousContainer, chunk_size: int,
+                     codec: Optional[str]) -> _Entry:
+    time_index = container.time_index
+    entry: _Entry = dict(name=container.name, chunk_size=chunk_size, length=len(time_index))
+    if isinstance(time_index, RegularTimeBase):
+        entry["time_index"] = _save_time_index(directory, time_index)
+    else:
+        entry["time_index"] = dict(name=time_index.name,
+                                   chunks=_save_chunked(directory, "times", time_index.values, chunk_size, codec))
+    chunk_starts = np.asarray([time_index[start] for start in range(0, len(time_index), chunk_size)], dtype=np.float64)
+    np.save(directory / CHUNK_INDEX, chunk_starts, allow_pickle=False)
+    if isinstance(container, SignalContainer):
+        entry.update(container="signal", scale=container.scale, offset=container.offset, dtype=str(container.dtype),
+                     values=_save_chunked(directory, "raw", container.raw, chunk_size, codec))
+    else:
+        entry.update(container="continuous",
+                     values=_save_chunked(directory, "values", container.samples(), chunk_size, codec))
+    return entry
+
+
+def _load_continuous(directory: Path, entry: _Entry, units: dict[str, pq.Quantity], start: float, end: float,
+                     mmap: bool, threads: Optional[int]) -> ContinuousContainer:
+    chunk_size = entry["chunk_size"]
+    time_entry = entry["time_index"]
+    if "chunks" in time_entry:
+        chunk_starts = np.load(directory / CHUNK_INDEX, allow_pickle=False)
+        first = max(int(np.searchsorted(chunk_starts, start, side="right")) - 1, 0)
+        last = int(np.searchsorted(chunk_starts, end, side="right"))
+        timestamps = np.asarray(_load_values(directory, time_entry["chunks"], chunk_size, first * chunk_size,
+                                             min(last * chunk_size, entry["length"]), mmap, threads))
+        lo, hi = np.searchsorted(timestamps, start, side="left"), np.searchsorted(timestamps, end, side="right")
+        time_index = pd.Index(timestamps[lo:hi], name=time_entry["name"], copy=False)
+        lo, hi = first * chunk_size + lo, first * chunk_size + hi
+    else:
+        time_base: RegularTimeBase = _load_time_index(directory, time_entry, mmap)
+        lo, hi = time_base.slice_locs(start, end)
+        time_index = time_base.slice(lo, hi)
+    values = _load_values(directory, entry["values"], chunk_size, lo, hi, mmap, threads)
+    if entry["container"] == "signal":
+        return SignalContainer(values, time_index, entry["name"], units, entry["scale"], entry["offset"],
+                               dtype=entry["dtype"])
+    return ContinuousContainer(values, time_index, entry["name"], units)
+
+
+def write_store(path: str | Path, containers: Sequence[Optional[PandasContainer]],
+                schemas: Sequence[PandasDataSchema], source: str = "",
+                chunk_size: int = DEFAULT_CHUNK_SIZE, compression: Optional[str] = None) -> Path:
+    """Writes the outputs of a reader into a store.
+
+    :param path: directory of the store, created if it does not exist
+    :param containers: the outputs of the reader. Outputs which were not loaded (``None``) are kept as such. Float
+        series indexed by timestamps are stored as continuous signals.
+    :param schemas: the schemas of the outputs, usually the ``produces`` of the reader definition
+    :param source: identifier of the data the store was created from, i.e. the path of the converted file
+    :param chunk_size: number of samples of each chunk of the continuous signals
+    :param compression: codec to compress the chunks of the continuous signals with (see
+        :data:`~openmnglab.datamodel.pandas.chunks.CODECS`), by default they are not compressed
+    :return: the path of the store
+    """
+    if len(containers) != len(schemas):
+        raise ValueError(f"Got {len(containers)} outputs but {len(schemas)} schemas")
+    if chunk_size < 1:
+        raise ValueError("chunk size must be positive")
+    if compression is not None and compression not in CODECS:
+        raise ValueError(f"Unknown codec '{compression}', must be one of {', '.join(CODECS)}")
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    outputs = []
+    for i, (container, data_schema) in enumerate(zip(containers, schemas)):
+        entry: _Entry = dict(schema=describe_schema(data_schema), directory=f"output{i}")
+        if container is not None:
+            output_directory = directory / entry["directory"]
+            output_directory.mkdir(exist_ok=True)
+            entry["units"] = _save_units(container.units)
+            continuous = _as_continuous(container)
+            if continuous is not None:
+                entry["continuous"] = _save_continuous(output_directory, continuous, chunk_size, compression)
+            else:
+                entry["time"] = time_element(container)
+                persistence.save(container, output_directory)
+        else:
+            entry["directory"] = None
+        outputs.append(entry)
+    with open(directory / MANIFEST, "w") as manifest_file:
+        json.dump(dict(format=FORMAT, version=1 if compression is None else VERSION, source=source, outputs=outputs),
+                  manifest_file, indent=2)
+    return directory
+
+
+class RecordingStore:
+    """Reads a store written by :func:`write_store`. Opening a store only reads its manifest.
+
+    :param path: directory of the store
+    :param mmap: memory map the arrays instead of reading them into memory
+    :param threads: maximum number of threads decompressing the chunks of a compressed signal, defaults to the number
+        of processors
+    """
+
+    def __init__(self, path: str | Path, mmap: bool = True, threads: Optional[int] = None):
+        self._path = Path(path)
+        self._mmap = mmap
+        self._threads = threads
+        with open(self._path / MANIFEST) as manifest_file:
+            manifest: _Entry = json.load(manifest_file)
+        if manifest.get("format") != FORMAT:
+            raise ValueError(f"{self._path} does not contain a recording store")
+        if manifest["version"] > VERSION:
+            raise ValueError(f"Store was written in version {manifest['version']} of the format, which is not supported")
+        self._manifest = manifest
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def source(self) -> str:
+        """Identifier of the data the store was created from"""
+        return self._manifest["source"]
+
+    @property
+    def schemas(self) -> tuple[PandasDataSchema, ...]:
+        """Schemas of the outputs of the store"""
+        return tuple(schema_from_description(output["schema"]) for output in self._manifest["outputs"])
+
+    def __len__(self) -> int:
+        return len(self._manifest["outputs"])
+
+    def load_output(self, i: int, start: float = -np.inf, end: float = np.inf) -> Optional[PandasContainer]:
+        """Loads the data of an output between two timestamps (both inclusive).
+
+        :param i: position of the output
+        :param start: first timestamp to load
+        :param end: last timestamp to load
+        :return: the container of the output or ``None`` if the output was not loaded when the store was written
+        """
+        entry = self._manifest["outputs"][i]
+        if entry["directory"] is None:
+            return None
+        directory = self._path / entry["directory"]
+        if "continuous" in entry:
+            return _load_continuous(directory, entry["continuous"], _load_units(entry["units"]), start, end,
+                                    self._mmap, self._threads)
+        container = persistence.load(directory, mmap=self._mmap)
+        if entry["time"] is None or (start == -np.inf and end == np.inf):
+            return container
+        return slice_events(container, start, end, element=entry["time"])
+
+    def load(self, start: float = -np.inf, end: float = np.inf) -> tuple[Optional[PandasContainer], ...]:
+        """Loads the data of all outputs between two timestamps (both inclusive), see :meth:`load_output`"""
+        return tuple(self.load_output(i, start=start, end=end) for i in range(len(self)))
+
+
+def find_stores(directory: str | Path) -> Iterator[Path]:
+    """Finds all stores inside a directory and its subdirectories
+
+    :param directory: the directory to search
+    :return: the directories of the found stores, sorted by their path
+    """
+    return (manifest.parent for manifest in sorted(Path(directory).rglob(MANIFEST)))
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class RegularTimeBase:
+    """Timestamps of a regularly sampled signal, calculated from a start time and a sampling interval instead of being
+    stored for every sample.
+
+    Recordings which consist of several pages (i.e. DAPSYS) are split into segments, one for each page, as the pages
+    may not be continuous. Sample ``i`` of a segment has the timestamp ``start + i * interval``, which matches the
+    timestamps the readers calculate for each page.
+
+    Implements the parts of the :class:`pandas.Index` interface used to locate intervals (``slice_locs``, item access,
+    ``name``, ``len``). Use :meth:`to_index` or :func:`materialize` to create the float64 index.
+
+    :param positions: position of the first sample of each segment, ascending. The first segment starts at position 0,
+        or before it if the time base is a slice of another one (see :meth:`slice`)
+    :param starts: timestamp of the first sample of each segment
+    :param intervals: sampling interval of each segment
+    :param length: total number of samples
+    :param name: name of the index
+    """
+
+    def __init__(self, positions: Sequence[int] | np.ndarray, starts: Sequence[float] | np.ndarray,
+                 intervals: Sequence[float] | np.ndarray, length: int, name: Optional[str] = None):
+        self._positions = np.asarray(positions, dtype=np.int64)
+        self._starts = np.asarray(starts, dtype=np.float64)
+        self._intervals = np.asarray(intervals, dtype=np.float64)
+        if not len(self._positions) == len(self._starts) == len(self._intervals):
+            raise ValueError("positions, starts and intervals must have the same length")
+        if len(self._positions) > 0 and (self._positions[0] > 0 or np.any(np.diff(self._positions) <= 0)
+                                         or self._positions[-1] >= length):
+            raise ValueError("segments must start at or before position 0, be ascending and not empty")
+        if len(self._positions) == 0 and length > 0:
+            raise ValueError(f"{length} samples without a segment")
+        self._length = int(length)
+        self._name = name
+
+    @classmethod
+    def regular(cls, start: float, interval: float, length: int, name: Optional[str] = None) -> RegularTimeBase:
+        """Time base of a single segment"""
+        return cls((0,) if length > 0 else (), (start,) if length > 0 else (), (interval,) if length > 0 else (),
+                   length, name=name)
+
+    @classmethod
+    def from_segments(cls, lengths: Sequence[int], starts: Sequence[float], intervals: Sequence[float],
+                      name: Optional[str] = None) -> RegularTimeBase:
+        """Time base of consecutive segments with the given number of samples. Empty segments are dropped."""
+        lengths, starts, intervals = (np.asarray(a) for a in (lengths, starts, intervals))
+        non_empty = lengths > 0
+        lengths = lengths[non_empty]
+        return cls(np.cumsum(lengths) - lengths, starts[non_empty], intervals[non_empty], int(lengths.sum()),
+                   name=name)
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._name
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(np.float64)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Position of the first sample of each segment"""
+        return self._positions
+
+    @property
+    def starts(self) -> np.ndarray:
+        """Timestamp of the first sample of each segment"""
+        return self._starts
+
+    @property
+    def intervals(self) -> np.ndarray:
+        """Sampling interval of each segment"""
+        return self._intervals
+
+    @property
+    def n_segments(self) -> int:
+        return len(self._positions)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _segment_end(self, segment: int) -> int:
+        return self._positions[segment + 1] if segment + 1 < len(self._positions) else self._length
+
+    def _at(self, segment: int, pos: int) -> float:
+        return self._starts[segment] + (pos - self._positions[segment]) * self._intervals[segment]
+
+    def __getitem__(self, pos: int) -> float:
+        if pos < 0:
+            pos += self._length
+        if not 0 <= pos < self._length:
+            raise IndexError(f"index {pos} is out of bounds for a time base of length {self._length}")
+        return self._at(np.searchsorted(self._positions, pos, side="right") - 1, pos)
+
+    def timestamps(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Calculates the timestamps of the samples ``start:stop``"""
+        start, stop, _ = slice(start, stop).indices(self._length)
+        stop = max(start, stop)
+        pos = np.arange(start, stop, dtype=np.int64)
+        if len(pos) == 0:
+            return pos.astype(np.float64)
+        ends = np.append(self._positions[1:], self._length)
+        lens = np.clip(ends, start, stop) - np.clip(self._positions, start, stop)
+        segments = np.repeat(np.arange(len(lens)), lens)
+        return self._starts[segments] + (pos - self._positions[segments]) * self._intervals[segments]
+
+    def slice(self, start: int = 0, stop: Optional[int] = None) -> RegularTimeBase:
+        """Time base of the samples ``start:stop``. The segments keep their start and interval, so the timestamps are
+        exactly the same as the ones of this time base."""
+        start, stop, _ = slice(start, stop).indices(self._length)
+        stop = max(start, stop)
+        ends = np.append(self._positions[1:], self._length)
+        keep = (ends > start) & (self._positions < stop)
+        return RegularTimeBase(self._positions[keep] - start, self._starts[keep], self._intervals[keep], stop - start,
+                               name=self._name)
+
+    def to_index(self) -> pd.Index:
+        return pd.Index(self.timestamps(), name=self._name, copy=False)
+
+    def searchsorted(self, value: float, side: str = "left") -> int:
+        """Position to insert ``value`` to keep the timestamps sorted, like :meth:`numpy.ndarray.searchsorted`.
+        Only the segment containing the value is searched, the position inside of it is calculated."""
+        if math.isinf(value):
+            return 0 if value < 0 else self._length
+        segment = np.searchsorted(self._starts, value, side="right") - 1
+        if segment < 0:
+            return 0
+        first = self._positions[segment]
+        seg_start, seg_end = max(first, 0), self._segment_end(segment)
+        steps = (value - self._starts[segment]) / self._intervals[segment]
+        pos = min(max(first + (math.floor(steps) if side == "right" else math.ceil(steps)), seg_start), seg_end)
+        # correct the rounding of the division with the actual timestamps
+        if side == "left":
+            while pos > seg_start and self._at(segment, pos - 1) >= value:
+                pos -= 1
+            while pos < seg_end and self._at(segment, pos) < value:
+                pos += 1
+        else:
+            while pos > seg_start and self._at(segment, pos - 1) > value:
+                pos -= 1
+            while pos < seg_end and self._at(segment, pos) <= value:
+                pos += 1
+        return int(pos)
+
+    def slice_locs(self, start: Optional[float] = None, end: Optional[float] = None) -> tuple[int, int]:
+        """Same as :meth:`pandas.Index.slice_locs` for a monotonic increasing index"""
+        return (0 if start is None else self.searchsorted(start, side="left"),
+                self._length if end is None else self.searchsorted(end, side="right"))
+
+    def __repr__(self):
+        return f"RegularTimeBase(name={self._name!r}, length={self._length}, segments={self.n_segments})"
+
+
+def materialize(index: pd.Index | RegularTimeBase) -> pd.Index:
+    """Returns the index itself or the float64 index of a time base"""
+    return index.to_index() if isinstance(index, RegularTimeBase) else index
+
+
+def time_values(index: pd.Index | RegularTimeBase, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+    """Returns the values ``start:stop`` of an index or time base"""
+    return index.timestamps(start, stop) if isinstance(index, RegularTimeBase) else index.values[start:stop]
@@ -1 +1,3 @@
 from openmnglab.execution.singlethreaded import SingleThreadedExecutor
+from openmnglab.model.datamodel.interface import ValidationLevel
+from openmnglab.execution.streaming import StreamingExecutor
@@ -1,7 +1,10 @@
-from typing import Mapping, Iterable
+from contextlib import nullcontext
+from typing import Mapping, Iterable, ContextManager, Sequence
+
+import pandas as pd
 
 from openmnglab.execution.exceptions import FunctionInputError, FunctionExecutionError, FunctionReturnCountMissmatch
-from openmnglab.model.datamodel.interface import IDataContainer
+from openmnglab.model.datamodel.interface import IDataContainer, IDataSchema, ValidationLevel
 from openmnglab.model.execution.interface import IExecutor
 from openmnglab.model.functions.interface import IFunction
 from openmnglab.model.planning.interface import IDataReference
@@ -10,8 +13,32 @@ from openmnglab.util.iterables import ensure_iterable
 
 
 class SingleThreadedExecutor(IExecutor):
-    def __init__(self):
+    """Executes the stages of a plan one after another.
+
+    :param validation: how thoroughly the outputs of each stage are validated against their planned schemas. The
+        structural validation only checks names, index levels and dtypes and does not scan the data. Use
+        :attr:`ValidationLevel.FULL` while developing functions.
+    :param sample_size: number of elements validated per output with :attr:`ValidationLevel.SAMPLED`
+    :param copy_on_write: share the outputs of each stage between all consumers as read only views and execute the
+        stages with pandas' copy-on-write mode enabled. Functions which declare that they modify their input
+        (:attr:`~openmnglab.model.functions.interface.IFunction.mutates_input`) receive copy-on-write clones instead.
+        If disabled, all consumers receive the same container.
+    """
+
+    def __init__(self, validation: ValidationLevel = ValidationLevel.STRUCTURAL, sample_size: int = 10_000,
+                 copy_on_write: bool = True):
         self._data: dict[bytes, IDataContainer] = dict()
+        self._validation = ValidationLevel(validation)
+        self._sample_size = sample_size
+        self._copy_on_write = copy_on_write
+
+    @property
+    def validation(self) -> ValidationLevel:
+        return self._validation
+
+    @property
+    def copy_on_write(self) -> bool:
+        return self._copy_on_write
 
     @property
     def data(self) -> Mapping[bytes, IDataContainer]:
@@ -38,15 +65,28 @@ class SingleThreadedExecutor(IExecutor):
         except Exception as e:
             raise FunctionExecutionError("function failed to execute") from e
 
-    def compute_stage(self, stage: IStage):
-        """Runs the function a stage and stores it output.
+    def _pandas_mode(self) -> ContextManager:
+        return pd.option_context("mode.copy_on_write", True) if self._copy_on_write else nullcontext()
 
-        .. warn:: Caller must ensure that required input data of the stage is present in :attr:`~.data`
-        """
-        try:
-            input_values = tuple(self._data[dependency.planning_id] for dependency in stage.data_in)
+    def _input_for(self, func: IFunction, data_container: IDataContainer) -> IDataContainer:
+        return data_container.cow_copy() if self._copy_on_write and func.mutates_input else data_container
+
+    def _share(self, data_container: IDataContainer) -> IDataContainer:
+        return data_container.read_only() if self._copy_on_write else data_container
+
+    def _validate(self, schema: IDataSchema, data_container: IDataContainer):
+        if self._validation is ValidationLevel.STRUCTURAL:
+            schema.validate_structure(data_container)
+        elif self._validation is ValidationLevel.SAMPLED:
+            schema.validate_sampled(data_container, self._sample_size)
+        elif self._validation is ValidationLevel.FULL:
+            schema.validate(data_container)
+
+    def _run_stage(self, stage: IStage, input_values: Sequence[IDataContainer]) -> tuple[IDataContainer, ...]:
+        """Runs the function of a stage with the given input and returns its validated outputs, ready to be shared"""
+        with self._pandas_mode():
             func = stage.definition.new_function()
-            self._set_func_input(func, *input_values)
+            self._set_func_input(func, *(self._input_for(func, input_value) for input_value in input_values))
             results: tuple[IDataContainer] = tuple(self._exec_func(func))
             if len(results) != len(stage.data_out):
                 raise FunctionReturnCountMissmatch(expected=len(stage.data_out), actual=len(results))
@@ -54,9 +94,19 @@ class SingleThreadedExecutor(IExecutor):
                 actual_data_output: IDataContainer
                 planned_data_output: IVirtualData
                 try:
-                    planned_data_output.schema.validate(actual_data_output)
+                    self._validate(planned_data_output.schema, actual_data_output)
                 except Exception as e:
                     raise Exception(f"Schema validation of output #{i} failed") from e
+            return tuple(self._share(actual_data_output) for actual_data_output in results)
+
+    def compute_stage(self, stage: IStage):
+        """Runs the function a stage and stores it output.
+
+        .. warn:: Caller must ensure that required input data of the stage is present in :attr:`~.data`
+        """
+        try:
+            outputs = self._run_stage(stage, tuple(self._data[dependency.planning_id] for dependency in stage.data_in))
+            for planned_data_output, actual_data_output in zip(stage.data_out, outputs):
                 self._data[planned_data_output.planning_id] = actual_data_output
         except Exception as e:
             raise FunctionExecutionError(
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import quantities as pq
+
+from openmnglab.datamodel.array.model import ArrayContainer, pandas_index
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.slicing import is_signal, time_element, time_extent, slice_signal, concat, \
+    take_rows, EventSlicer
+from openmnglab.execution.exceptions import FunctionExecutionError
+from openmnglab.execution.singlethreaded import SingleThreadedExecutor
+from openmnglab.model.datamodel.interface import IDataContainer, ValidationLevel
+from openmnglab.model.planning.plan.interface import IExecutionPlan, IStage
+
+
+def _n_rows(container: PandasContainer) -> int:
+    return len(container) if isinstance(container, ArrayContainer) else len(container.data)
+
+
+def _event_index(container: PandasContainer) -> pd.Index:
+    return pandas_index(container.index_columns) if isinstance(container, ArrayContainer) else container.data.index
+
+
+class StreamingExecutor(SingleThreadedExecutor):
+    """Executes a plan like :class:`~openmnglab.execution.singlethreaded.SingleThreadedExecutor`, but runs consecutive
+    stages of chunkable functions (see :attr:`~openmnglab.model.functions.interface.IFunctionDefinition.chunkable`,
+    i.e. intervals, windows, SPDF components and features) over time chunks of their input, so only the intermediate
+    data of one chunk is held in memory at once.
+
+    The inputs these stages receive from the rest of the plan are sliced by time (see
+    :mod:`openmnglab.datamodel.pandas.slicing`):
+
+    * events (spikes, intervals, ...) into consecutive chunks of ``chunk_duration``, so each event is processed in
+      exactly one chunk,
+    * signals into the same chunks extended by ``overlap`` on both sides, so windows and diff levels reaching over the
+      boundary of a chunk are complete.
+
+    Chunks without any events are skipped. The outputs of the chunks are combined by
+    :meth:`~openmnglab.model.functions.interface.IFunctionDefinition.reduce_chunks` of the function definition or
+    concatenated, and their rows are put into the order of the events they belong to. Only the outputs which are
+    consumed by stages running on the complete data or which are not consumed by any stage of the plan are combined and
+    kept, intermediate outputs (i.e. the windows, if only the features are used) are discarded after each chunk.
+
+    Functions which derive parameters from their input see the chunk instead of the complete data, i.e.
+    :class:`~openmnglab.functions.processing.windows.Windows` approximates the sampling interval from the first samples
+    of the signal chunk if no ``interval`` is given.
+
+    Signals are only sliced, not copied, so they should be loaded lazily (i.e. from a
+    :class:`~openmnglab.functions.input.readers.native_store_reader.NativeStoreReader`) to bound the memory.
+
+    :param chunk_duration: duration of each chunk, in the time unit of the data
+    :param overlap: time the signal chunks extend beyond their chunk on both sides. Must be at least the length of the
+        longest window plus the time of the samples the diff levels need before a window, streaming raises a
+        :class:`ValueError` if it is smaller than the
+        :meth:`~openmnglab.model.functions.interface.IFunctionDefinition.chunk_reach` of the chunked stages.
+    :param validation: see :class:`~openmnglab.execution.singlethreaded.SingleThreadedExecutor`. The output of each
+        chunk is validated.
+    :param sample_size: see :class:`~openmnglab.execution.singlethreaded.SingleThreadedExecutor`
+    :param copy_on_write: see :class:`~openmnglab.execution.singlethreaded.SingleThreadedExecutor`
+    """
+
+    def __init__(self, chunk_duration: float, overlap: float = 0.1,
+                 validation: ValidationLevel = ValidationLevel.STRUCTURAL, sample_size: int = 10_000,
+                 copy_on_write: bool = True):
+        super().__init__(validation=validation, sample_size=sample_size, copy_on_write=copy_on_write)
+        if chunk_duration <= 0:
+            raise ValueError("chunk duration must be positive")
+        if overlap < 0:
+            raise ValueError("overlap must not be negative")
+        self._chunk_duration = chunk_duration
+        self._overlap = overlap
+        self._discarded: set[bytes] = set()
+
+    @property
+    def chunk_duration(self) -> float:
+        return self._chunk_duration
+
+    @property
+    def overlap(self) -> float:
+        return self._overlap
+
+    def _streamable(self, stage: IStage, streamed: set[bytes]) -> bool:
+        """Whether the stage can run in the current streaming pass, whose stages produce ``streamed``"""
+        if not stage.definition.chunkable or not stage.data_in:
+            return False
+        has_events = False
+        for dependency in stage.data_in:
+            if dependency.planning_id in streamed:
+                has_events = True
+                continue
+            container = self._data.get(dependency.planning_id)
+            if not isinstance(container, PandasContainer):
+                return False
+            if is_signal(container):
+                continue
+            if time_element(container) is None:
+                return False
+            has_events = True
+        return has_events
+
+    def _chunks(self, events: dict[bytes, str]) -> Optional[np.ndarray]:
+        """(2, n) array with the start and end of each chunk spanning the events, ``None`` if there are none. The end
+        of the last chunk is infinite, so it contains the last event regardless of rounding."""
+        extents = [extent for extent in (time_extent(self._data[data_id]) for data_id in events) if extent is not None]
+        if not extents:
+            return None
+        start, end = min(extent[0] for extent in extents), max(extent[1] for extent in extents)
+        starts = start + np.arange(int((end - start) // self._chunk_duration) + 1) * self._chunk_duration
+        ends = starts + self._chunk_duration
+        ends[-1] = np.inf
+        return np.stack((starts, ends))
+
+    def _run_chunk(self, stages: Sequence[IStage], inputs: dict[bytes, IDataContainer], chunk: str) \
+            -> dict[bytes, IDataContainer]:
+        chunk_data = dict(inputs)
+        for stage in stages:
+            try:
+                outputs = self._run_stage(stage, tuple(chunk_data[dependency.planning_id]
+                                                       for dependency in stage.data_in))
+            except Exception as e:
+                raise FunctionExecutionError(f"Failed to execute {stage.definition.identifier} "
+                                             f"(stage {stage.planning_id.hex()}) for the chunk {chunk}") from e
+            for planned_data_output, actual_data_output in zip(stage.data_out, outputs):
+                chunk_data[planned_data_output.planning_id] = actual_data_output
+        return chunk_data
+
+    def _check_overlap(self, stages: Sequence[IStage], events: dict[bytes, str]):
+        """Raises a :class:`ValueError` if the overlap of the signal chunks is smaller than the reach of the stages
+        (see :meth:`~openmnglab.model.functions.interface.IFunctionDefinition.chunk_reach`)"""
+        reaches: dict[bytes, tuple[float, float]] = dict()
+        required = 0.
+        for stage in stages:
+            reach = stage.definition.chunk_reach(*(reaches.get(dependency.planning_id, (0., 0.))
+                                                   for dependency in stage.data_in))
+            reaches.update((output.planning_id, reach) for output in stage.data_out)
+            required = max(required, *reach)
+        data_id, element = next(iter(events.items()))
+        required = float((required * pq.s).rescale(self._data[data_id].units[element]).magnitude)
+        if self._overlap < required:
+            raise ValueError(f"The overlap of {self._overlap} is smaller than the {required} the chunked stages "
+                             f"reach beyond their events, windows at the boundaries of the chunks would be truncated")
+
+    @staticmethod
+    def _restore_order(container: IDataContainer, event_indexes: Sequence[pd.Index]) -> IDataContainer:
+        """Sorts the rows of a combined output by the positions of the events they belong to, which are identified by
+        the leading levels of its index. Chunks contain the events in the order of their timestamps, the complete
+        input (i.e. spikes grouped by their track) may not."""
+        if not isinstance(container, PandasContainer):
+            return container
+        names = container.index_names if isinstance(container, ArrayContainer) else container.data.index.names
+        for event_index in event_indexes:
+            n_levels = event_index.nlevels
+            if list(names[:n_levels]) != list(event_index.names) or not event_index.is_unique:
+                continue
+            if isinstance(container, ArrayContainer):
+                leading = pandas_index(container.index_columns[:n_levels])
+            else:
+                index = container.data.index
+                leading = index.droplevel(list(range(n_levels, index.nlevels))) if n_levels < index.nlevels else index
+            positions = event_index.get_indexer(leading)
+            if (positions < 0).any():
+                continue
+            if (np.diff(positions) < 0).any():
+                return take_rows(container, np.argsort(positions, kind="stable"))
+            return container
+        return container
+
+    def stream_stages(self, stages: Sequence[IStage], keep: set[bytes]):
+        """Runs chunkable stages over time chunks of their input and stores their combined outputs. The rows of the
+        combined outputs are in the order of the events they belong to, like the outputs of running the stages on the
+        complete input.
+
+        .. warn:: Caller must ensure that the stages are sorted by their depth and that the input data of the stages
+            not produced by them is present in :attr:`~.data`
+
+        :param stages: the stages
+        :param keep: planning ids of the outputs to combine and store, all others are discarded
+        """
+        produced = {output.planning_id for stage in stages for output in stage.data_out}
+        external = {dependency.planning_id for stage in stages for dependency in stage.data_in
+                    if dependency.planning_id not in produced}
+        events = {data_id: time_element(self._data[data_id]) for data_id in external
+                  if not is_signal(self._data[data_id])}
+        chunks = self._chunks(events)
+        if chunks is None:
+            # no events to split, so the complete data is a single chunk
+            chunks_data = [self._run_chunk(stages, {data_id: self._data[data_id] for data_id in external}, "all")]
+        else:
+            self._check_overlap(stages, events)
+            slicers = {data_id: EventSlicer(self._data[data_id], element) for data_id, element in events.items()}
+            chunks_data = []
+            for start, end in chunks.T:
+                inputs = {data_id: slicer.slice(start, end, closed="left") for data_id, slicer in slicers.items()}
+                if all(_n_rows(container) == 0 for container in inputs.values()):
+                    continue
+                inputs.update({data_id: slice_signal(self._data[data_id], start - self._overlap, end + self._overlap)
+                               for data_id in external if data_id not in events})
+                chunk_data = self._run_chunk(stages, inputs, f"[{start}, {end})")
+                chunks_data.append({data_id: chunk_data[data_id] for data_id in keep if data_id in chunk_data})
+        event_indexes = [_event_index(self._data[data_id]) for data_id in events] if chunks is not None else []
+        for stage in stages:
+            for i, planned_data_output in enumerate(stage.data_out):
+                data_id = planned_data_output.planning_id
+                if data_id not in keep:
+                    self._discarded.add(data_id)
+                    continue
+                chunks = [chunk_data[data_id] for chunk_data in chunks_data]
+                combined = stage.definition.reduce_chunks(i, chunks)
+                combined = self._restore_order(combined if combined is not None else concat(chunks), event_indexes)
+                self._data[data_id] = self._share(combined)
+                self._discarded.discard(data_id)
+
+    def execute(self, plan: IExecutionPlan, ignore_previous=False):
+        stages = sorted(plan.stages.values(), key=lambda x: x.depth)
+        consumers: dict[bytes, set[bytes]] = dict()
+        for stage in stages:
+            for dependency in stage.data_in:
+                consumers.setdefault(dependency.planning_id, set()).add(stage.planning_id)
+        # discarded intermediates are only recomputed if a stage which has to run consumes them
+        required: set[bytes] = set()
+        for stage in reversed(stages):
+            missing = [output.planning_id for output in stage.data_out if output.planning_id not in self._data]
+            if ignore_previous or any(data_id not in self._discarded or consumers.get(data_id, set()) & required
+                                      for data_id in missing):
+                required.add(stage.planning_id)
+        batch: list[IStage] = []
+        streamed: set[bytes] = set()
+
+        def flush():
+            batch_ids = {stage.planning_id for stage in batch}
+            self.stream_stages(batch, {data_id for data_id in streamed
+                                       if not consumers.get(data_id, set()) <= batch_ids
+                                       or not consumers.get(data_id)})
+            batch.clear()
+            streamed.clear()
+
+        for stage in (stage for stage in stages if stage.planning_id in required):
+            if self._streamable(stage, streamed):
+                batch.append(stage)
+                streamed.update(output.planning_id for output in stage.data_out)
+                continue
+            if any(dependency.planning_id in streamed for dependency in stage.data_in):
+                flush()
+            self.compute_stage(stage)
+        if batch:
+            flush()
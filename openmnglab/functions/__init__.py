@@ -1,6 +1,32 @@
-from openmnglab.functions.input.readers.dapsys_reader import DapsysReader
-from openmnglab.functions.plot.waveforms import WaveformPlot, WaveformPlotMode
-from openmnglab.functions.processing.windows import Windows
-from openmnglab.functions.analysis.spdf_components import SPDFComponents
-from openmnglab.functions.analysis.spdf_features import SPDFFeatures
-from openmnglab.functions.processing.static_intervals import StaticIntervals
+from typing import TYPE_CHECKING
+
+from openmnglab.util.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from openmnglab.functions.input.readers.dapsys_reader import DapsysReader
+    from openmnglab.functions.input.readers.native_store_reader import NativeStoreReader
+    from openmnglab.functions.plot.waveforms import WaveformPlot, WaveformPlotMode
+    from openmnglab.functions.processing.windows import Windows
+    from openmnglab.functions.analysis.spdf_components import SPDFComponents
+    from openmnglab.functions.analysis.spdf_features import SPDFFeatures
+    from openmnglab.functions.processing.static_intervals import StaticIntervals
+    from openmnglab.functions.processing.static_windows import StaticWindows
+    from openmnglab.functions.processing.time_slice import TimeSlice
+
+# function definitions are only imported on first access, so workers which don't plot don't pay for importing matplotlib
+_EXPORTS = {
+    "DapsysReader": "openmnglab.functions.input.readers.dapsys_reader",
+    "NativeStoreReader": "openmnglab.functions.input.readers.native_store_reader",
+    "WaveformPlot": "openmnglab.functions.plot.waveforms",
+    "WaveformPlotMode": "openmnglab.functions.plot.waveforms",
+    "Windows": "openmnglab.functions.processing.windows",
+    "SPDFComponents": "openmnglab.functions.analysis.spdf_components",
+    "SPDFFeatures": "openmnglab.functions.analysis.spdf_features",
+    "StaticIntervals": "openmnglab.functions.processing.static_intervals",
+    "StaticWindows": "openmnglab.functions.processing.static_windows",
+    "TimeSlice": "openmnglab.functions.processing.time_slice",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,19 +1,28 @@
-from typing import Sequence
+from typing import Sequence, Literal
 
 import numpy as np
 import quantities as pq
+from numba import types
 from pandas import DataFrame
 
+from openmnglab.datamodel.array.model import ArrayContainer
 from openmnglab.datamodel.pandas.model import PandasContainer
 from openmnglab.functions.base import FunctionBase
+from openmnglab.functions.helpers.general import window_bounds, window_bounds_of, window_keys, kernel_level, \
+    container_index_names
 from openmnglab.functions.processing.funcs.windows import LEVEL_COLUMN
+from openmnglab.util.arrays import read_only
+from openmnglab.util.kernels import kernel, array, input_array, INDEX_CODES
+
+SPDF_ALGORITHM = Literal["alt1", "original"]
 
 
 def get_zerocorssings(vals: np.ndarray) -> np.ndarray:
     sings = np.sign(vals)
     zerocorssings = np.empty(len(vals), dtype=bool)
-    for i in range(1, len(vals)):
-        zerocorssings[i] = sings[i] != sings[i - 1]
+    if len(vals) > 0:
+        zerocorssings[0] = False
+        zerocorssings[1:] = sings[1:] != sings[:-1]
     return zerocorssings
 
 
@@ -82,31 +91,164 @@ def get_principle_components_alt1(idx: np.ndarray, diff1: np.ndarray):
     return p1, p2, p3, p4, p5, p6
 
 
+@kernel()
+def _argmin(values: np.ndarray, start: int, stop: int) -> int:
+    # like np.argmin, the first NaN is considered the minimum
+    min_i = start
+    for i in range(start, stop):
+        if np.isnan(values[i]):
+            return i
+        if values[i] < values[min_i]:
+            min_i = i
+    return min_i
+
+
+@kernel()
+def _argmax(values: np.ndarray, start: int, stop: int) -> int:
+    # like np.argmax, the first NaN is considered the maximum
+    max_i = start
+    for i in range(start, stop):
+        if np.isnan(values[i]):
+            return i
+        if values[i] > values[max_i]:
+            max_i = i
+    return max_i
+
+
+@kernel()
+def _is_zerocrossing(diff1: np.ndarray, i: int) -> bool:
+    return np.sign(diff1[i]) != np.sign(diff1[i - 1])
+
+
+@kernel()
+def _first_zerocrossing(diff1: np.ndarray, start: int, stop: int, default: int) -> int:
+    for i in range(start, stop):
+        if _is_zerocrossing(diff1, i):
+            return i
+    return default
+
+
+@kernel()
+def _last_zerocrossing(diff1: np.ndarray, start: int, stop: int, default: int) -> int:
+    for i in range(stop - 1, start - 1, -1):
+        if _is_zerocrossing(diff1, i):
+            return i
+    return default
+
+
+@kernel()
+def _components_alt1(diff1: np.ndarray, start: int, stop: int, positions: np.ndarray):
+    p2 = _argmin(diff1, start, stop)
+    positions[1] = p2
+    if start < p2:
+        positions[0] = _last_zerocrossing(diff1, start + 1, p2, p2 - 1)
+    if p2 < stop - 1:
+        p4 = _argmax(diff1, p2 + 1, stop)
+        positions[3] = p4
+        if p4 - p2 > 1:
+            positions[2] = _first_zerocrossing(diff1, p2 + 1, p4, p2 + 1)
+        if p4 < stop - 1:
+            p6 = _argmin(diff1, p4 + 1, stop)
+            positions[5] = p6
+            if p6 - p4 > 1:
+                positions[4] = _first_zerocrossing(diff1, p4 + 1, p6, p4 + 1)
+
+
+@kernel()
+def _components_original(diff1: np.ndarray, start: int, stop: int, positions: np.ndarray):
+    half = (stop - start) // 2
+    if half == 0:
+        return
+    p2 = _argmin(diff1, start, start + half)
+    positions[1] = p2
+    # for p2 at the start of the window, the search for P1 wraps around to the end of the window
+    positions[0] = _last_zerocrossing(diff1, start + 1, p2, p2 - 1) if start < p2 else \
+        _last_zerocrossing(diff1, start + 1, stop, stop - 1)
+    p3 = _first_zerocrossing(diff1, p2 + 1, stop, p2 + 1)
+    positions[2] = p3
+    if p3 + 1 < stop:
+        p5 = _first_zerocrossing(diff1, p3 + 1, stop, p3 + 1)
+        positions[4] = p5
+        if p3 + 1 < p5:
+            positions[3] = _argmax(diff1, p3 + 1, p5)
+        if p5 + 1 < stop:
+            positions[5] = _argmin(diff1, p5 + 1, stop)
+
+
+@kernel(*((input_array(dtype), input_array(types.float64), codes, array(types.int64), types.boolean)
+          for dtype in (types.float64, types.float32) for codes in INDEX_CODES))
+def _spdf_components_kernel(diff1: np.ndarray, level_values: np.ndarray, level_codes: np.ndarray, bounds: np.ndarray,
+                            alt1: bool) -> np.ndarray:
+    n_windows = len(bounds) - 1
+    components = np.full((6, n_windows), np.nan, dtype=level_values.dtype)
+    positions = np.empty(6, dtype=np.int64)
+    for window_i in range(n_windows):
+        start, stop = bounds[window_i], bounds[window_i + 1]
+        if stop <= start:
+            continue
+        positions[:] = -1
+        if alt1:
+            _components_alt1(diff1, start, stop, positions)
+        else:
+            _components_original(diff1, start, stop, positions)
+        for component_i in range(6):
+            if positions[component_i] >= 0:
+                components[component_i, window_i] = level_values[level_codes[positions[component_i]]]
+    return components
+
+
+def spdf_components(diff1: np.ndarray, level_values: np.ndarray, level_codes: np.ndarray, bounds: np.ndarray,
+                    algorithm: SPDF_ALGORITHM = "alt1") -> np.ndarray:
+    """Calculates the SPDF components P1 to P6 of all windows in one compiled pass.
+
+    :param diff1: flat array of the first level diffs of all windows
+    :param level_values: values of the timestamp index level
+    :param level_codes: codes of the timestamp index level, mapping each element of ``diff1`` to its timestamp
+    :param bounds: bounds of the windows (see :func:`~openmnglab.functions.helpers.general.window_bounds`)
+    :param algorithm: "alt1" to use the algorithm of :func:`get_principle_components_alt1`, "original" to use the one
+        of :func:`get_principle_components`
+    :return: (6, n_windows) matrix with the timestamps of the components. Components which could not be found are NaN.
+    """
+    assert algorithm in ("alt1", "original")
+    return _spdf_components_kernel(read_only(diff1), read_only(level_values), level_codes, bounds, algorithm == "alt1")
+
+
 class SPDFComponentsFunc(FunctionBase):
-    def __init__(self):
+    def __init__(self, algorithm: SPDF_ALGORITHM = "alt1", arrays=False):
         self._diffs: PandasContainer[DataFrame] = None
+        self._algorithm = algorithm
+        self._arrays = arrays
 
-    def calc_components(self):
-        grpby = self._diffs.data.groupby(level=tuple((i for i in range(self._diffs.data.index.nlevels - 1))),
-                                         sort=False)
-        components = np.empty((6, len(grpby)), dtype=self._diffs.data.index.levels[-1].dtype)
-        for i, (loc, group) in enumerate(grpby):
-            lvl_vals = group.index.get_level_values(-1)
-            diff1 = group[LEVEL_COLUMN[1]].values
-            components[:, i] = get_principle_components_alt1(lvl_vals, diff1)
-        return components
+    def calc_components(self, bounds: np.ndarray):
+        index = self._diffs.data.index
+        return spdf_components(self._diffs.data[LEVEL_COLUMN[1]].values, index.levels[-1].values, index.codes[-1],
+                               bounds, algorithm=self._algorithm)
 
     def build_unitdict(self):
         units: dict[str, pq.Quantity] = dict()
-        for interval_index_name in self._diffs.data.index.names[:-1]:
+        *interval_index_names, time_index_name = container_index_names(self._diffs)
+        for interval_index_name in interval_index_names:
             units[interval_index_name] = self._diffs.units[interval_index_name]
         for column_name in SPDF_COMPONENTS:
-            units[column_name] = self._diffs.units[self._diffs.data.index.names[-1]]
+            units[column_name] = self._diffs.units[time_index_name]
         return units
 
+    def _execute_arrays(self) -> ArrayContainer:
+        diffs = ArrayContainer.from_pandas(self._diffs)
+        *window_columns, time_column = diffs.index_columns
+        bounds = window_bounds_of(window_keys(window_columns), len(diffs))
+        components = spdf_components(np.ascontiguousarray(diffs.column(LEVEL_COLUMN[1])), *kernel_level(time_column),
+                                     bounds, algorithm=self._algorithm)
+        return ArrayContainer(dict(zip(SPDF_COMPONENTS, components)),
+                              [window_column.take(bounds[:-1]) for window_column in window_columns],
+                              self.build_unitdict())
+
     def execute(self) -> PandasContainer[DataFrame]:
-        idx = self._diffs.data.index.droplevel(-1).unique()
-        components = self.calc_components()
+        if self._arrays:
+            return self._execute_arrays()
+        bounds = window_bounds(self._diffs.data.index)
+        idx = self._diffs.data.index.droplevel(-1)[bounds[:-1]]
+        components = self.calc_components(bounds)
         df = DataFrame(data=components.T, columns=SPDF_COMPONENTS, index=idx)
         return PandasContainer(df, units=self.build_unitdict())
 
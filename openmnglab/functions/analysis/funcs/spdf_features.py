@@ -1,19 +1,35 @@
+import math
 import sys
 from math import log, e
-from typing import Self
+from typing import Self, Sequence
 
 import numpy as np
 import quantities as pq
-from pandas import Series, DataFrame
+from numba import types
+from pandas import Series, DataFrame, Index
 
+from openmnglab.datamodel.array.model import ArrayContainer, pandas_index
 from openmnglab.datamodel.pandas.model import PandasContainer
 from openmnglab.functions.base import FunctionBase
+from openmnglab.functions.helpers.general import window_bounds, window_bounds_of, window_keys, kernel_level, \
+    container_index_names
 from openmnglab.functions.processing.funcs.windows import LEVEL_COLUMN
 from openmnglab.functions.analysis.funcs.spdf_components import SPDF_COMPONENTS
-from openmnglab.util.pandas import index_names
+from openmnglab.util.dtypes import inherit_float_dtype
+from openmnglab.util.arrays import read_only
+from openmnglab.util.kernels import kernel, array, input_array, INDEX_CODES
 
 SPDF_FEATURES = tuple((f"F{i + 1}" for i in range(24)))
 
+FEATURE_COMPONENTS: tuple[tuple[int, ...], ...] = (
+    (), (1, 3), (1, 5), (), (1, 3), (1, 3, 5), (1, 5), (0,), (0, 1, 2), (2, 3, 4), (1, 3),
+    (0,), (1,), (2,), (3,), (4,), (0, 5), (2,), (4,),
+    (0, 4), (0, 4), (0, 4), (0, 4), (0, 4))
+"""Positions of the components (0 for P1 to 5 for P6) each feature is based on. F1 only uses the timestamps of the
+components. F17 is the second level diff at P1 or, if there is no P1, the first level diff at P6."""
+
+_EPSILON = sys.float_info.epsilon
+
 
 def mean_change_between(series: Series, high: float, low: float):
     return np.linalg.norm([high - low, series[high] - series[low]])
@@ -39,50 +55,181 @@ def sampling_moment_dev(sequence, n) -> float:
     return pow(np.std(sequence), n)  # moment(sequence, n) / pow(np.dev(sequence), n)
 
 
+def calc_features(fd: Series, sd: Series, p1: float, p2: float, p3: float, p4: float, p5: float, p6: float,
+                  dtype=np.float64) -> np.ndarray:
+    """Calculates the features of a single waveform by label based lookups on its first and second level diff.
+    Reference implementation of :func:`spdf_features`.
+    """
+    f = np.full(24, np.NaN, dtype=dtype)
+    p1_i, = fd.index.get_indexer([p1], method='nearest', tolerance=sys.float_info.epsilon)
+    f[0] = p5 - p1
+    if not np.isnan(p2):
+        if not np.isnan(p4):
+            f[1] = fd[p4] - fd[p2]
+            mbf = mean_change_between(fd, p4, p2)
+            f[4] = log(mbf, e)
+            if not np.isnan(p6):
+                f[5] = mean_change_between(fd, p4, p6)
+            f[10] = fd[p2] / fd[p4]
+        if not np.isnan(p6):
+            f[2] = fd[p6] - fd[p2]
+            mbf = mean_change_between(fd, p6, p2)
+            f[6] = log(mbf, e)
+        if not np.isnan(p3) and not np.isnan(p1):
+            f[8] = slope_ratio(fd, p1, p2, p3)
+    if not np.isnan(p1_i):
+        f[7] = rms(fd.iloc[:p1_i + 1].values)
+
+    for i, p in enumerate((p1, p2, p3, p4, p5, p6)):
+        if not np.isnan(p):
+            f[11 + i] = fd[p]
+    for i, p in enumerate((p1, p3, p5)):
+        if not np.isnan(p):
+            f[16 + i] = sd[p]
+    # distribution based features
+    if not np.isnan(p5):
+        if not np.isnan(p3) and not np.isnan(p4):
+            f[9] = slope_ratio(fd, p3, p4, p5)
+        if not np.isnan(p1):
+            for i, ser in enumerate((fd, sd)):
+                f[19 + i] = iqr(ser.loc[p1:p5])
+            f[21] = sampling_moment_dev(fd.loc[p1:p5], 4)
+            f[22] = sampling_moment_dev(fd.loc[p1:p5], 3)
+            f[23] = sampling_moment_dev(sd.loc[p1:p5], 3)
+    return f
+
+
+@kernel()
+def _window_position(level_values: np.ndarray, level_codes: np.ndarray, start: int, stop: int, timestamp: float) -> int:
+    # binary search for the sample of the window at the timestamp, -1 if there is none
+    if np.isnan(timestamp) or stop <= start:
+        return -1
+    lo, hi = start, stop
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if level_values[level_codes[mid]] < timestamp:
+            lo = mid + 1
+        else:
+            hi = mid
+    nearest, nearest_dist = -1, np.inf
+    for candidate in (lo - 1, lo):
+        if start <= candidate < stop:
+            dist = abs(level_values[level_codes[candidate]] - timestamp)
+            if dist < nearest_dist:
+                nearest, nearest_dist = candidate, dist
+    return nearest if nearest_dist <= _EPSILON else -1
+
+
+@kernel()
+def _slope_ratio(fd: np.ndarray, a: float, a_i: int, b: float, b_i: int, c: float, c_i: int) -> float:
+    part_a = (fd[b_i] - fd[a_i]) * (c - b)
+    part_b = (fd[c_i] - fd[b_i]) * (b - a)
+    return part_a / part_b
+
+
+@kernel()
+def _iqr(sequence: np.ndarray) -> float:
+    return np.quantile(sequence, 0.75) - np.quantile(sequence, 0.25)
+
+
+@kernel(*((input_array(in_dtype), input_array(in_dtype), input_array(types.float64), codes, array(types.int64),
+           array(types.int64), input_array(types.float64, 2), array(types.int64), array(types.boolean),
+           array(out_dtype, 2))
+          for in_dtype in (types.float64, types.float32) for codes in INDEX_CODES
+          for out_dtype in (types.float64, types.float32)))
+def _spdf_features_kernel(fd: np.ndarray, sd: np.ndarray, level_values: np.ndarray, level_codes: np.ndarray,
+                          bounds: np.ndarray, window_of_row: np.ndarray, components: np.ndarray, columns: np.ndarray,
+                          needed_components: np.ndarray, features: np.ndarray):
+    wanted = np.zeros(24, dtype=np.bool_)
+    wanted[columns] = True
+    pos = np.empty(6, dtype=np.int64)
+    f = np.empty(24, dtype=np.float64)
+    for row in range(len(window_of_row)):
+        window = window_of_row[row]
+        start, stop = bounds[window], bounds[window + 1]
+        p = components[row]
+        f[:] = np.nan
+        for i in range(6):
+            pos[i] = _window_position(level_values, level_codes, start, stop, p[i]) if needed_components[i] else -1
+        p1_i, p2_i, p3_i, p4_i, p5_i, p6_i = pos[0], pos[1], pos[2], pos[3], pos[4], pos[5]
+        f[0] = p[4] - p[0]
+        if p2_i >= 0:
+            if p4_i >= 0:
+                f[1] = fd[p4_i] - fd[p2_i]
+                f[4] = math.log(math.sqrt((p[3] - p[1]) ** 2 + (fd[p4_i] - fd[p2_i]) ** 2))
+                if p6_i >= 0:
+                    f[5] = math.sqrt((p[3] - p[5]) ** 2 + (fd[p4_i] - fd[p6_i]) ** 2)
+                f[10] = fd[p2_i] / fd[p4_i]
+            if p6_i >= 0:
+                f[2] = fd[p6_i] - fd[p2_i]
+                f[6] = math.log(math.sqrt((p[5] - p[1]) ** 2 + (fd[p6_i] - fd[p2_i]) ** 2))
+            if p3_i >= 0 and p1_i >= 0:
+                f[8] = _slope_ratio(fd, p[0], p1_i, p[1], p2_i, p[2], p3_i)
+        if p1_i >= 0 and wanted[7]:
+            f[7] = np.sqrt(np.sum(fd[start:p1_i + 1] ** 2) / (p1_i + 1 - start))
+        for i in range(6):
+            if pos[i] >= 0:
+                f[11 + i] = fd[pos[i]]
+        for i in range(3):
+            if pos[2 * i] >= 0:
+                f[16 + i] = sd[pos[2 * i]]
+        # distribution based features
+        if p5_i >= 0:
+            if p3_i >= 0 and p4_i >= 0:
+                f[9] = _slope_ratio(fd, p[2], p3_i, p[3], p4_i, p[4], p5_i)
+            if 0 <= p1_i <= p5_i:
+                fd_range = fd[p1_i:p5_i + 1]
+                sd_range = sd[p1_i:p5_i + 1]
+                if wanted[19]:
+                    f[19] = _iqr(fd_range)
+                if wanted[20]:
+                    f[20] = _iqr(sd_range)
+                if wanted[21] or wanted[22]:
+                    fd_std = np.std(fd_range)
+                    f[21] = fd_std ** 4
+                    f[22] = fd_std ** 3
+                if wanted[23]:
+                    f[23] = np.std(sd_range) ** 3
+        for col_i in range(len(columns)):
+            features[row, col_i] = f[columns[col_i]]
+
+
+def spdf_features(fd: np.ndarray, sd: np.ndarray, level_values: np.ndarray, level_codes: np.ndarray,
+                  bounds: np.ndarray, window_of_row: np.ndarray, components: np.ndarray,
+                  features: Sequence[str] = SPDF_FEATURES, dtype=np.float64) -> np.ndarray:
+    """Calculates the SPDF features of all waveforms in one compiled pass. The components are located in their window by
+    their position, so no label based lookups are required. Only the requested features and the components they are
+    based on are calculated.
+
+    :param fd: flat array of the first level diffs of all windows
+    :param sd: flat array of the second level diffs of all windows
+    :param level_values: values of the timestamp index level
+    :param level_codes: codes of the timestamp index level, mapping each element of ``fd`` and ``sd`` to its timestamp
+    :param bounds: bounds of the windows (see :func:`~openmnglab.functions.helpers.general.window_bounds`)
+    :param window_of_row: the window of each row of ``components``
+    :param components: (n, 6) matrix with the timestamps of the components P1 to P6
+    :param features: names of the features to calculate (see :data:`SPDF_FEATURES`)
+    :param dtype: dtype of the returned features
+    :return: (n, len(features)) matrix of features
+    """
+    columns = np.array([SPDF_FEATURES.index(feature) for feature in features], dtype=np.int64)
+    needed_components = np.zeros(6, dtype=np.bool_)
+    for column in columns:
+        needed_components[list(FEATURE_COMPONENTS[column])] = True
+    result = np.empty((len(window_of_row), len(columns)), dtype=dtype)
+    _spdf_features_kernel(read_only(fd), read_only(sd), read_only(level_values), level_codes, bounds, window_of_row,
+                          read_only(np.ascontiguousarray(components, dtype=np.float64)), columns, needed_components,
+                          result)
+    return result
+
+
 class FeatureFunc(FunctionBase):
-    def __init__(self, dtype=np.float64, mode="diff"):
+    def __init__(self, features: Sequence[str] = SPDF_FEATURES, dtype=None, arrays=False):
         self._components: PandasContainer[DataFrame] = None
         self._diffs: PandasContainer[DataFrame] = None
+        self._features = tuple(features)
         self._dtype = dtype
-
-    def _calc_features(self, fd: Series, sd: Series, p1: float, p2: float, p3: float, p4: float, p5: float, p6: float):
-        f = np.full(24, np.NaN, dtype=self._dtype)
-        p1_i, = fd.index.get_indexer([p1], method='nearest', tolerance=sys.float_info.epsilon)
-        f[0] = p5 - p1
-        if not np.isnan(p2):
-            if not np.isnan(p4):
-                f[1] = fd[p4] - fd[p2]
-                mbf = mean_change_between(fd, p4, p2)
-                f[4] = log(mbf, e)
-                if not np.isnan(p6):
-                    f[5] = mean_change_between(fd, p4, p6)
-                f[10] = fd[p2] / fd[p4]
-            if not np.isnan(p6):
-                f[2] = fd[p6] - fd[p2]
-                mbf = mean_change_between(fd, p6, p2)
-                f[6] = log(mbf, e)
-            if not np.isnan(p3) and not np.isnan(p1):
-                f[8] = slope_ratio(fd, p1, p2, p3)
-        if not np.isnan(p1_i):
-            f[7] = rms(fd.iloc[:p1_i + 1].values)
-
-        for i, p in enumerate((p1, p2, p3, p4, p5, p6)):
-            if not np.isnan(p):
-                f[11 + i] = fd[p]
-        for i, p in enumerate((p1, p3, p5)):
-            if not np.isnan(p):
-                f[16 + i] = sd[p]
-        # distribution based features
-        if not np.isnan(p5):
-            if not np.isnan(p3) and not np.isnan(p4):
-                f[9] = slope_ratio(fd, p3, p4, p5)
-            if not np.isnan(p1):
-                for i, ser in enumerate((fd, sd)):
-                    f[19 + i] = iqr(ser.loc[p1:p5])
-                f[21] = sampling_moment_dev(fd.loc[p1:p5], 4)
-                f[22] = sampling_moment_dev(fd.loc[p1:p5], 3)
-                f[23] = sampling_moment_dev(sd.loc[p1:p5], 3)
-        return f
+        self._arrays = arrays
 
     def build_unitdict(self):
         units: dict[str, pq.Quantity] = dict()
@@ -109,19 +256,47 @@ class FeatureFunc(FunctionBase):
         units[SPDF_FEATURES[21]] = pq.dimensionless
         units[SPDF_FEATURES[22]] = pq.dimensionless
         units[SPDF_FEATURES[23]] = pq.dimensionless
-        for index_name in index_names(self._components.data.index):
+        units = {feature: units[feature] for feature in self._features}
+        for index_name in container_index_names(self._components):
             units[index_name] = self._components.units[index_name]
         return units
 
+    @staticmethod
+    def _windows_of_components(window_index: Index, component_index: Index) -> np.ndarray:
+        """Maps each row of the components to the window of the same waveform in the window data"""
+        if window_index.equals(component_index):
+            return np.arange(len(component_index))
+        window_of_row = window_index.get_indexer(component_index)
+        if (window_of_row < 0).any():
+            raise KeyError("Not all waveforms of the components are contained in the window data")
+        return window_of_row
+
+    def _execute_arrays(self) -> ArrayContainer:
+        diffs = ArrayContainer.from_pandas(self._diffs)
+        components = ArrayContainer.from_pandas(self._components)
+        *window_columns, time_column = diffs.index_columns
+        bounds = window_bounds_of(window_keys(window_columns), len(diffs))
+        window_index = pandas_index([window_column.take(bounds[:-1]) for window_column in window_columns])
+        fd = np.ascontiguousarray(diffs.column(LEVEL_COLUMN[1]))
+        nmpy = spdf_features(fd, np.ascontiguousarray(diffs.column(LEVEL_COLUMN[2])), *kernel_level(time_column),
+                             bounds, self._windows_of_components(window_index, pandas_index(components.index_columns)),
+                             np.stack([components.column(component) for component in SPDF_COMPONENTS], axis=1),
+                             features=self._features, dtype=inherit_float_dtype(self._dtype, fd.dtype))
+        return ArrayContainer({feature: nmpy[:, i] for i, feature in enumerate(self._features)},
+                              components.index_columns, self.build_unitdict())
+
     def execute(self) -> PandasContainer[DataFrame]:
-        stuff = self._components.data.index
-
-        nmpy = np.empty((len(stuff), 24), dtype=self._dtype)
-        for i, (spike_loc, spike_components) in enumerate(self._components.data.iterrows()):
-            diff = self._diffs.data.loc[spike_loc]
-            nmpy[i] = self._calc_features(diff[LEVEL_COLUMN[1]], diff[LEVEL_COLUMN[2]],
-                                          *(spike_components[component] for component in SPDF_COMPONENTS))
-        df = DataFrame(data=nmpy, columns=SPDF_FEATURES, index=self._components.data.index)
+        if self._arrays:
+            return self._execute_arrays()
+        diffs = self._diffs.data
+        bounds = window_bounds(diffs.index)
+        fd = diffs[LEVEL_COLUMN[1]].values
+        window_of_row = self._windows_of_components(diffs.index.droplevel(-1)[bounds[:-1]], self._components.data.index)
+        nmpy = spdf_features(fd, diffs[LEVEL_COLUMN[2]].values, diffs.index.levels[-1].values,
+                             diffs.index.codes[-1], bounds, window_of_row,
+                             self._components.data[list(SPDF_COMPONENTS)].values, features=self._features,
+                             dtype=inherit_float_dtype(self._dtype, fd.dtype))
+        df = DataFrame(data=nmpy, columns=self._features, index=self._components.data.index)
 
         return PandasContainer(df, self.build_unitdict())
 
@@ -1,11 +1,13 @@
 import pandera as pa
 from pandas import DataFrame
 
+from openmnglab.datamodel.array.model import ArrayDataSchema
 from openmnglab.datamodel.pandas.model import PanderaSchemaAcceptor, PandasDataSchema
 from openmnglab.functions.base import FunctionDefinitionBase
-from openmnglab.functions.analysis.funcs.spdf_components import SPDFComponentsFunc, SPDF_COMPONENTS
+from openmnglab.functions.analysis.funcs.spdf_components import SPDFComponentsFunc, SPDF_COMPONENTS, SPDF_ALGORITHM
 from openmnglab.functions.processing.windows import WindowDataAcceptor
 from openmnglab.model.planning.interface import IDataReference
+from openmnglab.util.hashing import HashBuilder
 
 
 class SPDFComponentsAcceptor(PanderaSchemaAcceptor[pa.DataFrameSchema]):
@@ -32,23 +34,36 @@ class SPDFComponents(FunctionDefinitionBase[IDataReference[DataFrame]]):
 
     Out: Dataframe with the waveform components, columns are named based on PRINCIPLE_COMPONENTS constant.
          Index is taken from the input series non-timestamp multiindex.
+
+    :param algorithm: "alt1" searches P2 as the global minimum of the first level diff and P4 and P6 as the extrema
+        following it, "original" searches P2 in the first half of the window and P3 and P5 as the zero crossings following it.
+    :param arrays: return an :class:`~openmnglab.datamodel.array.model.ArrayContainer` instead of a pandas dataframe
     """
 
-    def __init__(self):
+    def __init__(self, algorithm: SPDF_ALGORITHM = "alt1", arrays=False):
         super().__init__("codingchipmunk.spdf.components")
+        assert (algorithm in ("alt1", "original"))
+        self._algorithm = algorithm
+        self._arrays = arrays
 
     @property
     def config_hash(self) -> bytes:
-        return bytes()
+        hsh = HashBuilder().str(self._algorithm)
+        if self._arrays:
+            hsh.bool(self._arrays)
+        return hsh.digest()
 
     @property
     def slot_acceptors(self) -> WindowDataAcceptor:
         return WindowDataAcceptor(0, 1)
 
-    @staticmethod
-    def output_for(diffs: PandasDataSchema[pa.DataFrameSchema]) -> SPDFComponentsDynamicSchema:
-        return SPDFComponentsDynamicSchema(pa.MultiIndex(indexes=diffs.pandera_schema.index.indexes[:-1]))
+    def output_for(self, diffs: PandasDataSchema[pa.DataFrameSchema]) -> SPDFComponentsDynamicSchema | ArrayDataSchema:
+        schema = SPDFComponentsDynamicSchema(pa.MultiIndex(indexes=diffs.pandera_schema.index.indexes[:-1]))
+        return ArrayDataSchema.of(schema) if self._arrays else schema
+
+    @property
+    def chunkable(self) -> bool:
+        return True
 
-    @staticmethod
-    def new_function() -> SPDFComponentsFunc:
-        return SPDFComponentsFunc()
+    def new_function(self) -> SPDFComponentsFunc:
+        return SPDFComponentsFunc(algorithm=self._algorithm, arrays=self._arrays)
@@ -1,26 +1,32 @@
+from typing import Optional, Sequence
+
 import pandera as pa
 from pandas import DataFrame
 
+from openmnglab.datamodel.array.model import ArrayDataSchema
 from openmnglab.datamodel.pandas.model import PandasDataSchema, PanderaSchemaAcceptor
 from openmnglab.datamodel.pandas.verification import compare_index
 from openmnglab.functions.base import FunctionDefinitionBase
 from openmnglab.functions.analysis.funcs.spdf_features import SPDF_FEATURES, FeatureFunc
+from openmnglab.functions.processing.funcs.windows import LEVEL_COLUMN
 from openmnglab.functions.processing.windows import WindowDataAcceptor, WindowDataDynamicSchema
 from openmnglab.functions.analysis.spdf_components import SPDFComponentsDynamicSchema, \
     SPDFComponentsAcceptor
 from openmnglab.model.planning.interface import IDataReference
+from openmnglab.util.dtypes import float_dtype, inherit_float_dtype
+from openmnglab.util.hashing import HashBuilder
 
 
 class SPDFFeaturesAcceptor(PanderaSchemaAcceptor[pa.DataFrameSchema]):
-    def __init__(self, index=None):
+    def __init__(self, index=None, features: Sequence[str] = SPDF_FEATURES, dtype=float):
         super().__init__(pa.DataFrameSchema({
-            feature: pa.Column(float, nullable=True) for feature in SPDF_FEATURES}, title="Principle Components",
+            feature: pa.Column(dtype, nullable=True) for feature in features}, title="Principle Components",
             index=index))
 
 
 class SPDFFeaturesDynamicSchema(SPDFFeaturesAcceptor, PandasDataSchema):
-    def __init__(self, idx: pa.Index | pa.MultiIndex):
-        super().__init__(index=idx)
+    def __init__(self, idx: pa.Index | pa.MultiIndex, features: Sequence[str] = SPDF_FEATURES, dtype=float):
+        super().__init__(index=idx, features=features, dtype=dtype)
 
 
 class SPDFFeatures(FunctionDefinitionBase[IDataReference[DataFrame]]):
@@ -30,23 +36,48 @@ class SPDFFeatures(FunctionDefinitionBase[IDataReference[DataFrame]]):
 
     Out: Dataframe with the features, indexed by the same index as the WaveformComponents input. F4 will always be None.
 
+    :param features: names of the features to calculate (see ``SPDF_FEATURES``). Only these features (and the components
+        they are based on) are calculated and contained in the output, in the order of ``SPDF_FEATURES``.
+        Defaults to all features.
+    :param dtype: dtype of the features, either float32 or float64. Defaults to the dtype of the interval data.
+    :param arrays: return an :class:`~openmnglab.datamodel.array.model.ArrayContainer` instead of a pandas dataframe
     """
 
-    def __init__(self):
+    def __init__(self, features: Optional[Sequence[str]] = None, dtype=None, arrays=False):
         super().__init__("codingchipmunk.spdf.features")
+        features = SPDF_FEATURES if features is None else features
+        for feature in features:
+            assert feature in SPDF_FEATURES, f"Unknown feature {feature}"
+        self._features = tuple(feature for feature in SPDF_FEATURES if feature in features)
+        self._dtype = float_dtype(dtype)
+        self._arrays = arrays
 
     @property
     def config_hash(self) -> bytes:
-        return bytes()
+        hsh = HashBuilder()
+        for feature in self._features:
+            hsh.str(feature)
+        if self._dtype is not None:
+            hsh.dtype(self._dtype)
+        if self._arrays:
+            hsh.bool(self._arrays)
+        return hsh.digest()
 
     @property
     def slot_acceptors(self) -> tuple[SPDFComponentsAcceptor, WindowDataAcceptor]:
         return SPDFComponentsAcceptor(), WindowDataAcceptor(0, 1, 2)
 
     def output_for(self, principle_compo: SPDFComponentsDynamicSchema,
-                   diffs: WindowDataDynamicSchema) -> SPDFFeaturesDynamicSchema:
+                   diffs: WindowDataDynamicSchema) -> SPDFFeaturesDynamicSchema | ArrayDataSchema:
         compare_index(principle_compo.pandera_schema.index, pa.MultiIndex(diffs.pandera_schema.index.indexes[:-1]))
-        return SPDFFeaturesDynamicSchema(principle_compo.pandera_schema.index)
+        diffs_dtype = diffs.pandera_schema.columns[LEVEL_COLUMN[1]].dtype.type
+        schema = SPDFFeaturesDynamicSchema(principle_compo.pandera_schema.index, features=self._features,
+                                           dtype=inherit_float_dtype(self._dtype, diffs_dtype))
+        return ArrayDataSchema.of(schema) if self._arrays else schema
+
+    @property
+    def chunkable(self) -> bool:
+        return True
 
     def new_function(self) -> FeatureFunc:
-        return FeatureFunc()
+        return FeatureFunc(features=self._features, dtype=self._dtype, arrays=self._arrays)
@@ -1,5 +1,6 @@
+import copy
 from abc import ABC
-from typing import Generic
+from typing import Generic, Self
 
 from openmnglab.model.functions.interface import IFunction, IFunctionDefinition, ISourceFunction, ProxyRet, \
     IStaticFunctionDefinition, ISourceFunctionDefinition
@@ -27,6 +28,35 @@ class FunctionDefinitionBase(Generic[ProxyRet], IFunctionDefinition[ProxyRet], A
     def identifier(self) -> str:
         return self._identifier
 
+    @property
+    def frozen(self) -> bool:
+        return self.__dict__.get("_frozen", False)
+
+    def freeze(self) -> Self:
+        """Makes the definition immutable, setting any of its attributes afterwards raises an :class:`AttributeError`.
+        Freeze definitions which are planned many times (i.e. the same windows for thousands of files), planners then
+        neither copy them nor compute their configuration hash, acceptors and output schemas again.
+
+        The freeze is shallow: mutable attribute values (i.e. quantities, which are ndarrays) can still be changed in
+        place, and the cached configuration hash won't notice. Don't modify them after freezing.
+
+        :return: the definition itself
+        """
+        self._frozen = True
+        return self
+
+    def _replace(self, **attributes) -> Self:
+        """A shallow copy of the definition with some of its attributes replaced. Copies of frozen definitions are
+        frozen too."""
+        replaced = copy.copy(self)
+        replaced.__dict__.update(attributes)
+        return replaced
+
+    def __setattr__(self, name: str, value):
+        if self.frozen:
+            raise AttributeError(f"can't set {name!r}, {type(self).__qualname__} {self.identifier} is frozen")
+        super().__setattr__(name, value)
+
 
 class StaticFunctionDefinitionBase(Generic[ProxyRet], FunctionDefinitionBase[ProxyRet],
                                    IStaticFunctionDefinition[ProxyRet],
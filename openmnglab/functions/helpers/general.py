@@ -1,22 +1,45 @@
-from typing import Optional
+from typing import Optional, Sequence
 
 import numpy as np
 import pandas as pd
 import quantities as pq
-from numba import njit
+from numba import types
 
+from openmnglab.datamodel.array.model import ArrayContainer, IndexColumn
 from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+from openmnglab.util.arrays import read_only
+from openmnglab.util.kernels import kernel, array, index_codes, input_array
 
 
 def get_index_quantities(container: PandasContainer) -> dict[str, pq.Quantity]:
-    return {idx_name: container.units[idx_name] for idx_name in container.data.index.names}
+    return {idx_name: container.units[idx_name] for idx_name in container_index_names(container)}
 
 
-def get_interval_locs(interval: pd.Interval, index: pd.Index):
+def container_index_names(container: PandasContainer) -> tuple[str, ...]:
+    """Names of the index levels of a container, without creating the pandas object of an array container"""
+    if isinstance(container, ArrayContainer):
+        return container.index_names
+    return tuple(container.data.index.names)
+
+
+def window_keys(window_columns: Sequence[IndexColumn]) -> list[np.ndarray]:
+    """Arrays identifying the window of each row of window data from all but its last index column, see
+    :func:`window_bounds_of`"""
+    return [column.codes if column.is_categorical else column.values for column in window_columns]
+
+
+def kernel_level(index_column: IndexColumn) -> tuple[np.ndarray, np.ndarray]:
+    """The float64 values and codes of an index column, as the kernels expect the levels of a multiindex"""
+    level, codes = index_column.level_and_codes()
+    return np.ascontiguousarray(level.values, dtype=np.float64), index_codes(codes)
+
+
+def get_interval_locs(interval: pd.Interval, index: pd.Index | RegularTimeBase):
     """
     returns the locs of an interval in an index
     :param interval:
-    :param index:
+    :param index: index or time base. The locs in a time base are calculated instead of searched.
     :return:
     """
     left_loc, right_loc = index.slice_locs(start=interval.left, end=interval.right)
@@ -33,6 +56,80 @@ def get_interval_locs(interval: pd.Interval, index: pd.Index):
     return left_loc, right_loc + 1
 
 
+def interval_locs(left: np.ndarray, right: np.ndarray, closed: str, index: pd.Index | RegularTimeBase) -> np.ndarray:
+    """
+    returns the locs of intervals in a monotonic increasing index, like :func:`get_interval_locs` for each interval
+    :param left: left bounds of the intervals
+    :param right: right bounds of the intervals
+    :param closed: how the intervals are closed, "left", "right", "both" or "neither"
+    :param index: index or time base
+    :return: (2, n) array with the start and stop position of each interval
+    """
+    left_side = "left" if closed in ("left", "both") else "right"
+    right_side = "right" if closed in ("right", "both") else "left"
+    if isinstance(index, RegularTimeBase):
+        return np.array([[index.searchsorted(value, side=left_side) for value in left],
+                         [index.searchsorted(value, side=right_side) for value in right]], dtype=np.int64).reshape(2, -1)
+    return np.stack((index.values.searchsorted(left, side=left_side),
+                     index.values.searchsorted(right, side=right_side))).astype(np.int64, copy=False)
+
+
+def window_bounds_of(keys: Sequence[np.ndarray], n: int) -> np.ndarray:
+    """
+    returns the bounds of consecutive windows, which start wherever any of the keys changes
+    :param keys: arrays identifying the window of each row, i.e. the codes of the multiindex levels
+    :param n: number of rows
+    :return: array with one element more than there are windows. Window ``i`` spans the rows ``bounds[i]:bounds[i + 1]``
+    """
+    if n == 0:
+        return np.zeros(1, dtype=np.int64)
+    window_start = np.zeros(n, dtype=bool)
+    window_start[0] = True
+    for key in keys:
+        window_start[1:] |= key[1:] != key[:-1]
+    return np.append(np.flatnonzero(window_start), n)
+
+
+def window_bounds(index: pd.MultiIndex) -> np.ndarray:
+    """
+    returns the bounds of the consecutive windows of window data, based on all but the last level of its multiindex
+    :param index: multiindex of the window data
+    :return: array with one element more than there are windows. Window ``i`` spans the rows ``bounds[i]:bounds[i + 1]``
+    """
+    return window_bounds_of(index.codes[:-1], len(index))
+
+
+@kernel((input_array(types.int64), input_array(types.int64), types.int64, types.int64))
+def _coalesce_ranges(starts: np.ndarray, stops: np.ndarray, max_gap: int, max_span: int) -> np.ndarray:
+    bounds = np.empty(len(starts) + 1, dtype=np.int64)
+    n_groups, lo, hi = 0, 0, 0
+    for i in range(len(starts)):
+        if i == 0 or starts[i] > hi + max_gap or max(hi, stops[i]) - lo > max_span:
+            bounds[n_groups] = i
+            n_groups += 1
+            lo, hi = starts[i], stops[i]
+        else:
+            hi = max(hi, stops[i])
+    bounds[n_groups] = len(starts)
+    return bounds[:n_groups + 1]
+
+
+def coalesce_ranges(starts: np.ndarray, stops: np.ndarray, max_gap: int, max_span: int) -> np.ndarray:
+    """
+    returns the bounds of groups of consecutive ranges which can be read at once: a range joins the group of the
+    previous ones if it starts at most ``max_gap`` positions after their end and the group spans at most ``max_span``
+    positions with it
+    :param starts: start of each range, ascending
+    :param stops: stop of each range
+    :param max_gap: maximum number of positions between the ranges of a group, which are read needlessly
+    :param max_span: maximum number of positions spanned by a group (a single range may span more)
+    :return: array with one element more than there are groups. Group ``i`` contains the ranges
+        ``bounds[i]:bounds[i + 1]``
+    """
+    return _coalesce_ranges(read_only(np.ascontiguousarray(starts, dtype=np.int64)),
+                            read_only(np.ascontiguousarray(stops, dtype=np.int64)), max_gap, max_span)
+
+
 def _slice_diff(series: np.ndarray, diffs: np.ndarray, start_i: int, stop_i: int, diff_levels: int, dtype):
     if start_i - diff_levels >= 0:
         overhang = series[start_i - diff_levels:start_i].copy()
@@ -52,17 +149,21 @@ def _slice_diff(series: np.ndarray, diffs: np.ndarray, start_i: int, stop_i: int
     return diffs
 
 
-_slice_diff_njit = njit()(_slice_diff)
+# the slice of the output is only contiguous if it spans all columns, i.e. if there is only a single window
+_slice_diff_njit = kernel(*((input_array(dtype), array(dtype, 2, layout), types.int64, types.int64, types.int64,
+                             types.DType(dtype))
+                            for dtype in (types.float64, types.float32) for layout in ("A", "C")))(_slice_diff)
 
 
 def _slice_deriv(values: np.ndarray, times: np.ndarray, derivatives: np.ndarray, start_i: int, stop_i: int,
                  diff_levels: int, dtype):
+    # dtype is the working dtype of the overhang, which may be wider than the values and derivatives
     if start_i > 0:
         time_diffs = np.diff(times[start_i - 1:stop_i])[1:]
     else:
         time_diffs = np.diff(times[start_i:stop_i])
     if start_i - diff_levels >= 0:
-        overhang = values[start_i - diff_levels:start_i].copy()
+        overhang = values[start_i - diff_levels:start_i].astype(dtype)
     else:
         overhang = np.zeros(diff_levels, dtype=dtype)
         overhang[diff_levels - start_i:] = values[:start_i]
@@ -70,6 +171,7 @@ def _slice_deriv(values: np.ndarray, times: np.ndarray, derivatives: np.ndarray,
     if start_i - diff_levels > 0:
         overhang_times = np.diff(times[start_i - diff_levels - 1:start_i])
     else:
+        # the overhang before the first sample has no time deltas, its derivatives are inf or NaN
         overhang_times = np.zeros(diff_levels, dtype=dtype)
         overhang_times[diff_levels - start_i:] = np.diff(times[:start_i])
 
@@ -86,7 +188,9 @@ def _slice_deriv(values: np.ndarray, times: np.ndarray, derivatives: np.ndarray,
     return derivatives
 
 
-_slice_deriv_njit = njit()(_slice_deriv)
+_slice_deriv_njit = kernel(*((input_array(dtype), input_array(types.float64), array(dtype, 2, layout), types.int64,
+                              types.int64, types.int64, types.DType(types.float64))
+                             for dtype in (types.float64, types.float32) for layout in ("A", "C")))(_slice_deriv)
 
 
 def slice_diff(series, start_i: int, stop_i: int, diff_levels: int = 0, allow_njit=True, dtype=None):
@@ -94,6 +198,7 @@ def slice_diff(series, start_i: int, stop_i: int, diff_levels: int = 0, allow_nj
         series = series.values
     if allow_njit and isinstance(series, np.ndarray):
         dtype = series.dtype if dtype is None else dtype
+        series = read_only(series)
         func = _slice_diff_njit
     else:
         dtype = float
@@ -128,11 +233,11 @@ def slice_diffs_flat_np(series, slices, diff_levels, diffs: Optional[np.ndarray]
     if diffs is None:
         diffs = np.empty((diff_levels + 1, total_len), dtype=series.dtype)
     else:
-        assert (diffs.shape[0] > diff_levels + 1)
-        assert (diffs.shape[1] > total_len)
+        assert (diffs.shape[0] >= diff_levels + 1)
+        assert (diffs.shape[1] >= total_len)
 
     curr_pos = 0
-
+    series = read_only(series)
     for i in range(n):
         d = diffs[:, curr_pos:curr_pos + lens[i]]
         _slice_diff_njit(series, d, slices[0, i], slices[1, i], diff_levels,
@@ -151,15 +256,15 @@ def slice_derivs_flat_np(series, times, slices, diff_levels, diffs: Optional[np.
     if diffs is None:
         diffs = np.empty((diff_levels + 1, total_len), dtype=series.dtype)
     else:
-        assert (diffs.shape[0] > diff_levels + 1)
-        assert (diffs.shape[1] > total_len)
+        assert (diffs.shape[0] >= diff_levels + 1)
+        assert (diffs.shape[1] >= total_len)
 
     curr_pos = 0
-
+    series, times = read_only(series), read_only(times)
     for i in range(n):
         d = diffs[:, curr_pos:curr_pos + lens[i]]
-        _slice_deriv(series, times, d, slices[0, i], slices[1, i], diff_levels,
-                     series.dtype)
+        _slice_deriv_njit(series, times, d, slices[0, i], slices[1, i], diff_levels,
+                          np.dtype(np.float64))
         curr_pos += lens[i]
     return diffs
 
@@ -170,6 +275,7 @@ def slice_diffs_flat(series, *slices: tuple[int, int], diff_levels: int = 0,
         series = series.values
     if allow_njit and isinstance(series, np.ndarray):
         dtype = series.dtype if dtype is None else dtype
+        series = read_only(series)
         func = _slice_diff_njit
     else:
         dtype = type(series[0])
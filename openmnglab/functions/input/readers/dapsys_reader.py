@@ -1,20 +1,26 @@
+from __future__ import annotations
+
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Iterator, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 from pandera import SeriesSchema
 
 from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer
 import openmnglab.datamodel.pandas.schemas as schema
 from openmnglab.functions.base import SourceFunctionDefinitionBase
 from openmnglab.functions.input.readers.funcs.dapsys_reader import DapsysReaderFunc, DPS_STIMDEFS
+from openmnglab.model.functions.interface import ITimeRangeSourceDefinition
 from openmnglab.model.planning.interface import IDataReference
+from openmnglab.util.dtypes import float_dtype
 from openmnglab.util.hashing import HashBuilder
 
 
 class DapsysReader(SourceFunctionDefinitionBase[tuple[
     IDataReference[pd.Series], IDataReference[pd.Series], IDataReference[pd.Series], IDataReference[pd.Series],
-    IDataReference[pd.Series]]]):
+    IDataReference[pd.Series]]], ITimeRangeSourceDefinition):
     """Loads data from a DAPSYS file
 
     In: nothing
@@ -24,13 +30,13 @@ class DapsysReader(SourceFunctionDefinitionBase[tuple[
     Produces
     ........
         1. Continuous Recording: continuous recording from the file. timestamps as float index, signal values as float
-           values pd.Series[[TIMESTAMP: float], float].
+           values (see ``dtype``) pd.Series[[TIMESTAMP: float], float].
         2. Stimuli list: list of stimuli timestamps. Indexed by the global stimulus id
            (the stimulus id amongst all stimuli in the file), the label of stimulus and the id of the stimulus type / label
            (the id amongst all other stimuli in the file which have the same label):
-           pd.Series[[GLOBAL_STIM_ID: int, STIM_TYPE: str, STIM_TYPE_ID: int], float]
+           pd.Series[[GLOBAL_STIM_ID: int, STIM_TYPE: category, STIM_TYPE_ID: int], float]
         3. tracks: List of all sorted tracks. Indexed by the global stimulus id they are attributed to, the name of the track and their id respective to the track.
-           pd.Series[[GLOBAL_STIM_ID: int, TRACK: str, TRACK_SPIKE_IDX: int], float]
+           pd.Series[[GLOBAL_STIM_ID: int, TRACK: category, TRACK_SPIKE_IDX: int], float]
         4. comments: List of all comments. Index is a float of timestamps, values are strings containing the text.
         5. stimdefs: List of all stimulus definitions. Index is a float of timestamps, values are strings containing the text.
 
@@ -40,11 +46,21 @@ class DapsysReader(SourceFunctionDefinitionBase[tuple[
     :param continuous_recording: Name of the continuous recording, defaults to "Continuous Recording"
     :param responses: Name of the folder containing the responses, defaults to "responses"
     :param tracks: Define which tracks to load from the file. Tracks must be present in the "Tracks for all Responses" folder. "all" loads all tracks found in that subfolder.
+    :param dtype: dtype of the signal values, float32 or float64. DAPSYS stores float32 samples, so float32 loads them
+        without conversion at half the memory.
+    :param quantized: store the continuous recording as int16 samples with a scale and offset in a
+        :class:`~openmnglab.datamodel.pandas.signal.SignalContainer`. The quantization is inferred from the values and
+        only used if it reproduces them exactly, otherwise the float values are kept.
+    :param start: first timestamp to load, in seconds. Only the pages of the continuous recording overlapping the range
+        from ``start`` to ``end`` are copied, the stimuli, tracks, comments and stimdefs are filtered by their
+        timestamps. Defaults to the start of the file.
+    :param end: last timestamp to load, in seconds, defaults to the end of the file
     """
 
     def __init__(self, file: str | Path, stim_folder: str | None = None, main_pulse: Optional[str] = "Main Pulse",
                  continuous_recording: Optional[str] = "Continuous Recording", responses="responses",
-                 tracks: Optional[Sequence[str] | str] = "all", comments="comments", stimdefs="Stim Def Starts"):
+                 tracks: Optional[Sequence[str] | str] = "all", comments="comments", stimdefs="Stim Def Starts",
+                 dtype=np.float64, quantized=False, start: float = -np.inf, end: float = np.inf):
         super().__init__("net.codingchipmunk.dapsysreader")
         self._file = file
         self._stim_folder = stim_folder
@@ -54,6 +70,10 @@ class DapsysReader(SourceFunctionDefinitionBase[tuple[
         self._tracks = tracks
         self._comments = comments
         self._stimdefs = stimdefs
+        self._dtype = float_dtype(dtype)
+        self._quantized = quantized
+        self._start = start
+        self._end = end
 
     @property
     def config_hash(self) -> bytes:
@@ -65,17 +85,35 @@ class DapsysReader(SourceFunctionDefinitionBase[tuple[
         hasher.str(self._continuous_recording)
         hasher.str(self._responses)
         hasher.str(self._tracks)
+        hasher.dtype(self._dtype)
+        hasher.bool(self._quantized)
+        if self._start > -np.inf or self._end < np.inf:
+            hasher.float(self._start).float(self._end)
         return hasher.digest()
 
     @property
     def produces(self) -> tuple[
         PandasContainer[SeriesSchema], PandasContainer[SeriesSchema], PandasContainer[SeriesSchema], PandasContainer[
             SeriesSchema], PandasContainer[SeriesSchema]]:
-        return schema.float_timeseries(schema.SIGNAL), schema.stimulus_list(), schema.sorted_spikes(), schema.str_eventseries(schema.COMMENT), schema.str_eventseries(
-            DPS_STIMDEFS)
+        return schema.float_timeseries(schema.SIGNAL, dtype=self._dtype), schema.stimulus_list(), \
+            schema.sorted_spikes(), schema.str_eventseries(schema.COMMENT), schema.str_eventseries(DPS_STIMDEFS)
 
     def new_function(self) -> DapsysReaderFunc:
         return DapsysReaderFunc(self._file, self._stim_folder, main_pulse=self._main_pulse,
                                 continuous_recording=self._continuous_recording,
                                 responses=self._responses, tracks=self._tracks, comments=self._comments,
-                                stimdefs=self._stimdefs)
+                                stimdefs=self._stimdefs, dtype=self._dtype,
+                                quantized=self._quantized, start=self._start, end=self._end)
+
+    def with_time_range(self, start: float, end: float) -> DapsysReader:
+        return self._replace(_start=max(self._start, start), _end=min(self._end, end))
+
+    def iter_signal(self, samples: Optional[int] = None, duration: Optional[float] = None) \
+            -> Iterator[ContinuousContainer]:
+        """Reads the continuous recording in consecutive chunks instead of loading it at once, see
+        :meth:`~openmnglab.functions.input.readers.funcs.dapsys_reader.DapsysReaderFunc.iter_continuous_recording`.
+
+        :param samples: number of samples of each chunk
+        :param duration: duration of each chunk in seconds
+        """
+        return self.new_function().iter_continuous_recording(samples=samples, duration=duration)
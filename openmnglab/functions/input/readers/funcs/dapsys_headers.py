@@ -0,0 +1,71 @@
+"""Reads the table of contents and the page headers of a DAPSYS file without its samples.
+
+The pages of a DAPSYS file precede its table of contents, so the whole file has to be traversed to reach it. Instead of
+parsing the sample and timestamp arrays of the waveform pages like :func:`pydapsys.read.read_from`, their length is read
+and the arrays are skipped, only the first and last timestamp are read.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from pydapsys.binaryreader import DapsysBinaryReader
+from pydapsys.page import PageType
+from pydapsys.read import UnknownPageTypeError, _read_toc
+from pydapsys.toc.entry import Root
+
+
+@dataclass
+class PageHeader:
+    """Header of a page. Text pages have a single timestamp and no samples."""
+    type: PageType
+    id: int
+    n_values: int
+    first_timestamp: Optional[float]
+    last_timestamp: Optional[float]
+    interval: Optional[float]
+
+    @property
+    def is_irregular(self) -> bool:
+        return self.interval is None
+
+
+def _read_page_header(reader: DapsysBinaryReader) -> PageHeader:
+    page_type = PageType(reader.read_u32())
+    page_id = reader.read_u32()
+    reader.read_u32(check_null=True)
+    if page_type == PageType.Text:
+        reader.skip(reader.read_u32())
+        timestamp = reader.read_f64()
+        reader.skip_64()
+        return PageHeader(page_type, page_id, 0, timestamp, timestamp, None)
+    elif page_type == PageType.Waveform:
+        n_values = reader.read_u32()
+        reader.skip_32(n_values)
+        n_timestamps = reader.read_u32()
+        first = last = None
+        if n_timestamps > 0:
+            first = last = reader.read_f64()
+        if n_timestamps > 1:
+            reader.skip_64(n_timestamps - 2)
+            last = reader.read_f64()
+        interval = reader.read_f64(check_null=True)
+        reader.skip_64(count=3)
+        if interval is not None and first is not None:
+            last = first + (n_values - 1) * interval
+        return PageHeader(page_type, page_id, n_values, first, last, interval)
+    raise UnknownPageTypeError(f"Unhandled page type {page_type}")
+
+
+def read_headers(binio: BinaryIO, byte_order='<') -> tuple[Root, dict[int, PageHeader]]:
+    """Reads the table of contents and the page headers of a DAPSYS file, see :func:`pydapsys.read.read_from`.
+
+    :param binio: seekable binary io to read from
+    :param byte_order: byte order of the file
+    :return: the root of the table of contents and the headers of the pages by their id
+    """
+    reader = DapsysBinaryReader(binio, byte_order=byte_order)
+    reader.skip(0x30)
+    page_count = reader.read_u32()
+    headers = {header.id: header for header in (_read_page_header(reader) for _ in range(page_count))}
+    return _read_toc(reader), headers
@@ -1,29 +1,36 @@
 import logging
 import math
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Iterator, Optional, Sequence
 
 import numpy as np
 import pandas as pd
 import quantities as pq
-from numba import njit
-from numpy import float32, float64
+from numba import types
+from numpy import float64
 from pydapsys import File, StreamType, WaveformPage, Stream, TextPage, Folder
-from pydapsys.toc.exceptions import ToCPathError
+from pydapsys.toc.entry import ChildContainer
+from pydapsys.toc.exceptions import ToCPathError, ToCEntryError
 
 from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer, SignalContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase, materialize
 import openmnglab.datamodel.pandas.schemas as schema
 from openmnglab.functions.base import SourceFunctionBase
+from openmnglab.functions.input.readers.funcs.dapsys_headers import PageHeader, read_headers
+from openmnglab.util.arrays import rechunk
 from openmnglab.util.dicts import get_and_incr
+from openmnglab.util.kernels import kernel, array
+from openmnglab.util.pandas import encode_labels
 
 DPS_STIMDEFS = "stimulus definitions"
 
-@njit
+@kernel((array(types.float64), types.float64, types.float64, types.int64, types.int64))
 def _kernel_offset_assign(target: np.array, calc_add, calc_mul, pos_offset: int, num_points: int):
     for i in range(num_points):
         target[pos_offset + i] = calc_add + i * calc_mul
 
-@njit
+@kernel((array(types.float64), types.float64))
 def find_nearest_i(array, value):
     idx = np.searchsorted(array, value, side="left")
     if idx > 0 and (idx == len(array) or math.fabs(value - array[idx - 1]) < math.fabs(value - array[idx])):
@@ -37,7 +44,8 @@ class DapsysReaderFunc(SourceFunctionBase):
 
     def __init__(self, file_path: str | Path, stim_folder: str | None = None, main_pulse: str = "Main Pulse",
                  continuous_recording: Optional[str] = "Continuous Recording", responses="responses",
-                 tracks: Optional[Sequence[str] | str] = "all", comments="comments", stimdefs="Stim Def Starts"):
+                 tracks: Optional[Sequence[str] | str] = "all", comments="comments", stimdefs="Stim Def Starts",
+                 dtype=float64, quantized=False, start: float = -np.inf, end: float = np.inf):
         self._log = logging.getLogger("DapsysReaderFunc")
         self._file: Optional[File] = None
         self._file_path = file_path
@@ -48,8 +56,27 @@ class DapsysReaderFunc(SourceFunctionBase):
         self._tracks = tracks
         self._comments = comments
         self._stimdefs = stimdefs
+        self._dtype = dtype
+        self._quantized = quantized
+        self._start = start
+        self._end = end
         self._log.debug("initialized")
 
+    @property
+    def restricted(self) -> bool:
+        """Whether only the data between ``start`` and ``end`` is read"""
+        return self._start > -np.inf or self._end < np.inf
+
+    def _in_range(self, times: np.ndarray) -> np.ndarray:
+        return (times >= self._start) & (times <= self._end)
+
+    def _page_in_range(self, wp: WaveformPage) -> bool:
+        n = len(wp.values)
+        if n == 0:
+            return False
+        last = wp.timestamps[-1] if wp.is_irregular else wp.timestamps[0] + (n - 1) * wp.interval
+        return last >= self._start and wp.timestamps[0] <= self._end
+
     def _load_file(self) -> File:
         """load and parse the referenced DAPSYS file"""
         self._log.debug("Opening file")
@@ -76,32 +103,98 @@ class DapsysReaderFunc(SourceFunctionBase):
             self._log.info(f"Selected stim folder: {self._stim_folder}")
         return self._stim_folder
 
-    def get_continuous_recording(self) -> pd.Series:
+    def load_continuous_recording(self) -> tuple[np.ndarray, pd.Index | RegularTimeBase]:
+        """Loads the values and timestamps of the continuous recording. If all pages are regularly sampled, the
+        timestamps are returned as a time base with a segment for each page instead of being calculated."""
         file = self.file
         self._log.debug("processing continuous recording")
         path = f"{self.stim_folder}/{self._continuous_recording}"
-        values, timestamps = np.empty(0, dtype=float64), np.empty(0, dtype=float64)
+        values, timestamps = np.empty(0, dtype=self._dtype), np.empty(0, dtype=float64)
         if self.stim_folder in self.file.toc.f and self._continuous_recording in self.file.toc.f[self._stim_folder]:
-            total_datapoint_count = sum(len(wp.values) for wp in file.get_data(path, stype=StreamType.Waveform))
+            # only the pages overlapping the time range are copied
+            waveform_pages = [wp for wp in file.get_data(path, stype=StreamType.Waveform)
+                              if not self.restricted or self._page_in_range(wp)]
+            pages = [(len(wp.values), wp.is_irregular) for wp in waveform_pages]
+            total_datapoint_count = sum(n for n, _ in pages)
+            regular = not any(irregular for _, irregular in pages)
             self._log.debug(f"{total_datapoint_count} datapoints in continuous recording")
-            values = np.empty(total_datapoint_count, dtype=float32)
-            timestamps = np.empty(total_datapoint_count, dtype=float64)
+            # DAPSYS stores float32 samples, which are converted while copying them if float64 values are requested
+            values = np.empty(total_datapoint_count, dtype=self._dtype)
+            if regular:
+                starts, intervals = np.empty(len(pages), dtype=float64), np.empty(len(pages), dtype=float64)
+            else:
+                timestamps = np.empty(total_datapoint_count, dtype=float64)
             current_pos = 0
             self._log.debug("begin load")
-            for wp in file.get_data(path, stype=StreamType.Waveform):
+            for page_i, wp in enumerate(waveform_pages):
                 wp: WaveformPage
                 n = len(wp.values)
                 values[current_pos:current_pos + n] = wp.values
-                if wp.is_irregular:
+                if regular:
+                    starts[page_i], intervals[page_i] = wp.timestamps[0] if n > 0 else 0., wp.interval
+                elif wp.is_irregular:
                     timestamps[current_pos:current_pos + n] = wp.timestamps
                 else:
                     _kernel_offset_assign(timestamps, wp.timestamps[0], wp.interval, current_pos, n)
                 current_pos += n
             self._log.debug("finished loading continuous recording")
+            if regular:
+                time_base = RegularTimeBase.from_segments([n for n, _ in pages], starts, intervals,
+                                                          name=schema.TIMESTAMP)
+                if not self.restricted:
+                    return values, time_base
+                lo, hi = time_base.slice_locs(self._start, self._end)
+                return values[lo:hi], time_base.slice(lo, hi)
         else:
             self._log.warning("No continuous recording in file")
-        return pd.Series(data=values.astype(float64), index=pd.Index(data=timestamps, copy=False, name=schema.TIMESTAMP),
-                         name=schema.SIGNAL, copy=False)
+        if self.restricted:
+            lo, hi = timestamps.searchsorted(self._start, side="left"), timestamps.searchsorted(self._end, side="right")
+            values, timestamps = values[lo:hi], timestamps[lo:hi]
+        return values, pd.Index(data=timestamps, copy=False, name=schema.TIMESTAMP)
+
+    def _continuous_recording_pages(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Yields the values and timestamps of each page of the continuous recording between ``start`` and ``end``"""
+        if not (self.stim_folder in self.file.toc.f
+                and self._continuous_recording in self.file.toc.f[self._stim_folder]):
+            self._log.warning("No continuous recording in file")
+            return
+        for wp in self.file.get_data(f"{self.stim_folder}/{self._continuous_recording}", stype=StreamType.Waveform):
+            wp: WaveformPage
+            n = len(wp.values)
+            if n == 0 or (self.restricted and not self._page_in_range(wp)):
+                continue
+            timestamps = np.asarray(wp.timestamps, dtype=float64) if wp.is_irregular else \
+                wp.timestamps[0] + np.arange(n, dtype=float64) * wp.interval
+            lo, hi = (timestamps.searchsorted(self._start, side="left"),
+                      timestamps.searchsorted(self._end, side="right")) if self.restricted else (0, n)
+            yield wp.values[lo:hi].astype(self._dtype, copy=False), timestamps[lo:hi]
+
+    def iter_continuous_recording(self, samples: Optional[int] = None, duration: Optional[float] = None) \
+            -> Iterator[ContinuousContainer]:
+        """Yields the continuous recording in consecutive chunks of a number of samples or a duration in seconds (see
+        :func:`~openmnglab.util.arrays.rechunk`). Only the pages of the current chunk are converted to the configured
+        dtype, the chunks always hold float values.
+
+        :param samples: number of samples of each chunk
+        :param duration: duration of each chunk in seconds
+        """
+        for values, timestamps in rechunk(self._continuous_recording_pages(), samples=samples, duration=duration):
+            yield ContinuousContainer(values, pd.Index(timestamps, name=schema.TIMESTAMP, copy=False), schema.SIGNAL,
+                                      {schema.SIGNAL: pq.V, schema.TIMESTAMP: pq.s})
+
+    def get_continuous_recording(self) -> pd.Series:
+        values, timestamps = self.load_continuous_recording()
+        return pd.Series(data=values, index=materialize(timestamps), name=schema.SIGNAL, copy=False)
+
+    def _continuous_recording_container(self, values: np.ndarray, timestamps: pd.Index | RegularTimeBase) \
+            -> ContinuousContainer:
+        units = {schema.SIGNAL: pq.V, schema.TIMESTAMP: pq.s}
+        if self._quantized and len(values) > 0:
+            try:
+                return SignalContainer.from_values(values, timestamps, schema.SIGNAL, units)
+            except ValueError as e:
+                self._log.warning(f"Could not quantize the continuous recording, keeping float values: {e}")
+        return ContinuousContainer(values, timestamps, schema.SIGNAL, units)
 
     def _load_textstream(self, path: str, series_name: Optional[str] = None) -> pd.Series:
         file = self.file
@@ -134,19 +227,19 @@ class DapsysReaderFunc(SourceFunctionBase):
             page_ids = tuple()
         timestamps = np.empty(len(page_ids), dtype=float64)
         """The sequence number for the entry of the stimulus label (i.e. the second entry of 'main pulse')"""
-        labels = [""] * len(page_ids)
-        """The label pulse labels"""
-        counter = dict()
-        """Stores the next number for each label (see lbl_num)"""
         self._log.debug("reading stimuli")
         timestamp_to_stimid = dict()
         """Maps the timestamp of the pulse to the trace index that has triggered it"""
-        for i, page in enumerate(
-                file.pages[page_id] for page_id in page_ids):
-            page: TextPage
-            timestamps[i] = page.timestamp_a
-            labels[i] = page.text
-            timestamp_to_stimid[page.timestamp_a] = i
+
+        def read_labels():
+            for i, page in enumerate(file.pages[page_id] for page_id in page_ids):
+                page: TextPage
+                timestamps[i] = page.timestamp_a
+                timestamp_to_stimid[page.timestamp_a] = i
+                yield page.text
+
+        labels = encode_labels(read_labels(), len(page_ids))
+        """The pulse labels, dictionary-encoded as they repeat for every pulse"""
         self._log.debug("finished stimuli")
         return pd.Series(data=timestamps, copy=False,
                          index=pd.MultiIndex.from_arrays([np.arange(len(page_ids)), labels],
@@ -178,13 +271,15 @@ class DapsysReaderFunc(SourceFunctionBase):
         response_timestamps = np.empty(n_responses, dtype=float64)
         responding_to = np.empty(n_responses, dtype=int)
         track_response_number = np.empty(n_responses, dtype=int)
-        track_labels = list()
+        track_labels = pd.Categorical.from_codes(
+            np.repeat(np.arange(len(streams), dtype=np.int32), [len(s.page_ids) for s in streams]),
+            categories=[s.name for s in streams])
+        """The track of each response, dictionary-encoded with the track names as categories"""
         if n_responses > 0:
             n = 0
             self._log.info(f"processing streams ({n_responses} responses total)")
             sorted_ids = np.sort(np.fromiter(idmap.keys(), dtype=float))
             for stream in streams:
-                track_labels.extend(stream.name for _ in range(len(stream.page_ids)))
                 sorted_idx_offset, sorted_ids_slice = 0, sorted_ids
                 track_response_number[n:n+len(stream.page_ids)] = np.arange(len(stream.page_ids), dtype=track_response_number.dtype)
                 for i, stim in enumerate(file.pages[page_id] for page_id in stream.page_ids):
@@ -199,12 +294,57 @@ class DapsysReaderFunc(SourceFunctionBase):
                          index=pd.MultiIndex.from_arrays([responding_to, track_labels, track_response_number],
                                                          names=(schema.STIM_IDX, schema.TRACK, schema.TRACK_SPIKE_IDX)))
 
+    @staticmethod
+    def _stream_paths(container: ChildContainer, prefix: str = "") -> list[str]:
+        paths = [f"{prefix}{stream.name}" for stream in container.s.values()]
+        for folder in container.f.values():
+            paths.extend(DapsysReaderFunc._stream_paths(folder, prefix=f"{prefix}{folder.name}/"))
+        return paths
+
+    def scan(self) -> dict:
+        """Summarizes the file from its table of contents and page headers without reading the samples and texts of
+        the pages (see :mod:`~openmnglab.functions.input.readers.funcs.dapsys_headers`).
+
+        :return: the paths of all streams (``channels``), the first and last timestamp, the number of samples and the
+            sampling rate of the continuous recording (``start``, ``end``, ``samples``, ``sampling_rate``, which is NaN
+            if the recording is sampled irregularly) and the number of ``pulses``, ``tracks`` and ``comments``
+        """
+        with open(self._file_path, "rb") as binfile:
+            toc, headers = read_headers(binfile)
+        stim_folder = self._stim_folder if self._stim_folder is not None else next(iter(toc.f.keys()), None)
+
+        def pages(path: str) -> list[PageHeader]:
+            try:
+                stream = toc.path(path)
+            except (ToCPathError, ToCEntryError):
+                return []
+            return [headers[page_id] for page_id in getattr(stream, "page_ids", ())]
+
+        def count_tracks() -> int:
+            try:
+                responses = toc.path(f"{stim_folder}/{self._responses}")
+            except (ToCPathError, ToCEntryError):
+                return 0
+            tracks = responses.f.get("Tracks for all Responses", None) if isinstance(responses, ChildContainer) else None
+            return len(tracks.s) if tracks is not None else 0
+
+        recording = [page for page in pages(f"{stim_folder}/{self._continuous_recording}") if page.n_values > 0]
+        regular = len(recording) > 0 and not any(page.is_irregular for page in recording)
+        return dict(channels=tuple(self._stream_paths(toc)),
+                    start=recording[0].first_timestamp if recording else math.nan,
+                    end=recording[-1].last_timestamp if recording else math.nan,
+                    samples=sum(page.n_values for page in recording),
+                    sampling_rate=1 / recording[0].interval if regular else math.nan,
+                    pulses=len(pages(f"{stim_folder}/pulses")),
+                    tracks=count_tracks() if stim_folder is not None else 0,
+                    comments=len(pages(self._comments)))
+
     def execute(self) -> tuple[
         PandasContainer[pd.Series], PandasContainer[pd.Series], PandasContainer[pd.Series], PandasContainer[pd.Series],
         PandasContainer[pd.Series]]:
         self._log.info("Executing function")
         self._log.info("Loading continuous recording")
-        cont_rec = self.get_continuous_recording()
+        cont_rec = self.load_continuous_recording()
         self._log.info("Loading comments")
         comments = self._load_textstream(self._comments, series_name=schema.COMMENT)
         self._log.info("Loading stimdefs")
@@ -213,8 +353,11 @@ class DapsysReaderFunc(SourceFunctionBase):
         pulses, idmap = self.get_main_pulses()
         self._log.info("Loading tracks")
         tracks = self.get_tracks_for_responses(idmap)
+        if self.restricted:
+            pulses, tracks = pulses[self._in_range(pulses.values)], tracks[self._in_range(tracks.values)]
+            comments, stimdefs = (series[self._in_range(series.index.values)] for series in (comments, stimdefs))
         self._log.info("Processing finished")
-        return PandasContainer(cont_rec, {schema.SIGNAL: pq.V, schema.TIMESTAMP: pq.s}), \
+        return self._continuous_recording_container(*cont_rec), \
             PandasContainer(pulses, {schema.STIM_IDX: pq.dimensionless,  schema.STIM_TS: pq.s,
                                      schema.STIM_TYPE: pq.dimensionless}), \
             PandasContainer(tracks,
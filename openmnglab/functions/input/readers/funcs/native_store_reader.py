@@ -0,0 +1,23 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.store import RecordingStore
+from openmnglab.functions.base import SourceFunctionBase
+
+
+class NativeStoreReaderFunc(SourceFunctionBase):
+    """Loads all outputs of a native recording store between two timestamps"""
+
+    def __init__(self, path: str | Path, start: float = -np.inf, end: float = np.inf, mmap: bool = True,
+                 threads: Optional[int] = None):
+        self._path = path
+        self._start = start
+        self._end = end
+        self._mmap = mmap
+        self._threads = threads
+
+    def execute(self) -> tuple[Optional[PandasContainer], ...]:
+        return RecordingStore(self._path, mmap=self._mmap, threads=self._threads).load(start=self._start, end=self._end)
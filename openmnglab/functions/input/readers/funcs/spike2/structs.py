@@ -71,43 +71,22 @@ class _TimesMixin(_TimeRangeSliceMixin, _Spike2Base):
         vals = self.hdfgroup.get_array(self._TIMES_ITEM_NAME, slicer=slicer)
         return vals
 
-    def _binary_search_times(self, val: float, tolerance: float = sys.float_info.epsilon) -> tuple[None, None] | tuple[
-        int | None, int | None]:
+    def _search_times(self, val: float, right: bool = False, tolerance: float = sys.float_info.epsilon) -> int:
+        """Position of the first time after ``val`` (or at it, unless ``right``). Times within the tolerance of ``val``
+        are at it."""
         h5ds: h5py.Dataset = self.hdfgroup.h5group[self._TIMES_ITEM_NAME]
-        low, high = 0, h5ds.shape[1] - 1
-        if low == high:
-            single_val = h5ds[0, 0]
-            if comp_float(val, single_val, delta=tolerance):
-                return low, low
-            else:
-                return None, None
-        mid = (high - low) // 2
-        low_val, mid_val, high_val = h5ds[0, [low, mid, high]]
-        if comp_float(val, low_val, delta=tolerance):
-            return low, low
-        elif comp_float(val, high_val, delta=tolerance):
-            return high, high
-        elif val < low_val:
-            return None, 0
-        elif high_val < val:
-            return h5ds.shape[1], None
-        while high - low > 1:
-            if comp_float(val, mid_val, delta=tolerance):
-                return mid, mid
-            if val < mid_val:
-                high, high_val = mid, mid_val
-            else:
-                low, low_val = mid, mid_val
-            mid = low + (high - low) // 2
+        low, high = 0, h5ds.shape[1]
+        while low < high:
+            mid = (low + high) // 2
             mid_val = h5ds[0, mid]
-        return low, high
+            if (mid_val <= val + tolerance) if right else (mid_val < val - tolerance):
+                low = mid + 1
+            else:
+                high = mid
+        return low
 
     def timerange_slice_from_times(self, start: float, stop: float) -> slice:
-        start_low, start_idx = self._binary_search_times(start)
-        stop_idx, stop_high = self._binary_search_times(stop)
-        if not start_low and not stop_high:
-            return slice(0)
-        return slice(start_idx, stop_idx + 1 if stop_idx else None)
+        return slice(self._search_times(start), self._search_times(stop, right=True))
 
 
 class _TitleMixin(_Spike2Base):
@@ -171,6 +150,23 @@ class _IntervalMixin(_Spike2Base):
         return self._interval
 
 
+class _ScaleMixin(_Spike2Base):
+    _scale = None
+    _offset = None
+
+    @property
+    def scale(self) -> float:
+        if self._scale is None:
+            self._scale = self.hdfgroup['scale'].flatten()[0]
+        return self._scale
+
+    @property
+    def offset(self) -> float:
+        if self._offset is None:
+            self._offset = self.hdfgroup['offset'].flatten()[0]
+        return self._offset
+
+
 class _CodesMixin(_Spike2Base):
     _codes = None
 
@@ -268,11 +264,11 @@ class Spike2Realwave(_CalculatedIndexMixin, _ValuesMixin, _TitleMixin, _Spike2Ba
     ...
 
 
-class Spike2Waveform(_CalculatedIndexMixin, _ValuesMixin, _TitleMixin, _TimesMixin, _Spike2Base):
+class Spike2Waveform(_CalculatedIndexMixin, _ValuesMixin, _ScaleMixin, _TitleMixin, _TimesMixin, _Spike2Base):
     ...
 
 
-class Spike2Waveform(_CalculatedIndexMixin, _ValuesMixin, _TitleMixin, _TimesMixin, _Spike2Base):
+class Spike2Waveform(_CalculatedIndexMixin, _ValuesMixin, _ScaleMixin, _TitleMixin, _TimesMixin, _Spike2Base):
     ...
 
 
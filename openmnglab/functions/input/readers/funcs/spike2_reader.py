@@ -1,21 +1,25 @@
 from __future__ import annotations
 
+import math
 import re
 from pathlib import Path
-from typing import Mapping, Iterable, Match
+from typing import Mapping, Iterable, Iterator, Match
 
 import numpy as np
 import pandas as pd
 import quantities as pq
 from pandas import Index
 
+from openmnglab.datamodel.pandas.lazy import HDF5Array
 from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer, SignalContainer, dequantize
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
 from openmnglab.functions.base import SourceFunctionBase
-from openmnglab.functions.input.readers.funcs.dapsys_reader import _kernel_offset_assign
 from openmnglab.functions.input.readers.funcs.spike2.hdfmat import HDFMatGroup, HDFMatFile
 from openmnglab.functions.input.readers.funcs.spike2.structs import Spike2Realwave, Spike2Waveform, Spike2Marker, \
-    Spike2Textmark, Spike2UnbinnedEvent, spike2_struct
+    Spike2Textmark, Spike2UnbinnedEvent, Spike2Wavemark, spike2_struct
 import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.util.arrays import rechunk
 
 SPIKE2_CHANID = int | str
 
@@ -101,7 +105,11 @@ class Spike2ReaderFunc(SourceFunctionBase):
                  signal_unit: pq.Quantity = pq.microvolt,
                  temp_unit: pq.Quantity = pq.celsius,
                  v_chan_unit: pq.Quantity = pq.dimensionless,
-                 time_unit: pq.Quantity = pq.second):
+                 time_unit: pq.Quantity = pq.second,
+                 dtype=np.float64,
+                 quantized: bool = False,
+                 lazy: bool = False,
+                 scaled: bool = False):
         self._start = start
         self._end = end
         self._signal_chan = signal
@@ -119,6 +127,10 @@ class Spike2ReaderFunc(SourceFunctionBase):
         self._v_chan_unit = v_chan_unit
         self._time_unit = time_unit
         self._path = path
+        self._dtype = dtype
+        self._quantized = quantized
+        self._lazy = lazy
+        self._scaled = scaled
         self._channels: Spike2ReaderFunc.Spike2Channels | None = None
 
     @classmethod
@@ -127,29 +139,97 @@ class Spike2ReaderFunc(SourceFunctionBase):
         return int(res.group(1)) if res is not None else matlab_struct_name
 
     @staticmethod
-    def _get_channel_name(channel_struct: dict | None, name_override: str | None = None) -> str:
+    def _get_channel_name(channel_struct: dict | Spike2Realwave | Spike2Waveform | None,
+                          name_override: str | None = None) -> str:
         if name_override is not None:
             return name_override
         if channel_struct is None:
             channel_struct = dict()
-        return channel_struct.get("title", "unknown channel")
+        if isinstance(channel_struct, dict):
+            return channel_struct.get("title", "unknown channel")
+        return channel_struct.title or "unknown channel"
 
-    def _waveform_chan_to_series(self, spike2_struct: Spike2Realwave | Spike2Waveform | None,
-                                 name: str, index_name: str = schema.TIMESTAMP) -> pd.Series:
-        values, times = np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+    @staticmethod
+    def _time_base(spike2_struct: Spike2Realwave | Spike2Waveform, lo: int, hi: int,
+                   name: str | None = None) -> RegularTimeBase:
+        """Time base of the samples ``lo:hi`` of a channel. It is a slice of the time base of the complete channel, so
+        the timestamps don't depend on the time range which is read."""
+        return RegularTimeBase.regular(spike2_struct.start, spike2_struct.interval, spike2_struct.length,
+                                       name=name).slice(lo, hi)
+
+    def _waveform_chan_arrays(self, spike2_struct: Spike2Realwave | Spike2Waveform | None,
+                              index_name: str = schema.TIMESTAMP) -> tuple[np.ndarray, pd.Index | RegularTimeBase]:
+        """Loads the values as stored in the file (int16 samples for waveforms) and the timestamps of a channel. The
+        timestamps of regularly sampled channels are returned as a time base."""
+        values, times = np.empty(0, dtype=self._dtype), pd.Index(np.empty(0, dtype=np.float64), name=index_name)
         if spike2_struct is not None and spike2_struct.length > 0:
             slicer = spike2_struct.timerange_slice(self._start, self._end)
             values = spike2_struct.get_values_slice(slicer)
             if isinstance(spike2_struct, Spike2Realwave):
-                times = np.empty(len(values))
-                start = slicer.start * spike2_struct.interval + spike2_struct.start
-                _kernel_offset_assign(times, start, spike2_struct.interval, 0, len(times))
+                lo, _, _ = slicer.indices(spike2_struct.length)
+                times = self._time_base(spike2_struct, lo, lo + len(values), name=index_name)
             else:
-                times = spike2_struct.get_times_slice(slicer)
+                times = pd.Index(spike2_struct.get_times_slice(slicer), name=index_name, copy=False)
+        return values, times
 
-        series = pd.Series(data=values, index=pd.Index(times, name=index_name, copy=False),
-                           name=name, copy=False)
-        return series
+    def _quantization(self, spike2_struct: Spike2Waveform) -> tuple[float, float]:
+        """Scale and offset of the samples of a waveform channel, which are only applied if ``scaled`` is set"""
+        return (spike2_struct.scale, spike2_struct.offset) if self._scaled else (1., 0.)
+
+    def _waveform_chan_values(self, spike2_struct: Spike2Realwave | Spike2Waveform | None,
+                              values: np.ndarray) -> np.ndarray:
+        if isinstance(spike2_struct, Spike2Waveform) and np.issubdtype(values.dtype, np.integer):
+            return dequantize(values, *self._quantization(spike2_struct), dtype=self._dtype)
+        return values.astype(self._dtype, copy=False)
+
+    def _waveform_chan_blocks(self, spike2_struct: Spike2Realwave | Spike2Waveform | None,
+                              block_size: int) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Yields the values as stored in the file and the timestamps of a channel in blocks of ``block_size`` samples.
+        Each block is read from the file on its own."""
+        if spike2_struct is None or spike2_struct.length == 0:
+            return
+        lo, hi, _ = spike2_struct.timerange_slice(self._start, self._end).indices(spike2_struct.length)
+        time_base = self._time_base(spike2_struct, lo, hi) if isinstance(spike2_struct, Spike2Realwave) else None
+        for block_start in range(lo, hi, block_size):
+            block = slice(block_start, min(block_start + block_size, hi))
+            times = time_base.timestamps(block.start - lo, block.stop - lo) if time_base is not None else \
+                np.asarray(spike2_struct.get_times_slice(block), dtype=np.float64)
+            yield spike2_struct.get_values_slice(block), times
+
+    def iter_sig_chan(self, chan_id: SPIKE2_CHANID | None, quantity: pq.Quantity, name: str | None = None,
+                      samples: int | None = None, duration: float | None = None, block_size: int = 2 ** 20) \
+            -> Iterator[ContinuousContainer]:
+        """Yields a waveform channel between ``start`` and ``end`` in consecutive chunks of a number of samples or a
+        duration (see :func:`~openmnglab.util.arrays.rechunk`). The file is read in blocks of ``block_size`` samples,
+        so only the blocks of the current chunk are held in memory. The file stays open until the iteration ends.
+
+        :param chan_id: id of the channel
+        :param quantity: unit of the values
+        :param name: name of the chunks, defaults to the title of the channel
+        :param samples: number of samples of each chunk
+        :param duration: duration of each chunk, in the time unit of the file
+        :param block_size: number of samples read from the file at once
+        """
+        with HDFMatFile(self._path, 'r') as f:
+            chan_struct = Spike2ReaderFunc.Spike2Channels(f).get_chan(chan_id)
+            parsed_struct = spike2_struct(chan_struct) if chan_struct is not None else None
+            name = self._get_channel_name(parsed_struct, name_override=name)
+            units = {name: quantity, schema.TIMESTAMP: self._time_unit}
+            blocks = self._waveform_chan_blocks(parsed_struct, block_size)
+            for values, times in rechunk(blocks, samples=samples, duration=duration):
+                index = pd.Index(times, name=schema.TIMESTAMP, copy=False)
+                if self._quantized and isinstance(parsed_struct, Spike2Waveform) and \
+                        np.issubdtype(values.dtype, np.integer):
+                    yield SignalContainer(values, index, name, dict(units), *self._quantization(parsed_struct),
+                                          dtype=self._dtype)
+                else:
+                    yield ContinuousContainer(self._waveform_chan_values(parsed_struct, values), index, name,
+                                              dict(units))
+
+    def iter_signal(self, samples: int | None = None, duration: float | None = None) -> Iterator[ContinuousContainer]:
+        """Yields the signal channel in consecutive chunks, see :meth:`iter_sig_chan`"""
+        return self.iter_sig_chan(self._signal_chan, self._signal_unit, name=schema.SIGNAL, samples=samples,
+                                  duration=duration)
 
     def _marker_chan_to_series(self, spike2_struct: Spike2Marker | None, name: str,
                                index_name: str = schema.TIMESTAMP) -> pd.Series:
@@ -186,11 +266,32 @@ class Spike2ReaderFunc(SourceFunctionBase):
         series = pd.Series(data=levels, index=pd.Index(times, name=index_name, copy=False), copy=False, name=name)
         return series
 
+    def _lazy_sig_chan(self, spike2_struct: Spike2Realwave | Spike2Waveform, name: str,
+                       units: dict[str, pq.Quantity]) -> ContinuousContainer:
+        """A channel whose samples are read from the file on access. Quantized samples of waveforms are always kept
+        in a :class:`SignalContainer`, which dequantizes the parts which are read."""
+        lo, hi, _ = spike2_struct.timerange_slice(self._start, self._end).indices(spike2_struct.length)
+        hi = max(lo, hi)
+        times = self._time_base(spike2_struct, lo, hi, name=schema.TIMESTAMP)
+        dataset = spike2_struct.hdfgroup.h5group["values"]
+        if isinstance(spike2_struct, Spike2Waveform) and np.issubdtype(dataset.dtype, np.integer):
+            return SignalContainer(HDF5Array(self._path, dataset.name, start=lo, stop=hi), times, name, units,
+                                   *self._quantization(spike2_struct), dtype=self._dtype)
+        return ContinuousContainer(HDF5Array(self._path, dataset.name, start=lo, stop=hi, dtype=self._dtype), times,
+                                   name, units)
+
     def _load_sig_chan(self, chan_struct: dict | None, quantity: pq.Quantity, time_quantity: pq.Quantity = pq.second,
                        name: str | None = None):
         parsed_struct = spike2_struct(chan_struct) if chan_struct is not None else None
-        series = self._waveform_chan_to_series(parsed_struct, self._get_channel_name(parsed_struct, name_override=name))
-        return PandasContainer(series, {series.name: quantity, series.index.name: time_quantity})
+        name = self._get_channel_name(parsed_struct, name_override=name)
+        units = {name: quantity, schema.TIMESTAMP: time_quantity}
+        if self._lazy and isinstance(parsed_struct, (Spike2Realwave, Spike2Waveform)) and parsed_struct.length > 0:
+            return self._lazy_sig_chan(parsed_struct, name, units)
+        values, times = self._waveform_chan_arrays(parsed_struct)
+        if self._quantized and isinstance(parsed_struct, Spike2Waveform) and np.issubdtype(values.dtype, np.integer):
+            return SignalContainer(values, times, name, units, *self._quantization(parsed_struct),
+                                   dtype=self._dtype)
+        return ContinuousContainer(self._waveform_chan_values(parsed_struct, values), times, name, units)
 
     def _load_unbinned_event(self, chan_struct: dict | None, quantity: pq.Quantity = pq.dimensionless,
                              time_quantity: pq.Quantity = pq.second):
@@ -211,6 +312,44 @@ class Spike2ReaderFunc(SourceFunctionBase):
                                              name=self._get_channel_name(parsed_struct, name_override=name))
         return PandasContainer(series, {series.name: pq.dimensionless, series.index.name: time_quantity})
 
+    def scan(self) -> dict:
+        """Summarizes the file from the ``title``, ``length``, ``start`` and ``interval`` fields of its channels without
+        reading their values. Covers the complete file regardless of ``start`` and ``end``.
+
+        :return: the titles of all channels (``channels``), the first and last timestamp, the number of samples and the
+            sampling rate of the signal channel (``start``, ``end``, ``samples``, ``sampling_rate``), the number of
+            external ``pulses``, the number of wavemark channels (``tracks``) and the number of ``comments``
+        """
+        with HDFMatFile(self._path, 'r') as f:
+            channels = Spike2ReaderFunc.Spike2Channels(f)
+            titles, tracks = [], 0
+            for struct_name, group in f.items():
+                title = group.get("title", default=None)
+                titles.append(title[0] if title else struct_name)
+                try:
+                    tracks += isinstance(spike2_struct(group), Spike2Wavemark)
+                except Exception:
+                    continue
+
+            def parsed_chan(chan_id: SPIKE2_CHANID | None):
+                try:
+                    group = channels.get_chan(chan_id)
+                except KeyError:
+                    return None
+                return spike2_struct(group) if group is not None else None
+
+            def length(chan_id: SPIKE2_CHANID | None) -> int:
+                parsed = parsed_chan(chan_id)
+                return int(parsed.length) if parsed is not None else 0
+
+            signal = parsed_chan(self._signal_chan)
+            samples = int(signal.length) if isinstance(signal, (Spike2Realwave, Spike2Waveform)) else 0
+            start = float(signal.start) if samples > 0 else math.nan
+            interval = float(signal.interval) if samples > 0 else math.nan
+            return dict(channels=tuple(titles), start=start, end=start + (samples - 1) * interval, samples=samples,
+                        sampling_rate=1 / interval, pulses=length(self._ext_pul), tracks=tracks,
+                        comments=length(self._comments))
+
     def execute(self) -> tuple[PandasContainer, ...]:
         with HDFMatFile(self._path, 'r') as f:
             channels = Spike2ReaderFunc.Spike2Channels(f)
@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from openmnglab.datamodel.pandas.model import PandasDataSchema
+from openmnglab.datamodel.pandas.store import RecordingStore
+from openmnglab.functions.base import SourceFunctionDefinitionBase
+from openmnglab.functions.input.readers.funcs.native_store_reader import NativeStoreReaderFunc
+from openmnglab.model.planning.interface import IDataReference
+from openmnglab.util.hashing import HashBuilder
+
+
+class NativeStoreReader(SourceFunctionDefinitionBase[tuple[IDataReference, ...]]):
+    """Loads the data of a native recording store, i.e. a DAPSYS file or Spike2 export converted with
+    ``openmnglab-convert`` (see :mod:`openmnglab.cli.convert`).
+
+    In: nothing
+
+    Out: the outputs of the reader the store was converted from, in the same order and with the same schemas. Outputs
+    which were not loaded during the conversion (i.e. channels not found in a Spike2 file) are ``None``.
+
+    Use the ``start`` and ``end`` parameters to load only a section of the data by specifying the start, respective end
+    timestamps in the time unit of the data (seconds for both readers). Only the chunks of the continuous signals
+    spanning that section are read. Compressed chunks are only decompressed once the samples are accessed, so functions
+    processing parts of a signal (like :class:`~openmnglab.functions.processing.windows.Windows`) only decompress the
+    chunks they need.
+
+    :param path: directory of the store
+    :param start: first timestamp to load, defaults to the start of the recording
+    :param end: last timestamp to load, defaults to the end of the recording
+    :param mmap: memory map the data instead of reading it into memory. Memory mapped data is read only.
+    :param threads: maximum number of threads decompressing chunks, defaults to the number of processors
+    """
+
+    def __init__(self, path: str | Path, start: float = -np.inf, end: float = np.inf, mmap: bool = True,
+                 threads: Optional[int] = None):
+        super().__init__("openmnglab.nativestorereader")
+        self._path = path
+        self._start = start
+        self._end = end
+        self._mmap = mmap
+        self._threads = threads
+
+    @property
+    def config_hash(self) -> bytes:
+        return HashBuilder().path(self._path) \
+            .dynamic(self._start) \
+            .dynamic(self._end) \
+            .digest()
+
+    @property
+    def produces(self) -> Sequence[PandasDataSchema]:
+        return RecordingStore(self._path).schemas
+
+    def new_function(self) -> NativeStoreReaderFunc:
+        return NativeStoreReaderFunc(self._path, start=self._start, end=self._end, mmap=self._mmap,
+                                     threads=self._threads)
@@ -1,5 +1,7 @@
+from __future__ import annotations
+
 from pathlib import Path
-from typing import Iterable, Optional, Sequence
+from typing import Iterable, Iterator, Optional, Sequence
 
 import numpy as np
 import pandas as pd
@@ -8,18 +10,21 @@ from pandera import SeriesSchema, Index, MultiIndex, Category
 
 import openmnglab.datamodel.pandas.schemas as schema
 from openmnglab.datamodel.pandas.model import PandasDataSchema
+from openmnglab.datamodel.pandas.signal import ContinuousContainer
 from openmnglab.functions.base import SourceFunctionDefinitionBase
 from openmnglab.functions.input.readers.funcs.spike2_reader import SPIKE2_CHANID, Spike2ReaderFunc, SPIKE2_V_CHAN, \
     SPIKE2_EXTPULSES, SPIKE2_CODES, SPIKE2_DIGMARK, SPIKE2_KEYBOARD
 from openmnglab.model.datamodel.interface import IDataSchema
+from openmnglab.model.functions.interface import ITimeRangeSourceDefinition
 from openmnglab.model.planning.interface import IDataReference
+from openmnglab.util.dtypes import float_dtype
 from openmnglab.util.hashing import HashBuilder
 
 
 class Spike2Reader(SourceFunctionDefinitionBase[tuple[
     IDataReference[pd.Series], IDataReference[pd.Series], IDataReference[pd.Series], IDataReference[pd.Series],
     IDataReference[
-        pd.Series]]]):
+        pd.Series]]], ITimeRangeSourceDefinition):
     """ Load data from Spike2 recordings exported to MATLAB v7.3+ files
         Attempts to load data from 9 channels. To avoid loading data from a channel, pass ``None`` as a channels name,to avoid loading data from itl.
         Channels can be specified either by their name or their numeric channel id. Channel ids are only available, if the MATLAB file
@@ -47,6 +52,18 @@ class Spike2Reader(SourceFunctionDefinitionBase[tuple[
         :param temp_unit: Unit to use for the temperature channel, defaults to degree Celsius.
         :param v_chan_unit: Unit to use for the v_chan channel, defaults to dimensionless.
         :param time_unit: Unit to use for all timestamps, defaults to seconds.
+        :param dtype: dtype of the values of the signal, mass, temperature and v chan channels, float32 or float64.
+        :param quantized: keep the int16 samples of waveform channels together with their scale and offset (see
+            ``scaled``) in a :class:`~openmnglab.datamodel.pandas.signal.SignalContainer` instead of converting them to
+            float values.
+        :param lazy: read the samples of the signal, mass, temperature and v chan channels from the file when they are
+            accessed instead of loading them (see :class:`~openmnglab.datamodel.pandas.lazy.HDF5Array`), so functions
+            which only need parts of them, like windows around spikes, only read these parts. The timestamps are
+            calculated from the start and sampling interval of the channels. The file must not be moved while the
+            data is in use.
+        :param scaled: apply the scale and offset stored in the file to the int16 samples of waveform channels.
+            Otherwise, the values are the samples as stored in the file and quantized channels have a scale of 1 and an
+            offset of 0.
     """
 
     def __init__(self, path: str | Path,
@@ -65,7 +82,11 @@ class Spike2Reader(SourceFunctionDefinitionBase[tuple[
                  signal_unit: pq.Quantity = pq.microvolt,
                  temp_unit: pq.Quantity = pq.celsius,
                  v_chan_unit: pq.Quantity = pq.dimensionless,
-                 time_unit: pq.Quantity = pq.second):
+                 time_unit: pq.Quantity = pq.second,
+                 dtype=np.float64,
+                 quantized: bool = False,
+                 lazy: bool = False,
+                 scaled: bool = False):
         super().__init__("codingchipmunk.spike2loader")
         self._start = start
         self._end = end
@@ -84,10 +105,14 @@ class Spike2Reader(SourceFunctionDefinitionBase[tuple[
         self._v_chan_unit = v_chan_unit
         self._time_unit = time_unit
         self._path = path
+        self._dtype = float_dtype(dtype)
+        self._quantized = quantized
+        self._lazy = lazy
+        self._scaled = scaled
 
     @property
     def config_hash(self) -> bytes:
-        return HashBuilder().dynamic(self._start) \
+        hsh = HashBuilder().dynamic(self._start) \
             .dynamic(self._end) \
             .dynamic(self._temp_chan) \
             .dynamic(self._signal_chan) \
@@ -103,12 +128,18 @@ class Spike2Reader(SourceFunctionDefinitionBase[tuple[
             .quantity(self._v_chan_unit) \
             .quantity(self._time_unit) \
             .path(self._path) \
-            .digest()
+            .dtype(self._dtype) \
+            .bool(self._quantized)
+        if self._scaled:
+            hsh.bool(self._scaled)
+        return hsh.digest()
 
     @property
     def produces(self) -> Optional[Sequence[IDataSchema] | IDataSchema]:
-        return schema.float_timeseries(schema.SIGNAL), schema.float_timeseries(schema.MASS), schema.float_timeseries(
-            schema.TEMPERATURE), schema.float_timeseries(SPIKE2_V_CHAN), \
+        return schema.float_timeseries(schema.SIGNAL, dtype=self._dtype), \
+            schema.float_timeseries(schema.MASS, dtype=self._dtype), \
+            schema.float_timeseries(schema.TEMPERATURE, dtype=self._dtype), \
+            schema.float_timeseries(SPIKE2_V_CHAN, dtype=self._dtype), \
             PandasDataSchema(SeriesSchema(np.int8, index=Index(float, name=schema.TIMESTAMP), name=SPIKE2_EXTPULSES)), \
             PandasDataSchema(SeriesSchema(str, index=MultiIndex(
                 indexes=[Index(float, name=schema.TIMESTAMP), Index(np.uint32, name=SPIKE2_CODES)]),
@@ -133,4 +164,21 @@ class Spike2Reader(SourceFunctionDefinitionBase[tuple[
                                 temp_unit=self._temp_unit,
                                 v_chan_unit=self._v_chan_unit,
                                 time_unit=self._time_unit,
-                                path=self._path)
+                                path=self._path,
+                                dtype=self._dtype,
+                                quantized=self._quantized,
+                                lazy=self._lazy,
+                                scaled=self._scaled)
+
+    def with_time_range(self, start: float, end: float) -> Spike2Reader:
+        return self._replace(_start=max(self._start, start), _end=min(self._end, end))
+
+    def iter_signal(self, samples: Optional[int] = None, duration: Optional[float] = None) \
+            -> Iterator[ContinuousContainer]:
+        """Reads the signal channel in consecutive chunks instead of loading it at once, see
+        :meth:`~openmnglab.functions.input.readers.funcs.spike2_reader.Spike2ReaderFunc.iter_sig_chan`.
+
+        :param samples: number of samples of each chunk
+        :param duration: duration of each chunk, in the time unit of the file
+        """
+        return self.new_function().iter_signal(samples=samples, duration=duration)
@@ -1,10 +1,7 @@
 from enum import StrEnum
-from typing import Optional, Callable
+from typing import Optional, Callable, TYPE_CHECKING
 
 import pandas as pd
-import seaborn as sns
-from matplotlib import pyplot as plt
-from matplotlib.axes import Axes
 
 from openmnglab.datamodel.matplot.model import MatPlotLibContainer
 from openmnglab.datamodel.pandas.model import PandasContainer
@@ -13,6 +10,9 @@ from openmnglab.functions.base import FunctionBase
 from openmnglab.functions.processing.funcs.windows import LEVEL_COLUMN
 from openmnglab.util.seaborn import Theme
 
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
 
 class WaveformPlotMode(StrEnum):
     AVERAGE = "avg"
@@ -61,8 +61,9 @@ class WaveformPlotFunc(FunctionBase):
     def _relplot(self) -> bool:
         return self.col is not None or self.row is not None
 
-    def _plot_line(self, **lineplot_kwargs) -> plt.Figure:
-        ax: Axes
+    def _plot_line(self, **lineplot_kwargs) -> "Figure":
+        import seaborn as sns
+        from matplotlib import pyplot as plt
         lineplot_kwargs.update(self.sns_args)
         fig, ax = plt.subplots(**self.figargs)
         sns.lineplot(data=self.data, x=self.time_col, y=self.column, palette=self.colors, hue=self.track_index, ax=ax,
@@ -71,8 +72,8 @@ class WaveformPlotFunc(FunctionBase):
         ax.set_ylabel(f"{self.column} [{self.data_container.units[self.column].dimensionality.latex}]")
         return fig
 
-    def _plot_rel(self, **lineplot_kwargs) -> plt.Figure:
-        facet: sns.FacetGrid
+    def _plot_rel(self, **lineplot_kwargs) -> "Figure":
+        import seaborn as sns
         facet = sns.relplot(data=self.data, x=self.time_col, y=self.column, palette=self.colors, hue=self.track_index,
                             row=self.row,col=self.col,  kind="line", **lineplot_kwargs)
         for axs_row in facet.axes:
@@ -83,18 +84,18 @@ class WaveformPlotFunc(FunctionBase):
                 ax.set_xlabel(f"{self.time_col} [{self.data_container.units[self.time_col].dimensionality.latex}]")
         return facet.fig
 
-    def _plot(self, **plot_kwargs) -> plt.Figure:
+    def _plot(self, **plot_kwargs) -> "Figure":
         if self.row is not None or self.column is not None:
             return self._plot_rel(**plot_kwargs)
         return self._plot_line(**plot_kwargs)
 
-    def _plot_avg(self) -> plt.Figure:
+    def _plot_avg(self) -> "Figure":
         args = dict(errorbar="sd")
         if self._relplot:
             return self._plot_rel(**args)
         return self._plot_line(**args)
 
-    def _plot_overlap(self) -> plt.Figure:
+    def _plot_overlap(self) -> "Figure":
         universal_kwargs = dict(estimator=None, units=self.stim_idx, alpha=self.alpha)
         if self._relplot:
             return self._plot_rel(**universal_kwargs)
@@ -1,6 +1,5 @@
-from typing import Optional, Callable
+from typing import Optional, Callable, TYPE_CHECKING
 
-import matplotlib.pyplot as plt
 import pandas as pd
 from pandera import DataFrameSchema, Column
 
@@ -14,8 +13,11 @@ from openmnglab.model.planning.interface import IDataReference
 from openmnglab.util.hashing import HashBuilder
 from openmnglab.util.seaborn import Theme
 
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
-class WaveformPlot(StaticFunctionDefinitionBase[IDataReference[plt.Figure]]):
+
+class WaveformPlot(StaticFunctionDefinitionBase[IDataReference["Figure"]]):
     """Function to plot waveforms. Can either plot average waveforms or each for its own.
     Multi-plots can be created by using the col and row parameters which are passed to the underlying seaborn function.
 
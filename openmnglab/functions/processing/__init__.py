@@ -1,2 +1,20 @@
-from openmnglab.functions.processing.windows import Windows
-from openmnglab.functions.processing.static_intervals import StaticIntervals
+from typing import TYPE_CHECKING
+
+from openmnglab.util.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from openmnglab.functions.processing.windows import Windows
+    from openmnglab.functions.processing.static_intervals import StaticIntervals
+    from openmnglab.functions.processing.static_windows import StaticWindows
+    from openmnglab.functions.processing.time_slice import TimeSlice
+
+_EXPORTS = {
+    "Windows": "openmnglab.functions.processing.windows",
+    "StaticIntervals": "openmnglab.functions.processing.static_intervals",
+    "StaticWindows": "openmnglab.functions.processing.static_windows",
+    "TimeSlice": "openmnglab.functions.processing.time_slice",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -4,7 +4,9 @@ import numpy as np
 import pandas
 import quantities as pq
 from pandas import Series, Interval, IntervalDtype
+from pandas.arrays import IntervalArray
 
+from openmnglab.datamodel.array.model import ArrayContainer
 from openmnglab.datamodel.pandas.model import PandasContainer
 from openmnglab.functions.base import FunctionBase
 from openmnglab.functions.helpers.general import get_index_quantities
@@ -12,7 +14,7 @@ from openmnglab.functions.helpers.quantity_helpers import magnitudes, rescale_pq
 
 
 class StaticIntervalsFunc(FunctionBase):
-    def __init__(self, lo: pq.Quantity, hi: pq.Quantity, name: str, closed="right"):
+    def __init__(self, lo: pq.Quantity, hi: pq.Quantity, name: str, closed="right", arrays=False):
         assert (isinstance(lo, pq.Quantity))
         assert (isinstance(hi, pq.Quantity))
         self._target_series_container: PandasContainer[Series] = None
@@ -20,14 +22,27 @@ class StaticIntervalsFunc(FunctionBase):
         self._hi = hi
         self._closed = closed
         self._name = name
+        self._arrays = arrays
+
+    def _execute_arrays(self) -> ArrayContainer:
+        origin = ArrayContainer.from_pandas(self._target_series_container)
+        origin_name, values = next(iter(origin.columns.items()))
+        series_quantity = origin.units[origin_name]
+        lo, hi = magnitudes(*rescale_pq(series_quantity, self._lo, self._hi))
+        intervals = IntervalArray.from_arrays(values + lo, values + hi, closed=self._closed)
+        units = {index_name: origin.units[index_name] for index_name in origin.index_names}
+        units[self._name] = series_quantity
+        return ArrayContainer({self._name: intervals}, origin.index_columns, units, series=True)
 
     def execute(self) -> PandasContainer[Series]:
+        if self._arrays:
+            return self._execute_arrays()
         origin_series = self._target_series_container.data
         series_quantity = self._target_series_container.units[origin_series.name]
         lo, hi = magnitudes(*rescale_pq(series_quantity, self._lo, self._hi))
 
         def to_interval(val):
-            return Interval(val + lo, val + hi) if val is not None else None
+            return Interval(val + lo, val + hi, closed=self._closed) if val is not None else None
 
         # window_series: Series = origin_series.transform(to_interval)
 
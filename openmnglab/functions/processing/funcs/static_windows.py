@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import quantities as pq
+from pandas import Index
+
+from openmnglab.datamodel.array.model import ArrayContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+from openmnglab.functions.helpers.general import interval_locs
+from openmnglab.functions.helpers.quantity_helpers import magnitudes, rescale_pq
+from openmnglab.functions.processing.funcs.windows import WindowsFunc
+
+
+class StaticWindowsFunc(WindowsFunc):
+    """Calculates the windows of intervals with static offsets around events, like a
+    :class:`~openmnglab.functions.processing.funcs.static_intervals.StaticIntervalsFunc` followed by a
+    :class:`~openmnglab.functions.processing.funcs.windows.WindowsFunc`, but locates the bounds of the intervals
+    directly in the recording instead of creating the series of intervals."""
+
+    def __init__(self, lo: pq.Quantity, hi: pq.Quantity, levels: tuple[int, ...], derivatives: bool,
+                 derivative_change: Optional[pq.Quantity], interval: Optional[float] = None, use_time_offsets=True,
+                 dtype=None, arrays=False, closed="right"):
+        assert (isinstance(lo, pq.Quantity))
+        assert (isinstance(hi, pq.Quantity))
+        super().__init__(levels, derivatives, derivative_change, interval=interval, use_time_offsets=use_time_offsets,
+                         dtype=dtype, arrays=arrays)
+        self._lo = lo
+        self._hi = hi
+        self._closed = closed
+
+    def _ranges_around(self, events: np.ndarray, unit: pq.Quantity,
+                       rec_index: Index | RegularTimeBase) -> np.ndarray:
+        lo, hi = magnitudes(*rescale_pq(unit, self._lo, self._hi))
+        return interval_locs(events + lo, events + hi, self._closed, rec_index)
+
+    def _array_interval_ranges(self, events: ArrayContainer, rec_index: Index | RegularTimeBase) -> np.ndarray:
+        name, values = next(iter(events.columns.items()))
+        return self._ranges_around(np.asarray(values), events.units[name], rec_index)
+
+    def _interval_ranges(self, rec_index: Index | RegularTimeBase) -> np.ndarray:
+        events = self._window_intervals.data
+        return self._ranges_around(events.values, self._window_intervals.units[events.name], rec_index)
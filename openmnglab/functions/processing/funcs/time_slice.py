@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer
+from openmnglab.datamodel.pandas.slicing import is_signal, slice_events, slice_signal, time_element
+from openmnglab.functions.base import FunctionBase
+from openmnglab.functions.helpers.quantity_helpers import magnitudes, rescale_pq
+
+
+class TimeSliceFunc(FunctionBase):
+    """Selects the samples of a signal or the events between two timestamps, both inclusive"""
+
+    def __init__(self, start: pq.Quantity, end: pq.Quantity):
+        assert (isinstance(start, pq.Quantity))
+        assert (isinstance(end, pq.Quantity))
+        self._start = start
+        self._end = end
+        self._container: PandasContainer = None
+
+    def _range(self, time_unit: pq.Quantity) -> tuple[float, float]:
+        return magnitudes(*rescale_pq(time_unit, self._start, self._end))
+
+    def execute(self) -> PandasContainer:
+        container = self._container
+        if is_signal(container):
+            time_name = container.time_index.name if isinstance(container, ContinuousContainer) else schema.TIMESTAMP
+            return slice_signal(container, *self._range(container.units[time_name]))
+        element = time_element(container)
+        if element is None:
+            raise ValueError("Data has no timestamps to slice by")
+        return slice_events(container, *self._range(container.units[element]), element=element, closed="both")
+
+    def set_input(self, container: PandasContainer):
+        self._container = container
@@ -4,73 +4,152 @@ from typing import Optional
 
 import numpy as np
 import quantities as pq
-from pandas import Series, DataFrame, MultiIndex
+from pandas import Series, DataFrame, MultiIndex, Index
 
+from openmnglab.datamodel.array.model import ArrayContainer, IndexColumn
 from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer, QUANTIZATION_BLOCK
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase, materialize
 from openmnglab.functions.base import FunctionBase
-from openmnglab.functions.helpers.general import get_interval_locs, slice_diffs_flat_np, slice_derivs_flat_np
+from openmnglab.functions.helpers.general import get_interval_locs, slice_diffs_flat_np, slice_derivs_flat_np, \
+    interval_locs, container_index_names, coalesce_ranges
 from openmnglab.model.datamodel.interface import IDataContainer
+from openmnglab.util.dtypes import inherit_float_dtype
+
+
+# windows of a continuous signal further apart than this number of samples are read separately
+COALESCE_GAP = 2 ** 12
+
+
+def window_positions(starts: np.ndarray | int, lens: np.ndarray) -> np.ndarray:
+    """Calculates the positions of all samples of consecutive windows, which is the concatenation of
+    ``np.arange(start, start + len)`` for each window.
+
+    :param starts: position of the first sample of each window (or a scalar used for all windows)
+    :param lens: number of samples of each window
+    :return: flat array of positions
+    """
+    lens = np.asarray(lens, dtype=np.int64)
+    flat_starts = np.cumsum(lens) - lens
+    return np.arange(lens.sum(), dtype=np.int64) + np.repeat(starts - flat_starts, lens)
 
 
 def offset_timestamps(cont_sig_ts, intervals):
-    total_len = 0
-    n = len(intervals[0])
-    for i in range(n):
-        total_len += intervals[1, i] - intervals[0, i]
-    new_ts = np.empty(total_len, dtype=np.float64)
-    c_pos = 0
-    for i in range(n):
-        start_i, stop_i = intervals[0, i], intervals[1, i]
-        slice = cont_sig_ts[start_i:stop_i]
-        new_ts[c_pos:c_pos + len(slice)] = slice - slice[0]
-        c_pos += len(slice)
-    return new_ts
+    lens = intervals[1] - intervals[0]
+    non_empty = lens > 0
+    return cont_sig_ts[window_positions(intervals[0], lens)] - np.repeat(cont_sig_ts[intervals[0, non_empty]],
+                                                                         lens[non_empty])
 
 
 def extend_values(base, extend_by, total):
     assert (len(base) == len(extend_by))
-    extended_values = np.empty_like(base, shape=total)
-    current_pos = 0
-    for i, repeat in enumerate(extend_by):
-        extended_values[current_pos:current_pos + repeat] = base[i]
+    extended_values = np.repeat(base, extend_by)
+    assert (len(extended_values) == total)
     return extended_values
 
 
 def extend_numpy_by_repeat(original: np.ndarray, repeat_each_element: np.ndarray, new_length: int):
-    extended_array = np.empty(new_length, dtype=original.dtype)
-    extended_i = 0
-    for original_i in range(len(original)):
-        extended_array[extended_i:extended_i + repeat_each_element[original_i]] = original[original_i]
-        extended_i += repeat_each_element[original_i]
+    extended_array = np.repeat(original, repeat_each_element)
+    assert (len(extended_array) == new_length)
     return extended_array
 
 
 def extend_multiindex_f(base: list[np.ndarray], ranges: np.ndarray, extension):
     repeats = ranges[1] - ranges[0]
-    n = np.sum(repeats)
-    multiidx = [extend_numpy_by_repeat(orig_arr, repeats, n) for orig_arr in base]
+    multiidx = [np.repeat(orig_arr, repeats) for orig_arr in base]
     multiidx.append(extension)
     return multiidx
 
 
 def extend_multiindex(base: list[np.ndarray], ranges: np.ndarray):
-    repeats = ranges[1] - ranges[0]
-    n = np.sum(repeats)
-    multiidx = [extend_numpy_by_repeat(orig_arr, repeats, n) for orig_arr in base]
-    new_codes = np.empty(n, dtype=np.int64)
-    i = 0
-    for range_i in range(len(ranges[0])):
-        for v in range(ranges[0, range_i], ranges[1, range_i]):
-            new_codes[i] = v
-            i += 1
-    multiidx.append(new_codes)
-    return multiidx
+    return extend_multiindex_f(base, ranges, window_positions(ranges[0], ranges[1] - ranges[0]))
+
+
+def build_window_index(intervals_index: MultiIndex, interval_ranges: np.ndarray,
+                       recording_index: Index | RegularTimeBase,
+                       use_time_offsets=True, interval: Optional[float] = None) -> MultiIndex:
+    """Builds the multiindex of the window data by extending the index of the intervals with the timestamps of each sample.
+
+    :param intervals_index: index of the intervals
+    :param interval_ranges: (2, n) array with the start and stop position of each interval in the recording
+    :param recording_index: timestamp index of the recording or its time base
+    :param use_time_offsets: use the offset of each sample to the start of its window instead of the recording timestamps
+    :param interval: sampling interval for the time offsets; approximated from the first two samples if not given
+    :return: the multiindex of the window data
+    """
+    names = [*intervals_index.names, recording_index.name]
+    interval_lens = interval_ranges[1] - interval_ranges[0]
+    if use_time_offsets:
+        if len(interval_lens) > 0:
+            if interval is None:
+                interval = recording_index[1] - recording_index[0]
+            index_values = np.arange(interval_lens.max()) * interval
+            codes = window_positions(0, interval_lens)
+            multiindex_codes = extend_multiindex_f(intervals_index.codes, interval_ranges, codes)
+            levels = (*intervals_index.levels, index_values)
+        else:
+            multiindex_codes = [[] for _ in range(len(names))]
+            levels = [tuple() for _ in range(len(names))]
+        return MultiIndex(levels=levels, names=names, codes=multiindex_codes)
+    # calculate the codes of the multiindex in relation to the actual timestamp array. This way, we can just re-use the timestamps from the recording,
+    # without copying them. The codes are valid by construction, so we skip the integrity check, which would also
+    # hash the complete timestamp array.
+    multiindex_codes = extend_multiindex(intervals_index.codes, interval_ranges)
+    return MultiIndex(levels=(*intervals_index.levels, materialize(recording_index)), names=names,
+                      codes=multiindex_codes, verify_integrity=False)
+
+
+def slice_levels_blockwise(signal: ContinuousContainer, derivatives: bool, interval_ranges: np.ndarray,
+                           diff_levels: int, dtype, max_gap: int = COALESCE_GAP) -> np.ndarray:
+    """Calculates the diffs (or derivatives) of the windows of a continuous signal, without creating its complete
+    series. The windows are sorted by their start and coalesced into groups (see
+    :func:`~openmnglab.functions.helpers.general.coalesce_ranges`) spanning at most :data:`QUANTIZATION_BLOCK`
+    samples, windows further than ``max_gap`` samples apart are in different groups. Only the samples (and timestamps)
+    a group spans are read, dequantized (respective calculated) at once, so windows of a lazily read signal (see
+    :mod:`openmnglab.datamodel.pandas.lazy`) are read with a few sorted range reads, skipping the samples between
+    distant windows.
+
+    :param signal: the continuous signal
+    :param derivatives: calculate the derivatives instead of the absolute changes
+    :param interval_ranges: (2, n) array with the start and stop position of each window in the signal
+    :param diff_levels: number of diff levels to calculate
+    :param dtype: dtype of the output
+    :param max_gap: maximum number of samples between the windows of a group
+    :return: (diff_levels + 1, total window length) array, the same as :func:`slice_diffs_flat_np` or
+        :func:`slice_derivs_flat_np` calculate for the dequantized signal
+    """
+    lens = interval_ranges[1] - interval_ranges[0]
+    order = np.argsort(interval_ranges[0], kind="stable")
+    in_order = bool(np.all(order[1:] > order[:-1]))
+    sorted_ranges, sorted_lens = (interval_ranges, lens) if in_order else (interval_ranges[:, order], lens[order])
+    positions = np.concatenate(([0], np.cumsum(sorted_lens)))
+    diffs = np.empty((diff_levels + 1, positions[-1]), dtype=dtype)
+    # include the samples before the windows, which the kernels use for the first diffs
+    reads = np.maximum(sorted_ranges[0] - diff_levels - 1, 0)
+    bounds = coalesce_ranges(reads, sorted_ranges[1], max_gap, QUANTIZATION_BLOCK)
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        ranges = sorted_ranges[:, first:last]
+        lo, hi = reads[first], ranges[1].max()
+        values = signal.samples(lo, hi).astype(dtype, copy=False)
+        out = diffs[:, positions[first]:positions[last]]
+        if not derivatives:
+            slice_diffs_flat_np(values, ranges - lo, diff_levels, diffs=out)
+        else:
+            slice_derivs_flat_np(values, signal.times(lo, hi), ranges - lo, diff_levels, diffs=out)
+    if in_order:
+        return diffs
+    # move the windows back into the order of the intervals
+    unsorted = np.empty_like(diffs)
+    flat_starts = np.cumsum(lens) - lens
+    unsorted[:, window_positions(flat_starts[order], sorted_lens)] = diffs
+    return unsorted
 
 
 class WindowsFunc(FunctionBase):
     def __init__(self, levels: tuple[int, ...],
                  derivatives: bool,
-                 derivative_change: Optional[pq.Quantity], interval: Optional[float] = None, use_time_offsets=True):
+                 derivative_change: Optional[pq.Quantity], interval: Optional[float] = None, use_time_offsets=True,
+                 dtype=None, arrays=False):
         self._levels = levels
         self._window_intervals: PandasContainer[Series] = None
         self._recording: PandasContainer[Series] = None
@@ -78,17 +157,18 @@ class WindowsFunc(FunctionBase):
         self._derivative_time_base = derivative_change
         self._use_time_offsets = use_time_offsets
         self._interval = interval
+        self._dtype = dtype
+        self._arrays = arrays
 
     def build_unitdict(self):
-        intervals = self._window_intervals.data
         units: dict[str, pq.Quantity] = dict()
-        for interval_index_name in intervals.index.names:
+        for interval_index_name in container_index_names(self._window_intervals):
             units[interval_index_name] = self._window_intervals.units[interval_index_name]
-        col_unit = self._recording.units[self._recording.data.name]
-        units[self._recording.data.index.name] = self._recording.units[self._recording.data.index.name]
-        v_unit = self._recording.units[self._recording.data.name]
-        t_unit = self._recording.units[
-            self._recording.data.index.name] if self._derivative_time_base is None else self._derivative_time_base
+        rec_index, rec_name = self._recording_index_and_name()
+        units[rec_index.name] = self._recording.units[rec_index.name]
+        v_unit = self._recording.units[rec_name]
+        t_unit = self._recording.units[rec_index.name] if self._derivative_time_base is None \
+            else self._derivative_time_base
         for i in self._levels:
             name = LEVEL_COLUMN[i]
             u = v_unit
@@ -98,52 +178,78 @@ class WindowsFunc(FunctionBase):
             units[name] = u
         return units
 
-    def execute(self) -> PandasContainer[DataFrame]:
-        intervals = self._window_intervals.data
+    def _recording_index_and_name(self) -> tuple[Index | RegularTimeBase, str]:
+        # a continuous signal provides its timestamps without creating the series
+        if isinstance(self._recording, ContinuousContainer):
+            return self._recording.time_index, self._recording.name
+        return self._recording.data.index, self._recording.data.name
+
+    def _levels_of(self, interval_ranges: np.ndarray) -> np.ndarray:
+        diff_levels = max(self._levels)
+        if isinstance(self._recording, ContinuousContainer):
+            dtype = inherit_float_dtype(self._dtype, self._recording.dtype)
+            return slice_levels_blockwise(self._recording, self._derivative_mode, interval_ranges, diff_levels, dtype)
         recording = self._recording.data
-        interval_ranges = np.fromiter(
-            (val for interval in intervals.values for val in get_interval_locs(interval, recording.index)), dtype=int) \
-            .reshape((2, -1), order='F')
-        units = self.build_unitdict()
+        values = recording.values.astype(inherit_float_dtype(self._dtype, recording.dtype), copy=False)
         if not self._derivative_mode:
-            diffs = slice_diffs_flat_np(recording.values, interval_ranges, diff_levels=max(self._levels))[
-                self._levels,]
-        else:
-            diffs = slice_derivs_flat_np(recording.values.astype(np.float64), recording.index.values, interval_ranges,
-                                         diff_levels=max(self._levels))[
-                self._levels,]
-            if self._derivative_time_base is not None:
-                current_unit = units[LEVEL_COLUMN[0]] / units[recording.index.name]
-                desired_unit = units[LEVEL_COLUMN[0]] / self._derivative_time_base
-                scaler = current_unit.rescale(desired_unit).magnitude
-                diffs[1:] *= scaler
-
-        if self._use_time_offsets:
-            interval_lens = interval_ranges[1] - interval_ranges[0]
-            if len(interval_lens) > 0:
-                code_cut = np.arange(interval_lens.max())
-
-                interval = self._interval if self._interval is not None else recording.index.values[1] - \
-                                                                             recording.index.values[0]
-                index_values = code_cut * interval
-                codes = np.concatenate([code_cut[:l] for l in interval_lens])
-                multiindex_codes = extend_multiindex_f(intervals.index.codes, interval_ranges, codes)
-                levels = (*intervals.index.levels, index_values)
-            else:
-                multiindex_codes = [[] for _ in range(len(intervals.index.names) + 1)]
-                levels = [tuple() for _ in range(len(intervals.index.names) + 1)]
-
-            new_multiindex = MultiIndex(levels=levels,
-                                        names=[*intervals.index.names,
-                                               recording.index.name], codes=multiindex_codes)
-        else:
-            # calculate the codes of the multiindex in relation to the actual timestamp array. This way, we can just re-use the timestamps from the recording,
-            # without copying them.
-            multiindex_codes = extend_multiindex(intervals.index.codes, interval_ranges)
+            return slice_diffs_flat_np(values, interval_ranges, diff_levels=diff_levels)
+        return slice_derivs_flat_np(values, recording.index.values, interval_ranges, diff_levels=diff_levels)
+
+    def _selected_levels(self, interval_ranges: np.ndarray, units: dict[str, pq.Quantity],
+                         rec_index: Index | RegularTimeBase) -> np.ndarray:
+        diffs = self._levels_of(interval_ranges)[self._levels,]
+        if self._derivative_mode and self._derivative_time_base is not None:
+            current_unit = units[LEVEL_COLUMN[0]] / units[rec_index.name]
+            desired_unit = units[LEVEL_COLUMN[0]] / self._derivative_time_base
+            scaler = current_unit.rescale(desired_unit).magnitude
+            diffs[1:] *= scaler
+        return diffs
+
+    def _time_index_column(self, interval_ranges: np.ndarray, rec_index: Index | RegularTimeBase) -> IndexColumn:
+        """The last index column of the window data, see :func:`build_window_index`"""
+        interval_lens = interval_ranges[1] - interval_ranges[0]
+        if not self._use_time_offsets:
+            return IndexColumn(rec_index.name, window_positions(interval_ranges[0], interval_lens),
+                               categories=materialize(rec_index))
+        if len(interval_lens) == 0:
+            return IndexColumn(rec_index.name, np.empty(0, dtype=np.int64), categories=np.empty(0))
+        interval = rec_index[1] - rec_index[0] if self._interval is None else self._interval
+        return IndexColumn(rec_index.name, window_positions(0, interval_lens),
+                           categories=np.arange(interval_lens.max()) * interval)
+
+    def _array_interval_ranges(self, intervals: ArrayContainer, rec_index: Index | RegularTimeBase) -> np.ndarray:
+        """(2, n) array with the start and stop position of the window of each interval in the recording"""
+        interval_array = next(iter(intervals.columns.values()))
+        return interval_locs(np.asarray(interval_array.left), np.asarray(interval_array.right), interval_array.closed,
+                             rec_index)
+
+    def _interval_ranges(self, rec_index: Index | RegularTimeBase) -> np.ndarray:
+        """(2, n) array with the start and stop position of the window of each interval in the recording"""
+        return np.fromiter(
+            (val for interval in self._window_intervals.data.values for val in get_interval_locs(interval, rec_index)),
+            dtype=int).reshape((2, -1), order='F')
+
+    def _execute_arrays(self) -> ArrayContainer:
+        intervals = ArrayContainer.from_pandas(self._window_intervals)
+        rec_index, _ = self._recording_index_and_name()
+        interval_ranges = self._array_interval_ranges(intervals, rec_index)
+        units = self.build_unitdict()
+        diffs = self._selected_levels(interval_ranges, units, rec_index)
+        window_of_row = np.repeat(np.arange(interval_ranges.shape[1]), interval_ranges[1] - interval_ranges[0])
+        index = [index_column.take(window_of_row) for index_column in intervals.index_columns]
+        index.append(self._time_index_column(interval_ranges, rec_index))
+        return ArrayContainer({LEVEL_COLUMN[level]: row for level, row in zip(self._levels, diffs)}, index, units)
+
+    def execute(self) -> PandasContainer[DataFrame]:
+        if self._arrays:
+            return self._execute_arrays()
+        rec_index, _ = self._recording_index_and_name()
+        interval_ranges = self._interval_ranges(rec_index)
+        units = self.build_unitdict()
+        diffs = self._selected_levels(interval_ranges, units, rec_index)
 
-            new_multiindex = MultiIndex(levels=(*intervals.index.levels, recording.index),
-                                        names=[*intervals.index.names,
-                                               recording.index.name], codes=multiindex_codes)
+        new_multiindex = build_window_index(self._window_intervals.data.index, interval_ranges, rec_index,
+                                            use_time_offsets=self._use_time_offsets, interval=self._interval)
         return PandasContainer(DataFrame(data=diffs.T,
                                          columns=[LEVEL_COLUMN[i] for i in self._levels], index=new_multiindex),
                                units=self.build_unitdict())
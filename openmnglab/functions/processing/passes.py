@@ -0,0 +1,83 @@
+"""Plan passes rewriting stages of the processing functions, see
+:class:`~openmnglab.planning.optimizer.PlanOptimizer`."""
+from __future__ import annotations
+
+from typing import Mapping, Optional, Sequence
+
+import quantities as pq
+
+from openmnglab.functions.processing.static_intervals import StaticIntervals
+from openmnglab.functions.processing.static_windows import StaticWindows
+from openmnglab.functions.processing.time_slice import TimeSlice
+from openmnglab.functions.processing.windows import Windows
+from openmnglab.model.functions.interface import ITimeRangeSourceDefinition
+from openmnglab.model.planning.plan.interface import IExecutionPlan, IStage, IVirtualData
+from openmnglab.planning.base import ExecutionPlan
+from openmnglab.planning.optimizer import PlanPass, data_producers, rebuild
+
+
+class FuseStaticWindows(PlanPass):
+    """Replaces :class:`~openmnglab.functions.processing.windows.Windows` of the intervals of a
+    :class:`~openmnglab.functions.processing.static_intervals.StaticIntervals` by a single
+    :class:`~openmnglab.functions.processing.static_windows.StaticWindows` stage, if the intervals are neither
+    requested nor used by other stages."""
+
+    def apply(self, plan: IExecutionPlan, outputs: Sequence[bytes]) -> tuple[ExecutionPlan, Mapping[bytes, bytes]]:
+        producers = data_producers(plan)
+        consumers: dict[bytes, int] = dict()
+        for stage in plan.stages.values():
+            for data in stage.data_in:
+                consumers[data.planning_id] = consumers.get(data.planning_id, 0) + 1
+        fused: dict[bytes, IStage] = dict()
+        for stage in plan.stages.values():
+            if isinstance(stage.definition, Windows):
+                intervals = stage.data_in[0].planning_id
+                producer = producers.get(intervals)
+                if producer is not None and isinstance(producer.definition, StaticIntervals) \
+                        and consumers[intervals] == 1 and intervals not in outputs:
+                    fused[stage.planning_id] = producer
+        # the rebuilt inputs of the intervals, which the fused stages consume instead
+        events: dict[bytes, Optional[IVirtualData]] = {intervals.planning_id: None for intervals in fused.values()}
+
+        def substitute(stage: IStage, data_in: tuple[IVirtualData, ...]):
+            if stage.planning_id in events:
+                events[stage.planning_id] = data_in[0]
+                return None
+            intervals = fused.get(stage.planning_id)
+            if intervals is None:
+                return stage.definition, data_in
+            return StaticWindows(intervals.definition, stage.definition), (events[intervals.planning_id], data_in[1])
+
+        return rebuild(plan, substitute)
+
+
+class PushDownTimeSlices(PlanPass):
+    """Restricts sources which can read time ranges (see
+    :class:`~openmnglab.model.functions.interface.ITimeRangeSourceDefinition`) to the range covered by the
+    :class:`~openmnglab.functions.processing.time_slice.TimeSlice` s of their outputs, if their outputs are neither
+    requested nor used by other stages. The slices are kept, so their results don't change, but only the needed range
+    is read. The restricted sources have a different configuration and are therefore different stages."""
+
+    def apply(self, plan: IExecutionPlan, outputs: Sequence[bytes]) -> tuple[ExecutionPlan, Mapping[bytes, bytes]]:
+        slices: dict[bytes, list[TimeSlice]] = dict()
+        for stage in plan.stages.values():
+            for data in stage.data_in:
+                slices.setdefault(data.planning_id, []).append(stage.definition)
+        ranges: dict[bytes, tuple[float, float]] = dict()
+        for stage in plan.stages.values():
+            if not isinstance(stage.definition, ITimeRangeSourceDefinition) \
+                    or any(data.planning_id in outputs for data in stage.data_out):
+                continue
+            consumers = [definition for data in stage.data_out for definition in slices.get(data.planning_id, ())]
+            if consumers and all(isinstance(definition, TimeSlice) for definition in consumers):
+                ranges[stage.planning_id] = (min(float(s.start.rescale(pq.s).magnitude) for s in consumers),
+                                             max(float(s.end.rescale(pq.s).magnitude) for s in consumers))
+
+        def substitute(stage: IStage, data_in: tuple[IVirtualData, ...]):
+            time_range = ranges.get(stage.planning_id)
+            if time_range is None:
+                return stage.definition, data_in
+            restricted = stage.definition.with_time_range(*time_range)
+            return restricted if restricted.config_hash != stage.definition.config_hash else stage.definition, data_in
+
+        return rebuild(plan, substitute)
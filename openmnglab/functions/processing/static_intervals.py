@@ -7,6 +7,7 @@ from pandas import DataFrame, DatetimeTZDtype, CategoricalDtype, PeriodDtype, Sp
     StringDtype, BooleanDtype
 from pandera import SeriesSchema
 
+from openmnglab.datamodel.array.model import ArrayDataSchema
 from openmnglab.datamodel.exceptions import DataSchemaCompatibilityError
 from openmnglab.datamodel.pandas.model import PandasDataSchema
 from openmnglab.functions.base import FunctionDefinitionBase
@@ -49,10 +50,11 @@ class StaticIntervals(FunctionDefinitionBase[IDataReference[DataFrame]]):
     :param offset_high: quantity of high offset
     :param name: name of the returned series
     :param closed: how the interval is closed / open
+    :param arrays: return an :class:`~openmnglab.datamodel.array.model.ArrayContainer` instead of a pandas series
     """
 
     def __init__(self, offset_low: pq.Quantity, offset_high: pq.Quantity, name: str,
-                 closed: Literal["left", "right", "both", "neither"] = "right"):
+                 closed: Literal["left", "right", "both", "neither"] = "right", arrays=False):
         FunctionDefinitionBase.__init__(self, "openmnglab.windowing")
         assert (isinstance(offset_low, pq.Quantity))
         assert (isinstance(offset_high, pq.Quantity))
@@ -62,24 +64,49 @@ class StaticIntervals(FunctionDefinitionBase[IDataReference[DataFrame]]):
         self._hi = offset_high
         self._name = name
         self._closed = closed
+        self._arrays = arrays
+
+    @property
+    def offset_low(self) -> pq.Quantity:
+        return self._lo
+
+    @property
+    def offset_high(self) -> pq.Quantity:
+        return self._hi
+
+    @property
+    def closed(self) -> str:
+        return self._closed
 
     @property
     def config_hash(self) -> bytes:
-        return HashBuilder() \
+        hsh = HashBuilder() \
             .str(self._name) \
             .quantity(self._lo) \
             .quantity(self._hi) \
             .str(self._name) \
-            .str(self._closed) \
-            .digest()
+            .str(self._closed)
+        if self._arrays:
+            hsh.bool(self._arrays)
+        return hsh.digest()
 
     @property
     def slot_acceptors(self) -> IntervalSchemaAcceptor:
         return IntervalSchemaAcceptor()
 
-    def output_for(self, inp: PandasDataSchema) -> DynamicIndexIntervalSchema:
+    def output_for(self, inp: PandasDataSchema) -> DynamicIndexIntervalSchema | ArrayDataSchema:
         assert isinstance(inp, PandasDataSchema)
-        return DynamicIndexIntervalSchema.for_input(inp, self._name)
+        schema = DynamicIndexIntervalSchema.for_input(inp, self._name)
+        return ArrayDataSchema.of(schema) if self._arrays else schema
+
+    @property
+    def chunkable(self) -> bool:
+        return True
+
+    def chunk_reach(self, *reaches: tuple[float, float]) -> tuple[float, float]:
+        before, after = super().chunk_reach(*reaches)
+        return max(0., before - float(self._lo.rescale(pq.s).magnitude)), \
+            max(0., after + float(self._hi.rescale(pq.s).magnitude))
 
     def new_function(self) -> IFunction:
-        return StaticIntervalsFunc(self._lo, self._hi, self._name, closed=self._closed)
+        return StaticIntervalsFunc(self._lo, self._hi, self._name, closed=self._closed, arrays=self._arrays)
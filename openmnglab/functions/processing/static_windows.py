@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pandas import DataFrame
+
+from openmnglab.datamodel.array.model import ArrayDataSchema
+from openmnglab.datamodel.pandas.model import PandasDataSchema
+from openmnglab.functions.base import FunctionDefinitionBase
+from openmnglab.functions.processing.funcs.static_windows import StaticWindowsFunc
+from openmnglab.functions.processing.static_intervals import StaticIntervals
+from openmnglab.functions.processing.windows import Windows, WindowDataDynamicSchema
+from openmnglab.model.datamodel.interface import ISchemaAcceptor, IDataSchema
+from openmnglab.model.planning.interface import IDataReference
+from openmnglab.util.hashing import HashBuilder
+
+
+class StaticWindows(FunctionDefinitionBase[IDataReference[DataFrame]]):
+    """Computes the windows of intervals with static offsets around events, fusing a :class:`StaticIntervals` and the
+    :class:`Windows` of its intervals into one stage. The bounds of the intervals are located in the continuous series
+    at once, without creating the series of intervals. The output is the same as the output of the windows.
+
+    :class:`~openmnglab.functions.processing.passes.FuseStaticWindows` substitutes this stage for the pair in plans
+    where the intervals are not used otherwise.
+
+    In: [Events, Continuous Series]
+
+    Out: Interval Data, see :class:`Windows`
+
+    :param intervals: the intervals around the events
+    :param windows: the windows of the intervals
+    """
+
+    def __init__(self, intervals: StaticIntervals, windows: Windows):
+        super().__init__("openmnglab.staticwindows")
+        assert (isinstance(intervals, StaticIntervals))
+        assert (isinstance(windows, Windows))
+        self._intervals = intervals
+        self._windows = windows
+
+    @property
+    def intervals(self) -> StaticIntervals:
+        return self._intervals
+
+    @property
+    def windows(self) -> Windows:
+        return self._windows
+
+    @property
+    def config_hash(self) -> bytes:
+        return HashBuilder().update(self._intervals.config_hash).update(self._windows.config_hash).digest()
+
+    @property
+    def slot_acceptors(self) -> tuple[ISchemaAcceptor, ISchemaAcceptor]:
+        _, data_acceptor = self._windows.slot_acceptors
+        return self._intervals.slot_acceptors, data_acceptor
+
+    def output_for(self, events: PandasDataSchema, data: IDataSchema) -> WindowDataDynamicSchema | ArrayDataSchema:
+        return self._windows.output_for(self._intervals.output_for(events), data)
+
+    @property
+    def chunkable(self) -> bool:
+        return True
+
+    def chunk_reach(self, events: tuple[float, float], data: tuple[float, float]) -> tuple[float, float]:
+        return self._windows.chunk_reach(self._intervals.chunk_reach(events), data)
+
+    def new_function(self) -> StaticWindowsFunc:
+        intervals, windows = self._intervals, self._windows
+        return StaticWindowsFunc(intervals.offset_low, intervals.offset_high, windows.levels,
+                                 derivatives=windows.derivative_base is not None,
+                                 derivative_change=windows.derivative_base, interval=windows.interval,
+                                 use_time_offsets=windows.use_time_offsets, dtype=windows.dtype,
+                                 arrays=windows.arrays, closed=intervals.closed)
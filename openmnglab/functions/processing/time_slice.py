@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import quantities as pq
+
+from openmnglab.datamodel.exceptions import DataSchemaCompatibilityError
+from openmnglab.datamodel.pandas.model import PandasDataSchema
+from openmnglab.functions.base import FunctionDefinitionBase
+from openmnglab.functions.processing.funcs.time_slice import TimeSliceFunc
+from openmnglab.model.datamodel.interface import ISchemaAcceptor, IDataSchema
+from openmnglab.model.planning.interface import IDataReference
+from openmnglab.util.hashing import HashBuilder
+
+
+class TimedDataAcceptor(ISchemaAcceptor):
+
+    def accepts(self, output_data_scheme: IDataSchema) -> bool:
+        if not isinstance(output_data_scheme, PandasDataSchema):
+            raise DataSchemaCompatibilityError("Data scheme is not a pandas data scheme")
+        return True
+
+
+class TimeSlice(FunctionDefinitionBase[IDataReference]):
+    """Selects the part of a signal or of events between two timestamps, both inclusive. Signals are sliced by their
+    timestamps, events by their timestamp index level or their values if these are timestamps, see
+    :func:`~openmnglab.datamodel.pandas.slicing.time_element`.
+
+    :class:`~openmnglab.functions.processing.passes.PushDownTimeSlices` restricts the readers of a plan to the range of
+    the slices of their outputs, so only this range is read.
+
+    In: signal or events
+
+    Out: the part of the input between the timestamps, with the same schema
+
+    :param start: first timestamp
+    :param end: last timestamp
+    """
+
+    def __init__(self, start: pq.Quantity, end: pq.Quantity):
+        super().__init__("openmnglab.timeslice")
+        assert (isinstance(start, pq.Quantity))
+        assert (isinstance(end, pq.Quantity))
+        assert (start <= end)
+        self._start = start
+        self._end = end
+
+    @property
+    def start(self) -> pq.Quantity:
+        return self._start
+
+    @property
+    def end(self) -> pq.Quantity:
+        return self._end
+
+    @property
+    def config_hash(self) -> bytes:
+        return HashBuilder().quantity(self._start).quantity(self._end).digest()
+
+    @property
+    def slot_acceptors(self) -> TimedDataAcceptor:
+        return TimedDataAcceptor()
+
+    def output_for(self, inp: PandasDataSchema) -> PandasDataSchema:
+        assert isinstance(inp, PandasDataSchema)
+        return inp
+
+    def new_function(self) -> TimeSliceFunc:
+        return TimeSliceFunc(self._start, self._end)
@@ -6,12 +6,14 @@ import pandera as pa
 import quantities as pq
 from pandas import DataFrame, IntervalDtype
 
+from openmnglab.datamodel.array.model import ArrayDataSchema
 from openmnglab.datamodel.exceptions import DataSchemaCompatibilityError
 from openmnglab.datamodel.pandas.model import PandasDataSchema, PanderaSchemaAcceptor
 from openmnglab.functions.base import FunctionDefinitionBase
 from openmnglab.functions.processing.funcs.windows import WindowsFunc, LEVEL_COLUMN
 from openmnglab.model.datamodel.interface import IDataSchema
 from openmnglab.model.planning.interface import IDataReference
+from openmnglab.util.dtypes import float_dtype, inherit_float_dtype
 from openmnglab.util.hashing import HashBuilder
 
 
@@ -29,9 +31,9 @@ class NumericIndexedListAcceptor(PanderaSchemaAcceptor[pa.SeriesSchema]):
 
 
 class WindowDataAcceptor(PanderaSchemaAcceptor[pa.DataFrameSchema]):
-    def __init__(self, first_level: int, *levels: int, idx=None):
+    def __init__(self, first_level: int, *levels: int, idx=None, dtype=float):
         super().__init__(
-            pa.DataFrameSchema({LEVEL_COLUMN[i]: pa.Column(float) for i in sorted([first_level, *levels])}, index=idx))
+            pa.DataFrameSchema({LEVEL_COLUMN[i]: pa.Column(dtype) for i in sorted([first_level, *levels])}, index=idx))
 
     def accepts(self, data_schema: IDataSchema) -> bool:
         super_accepts = super().accepts(data_schema)
@@ -47,8 +49,8 @@ class WindowDataAcceptor(PanderaSchemaAcceptor[pa.DataFrameSchema]):
 
 
 class WindowDataDynamicSchema(WindowDataAcceptor, PandasDataSchema):
-    def __init__(self, idx: pa.Index | pa.MultiIndex, first_level: int, *levels: int):
-        super().__init__(first_level, *levels, idx=idx)
+    def __init__(self, idx: pa.Index | pa.MultiIndex, first_level: int, *levels: int, dtype=float):
+        super().__init__(first_level, *levels, idx=idx, dtype=dtype)
 
 
 class Windows(FunctionDefinitionBase[IDataReference[DataFrame]]):
@@ -76,17 +78,47 @@ class Windows(FunctionDefinitionBase[IDataReference[DataFrame]]):
     :param derivative_base: quantity to base the time of the derivative on. If None, it will only calculate the absolute changes between consecutive values.
     :param interval: The sampling interval of the signal. If this is not given, the interval will be approximated by calculating the diff of the first two samples.
     :param use_time_offsets: if True, will use the offset the index timestamps to the start of each interval. USE ONLY WITH REGULARLY SAMPLED SGINALS!
+    :param dtype: dtype of the output levels, float32 or float64. Defaults to the dtype of the continuous series (or
+        float64 if it is not a float series). Derivatives are always calculated with float64 time deltas.
+    :param arrays: return an :class:`~openmnglab.datamodel.array.model.ArrayContainer` instead of a pandas dataframe.
+        The intervals are located in the continuous series by vectorized searches instead of one by one.
         """
 
     def __init__(self, first_level: int, *levels: int,
                  derivative_base: Optional[pq.Quantity] = None, interval: Optional[float] = None,
-                 use_time_offsets=True):
+                 use_time_offsets=True, dtype=None, arrays=False):
         super().__init__("openmnglab.windowdata")
         self._levels = tuple((first_level, *levels))
         self._derivatives = derivative_base is not None
         self._derivate_change = derivative_base
         self._interval = interval
         self._use_time_offsets = use_time_offsets
+        self._dtype = float_dtype(dtype)
+        self._arrays = arrays
+
+    @property
+    def levels(self) -> tuple[int, ...]:
+        return self._levels
+
+    @property
+    def derivative_base(self) -> Optional[pq.Quantity]:
+        return self._derivate_change
+
+    @property
+    def interval(self) -> Optional[float]:
+        return self._interval
+
+    @property
+    def use_time_offsets(self) -> bool:
+        return self._use_time_offsets
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def arrays(self) -> bool:
+        return self._arrays
 
     @property
     def config_hash(self) -> bytes:
@@ -96,6 +128,10 @@ class Windows(FunctionDefinitionBase[IDataReference[DataFrame]]):
         hsh.bool(self._derivatives)
         if self._derivate_change is not None:
             hsh.quantity(self._derivate_change)
+        if self._dtype is not None:
+            hsh.dtype(self._dtype)
+        if self._arrays:
+            hsh.bool(self._arrays)
         return hsh.digest()
 
     @property
@@ -104,7 +140,7 @@ class Windows(FunctionDefinitionBase[IDataReference[DataFrame]]):
         return PanderaSchemaAcceptor(pa.SeriesSchema(IntervalDtype)), NumericIndexedListAcceptor()
 
     def output_for(self, window_intervals: IDataSchema[pa.SeriesSchema],
-                   data: IDataSchema[pa.SeriesSchema]) -> WindowDataDynamicSchema:
+                   data: IDataSchema[pa.SeriesSchema]) -> WindowDataDynamicSchema | ArrayDataSchema:
         window_scheme, data_scheme = self.slot_acceptors
         assert (window_scheme.accepts(window_intervals))
         assert (data_scheme.accepts(data))
@@ -114,10 +150,22 @@ class Windows(FunctionDefinitionBase[IDataReference[DataFrame]]):
             idx = pa.MultiIndex([window_intervals.pandera_schema.index, data.pandera_schema.index])
         else:
             idx = pa.MultiIndex([*window_intervals.pandera_schema.index.indexes, data.pandera_schema.index])
-        return WindowDataDynamicSchema(idx, *self._levels)
+        data_dtype = data.pandera_schema.dtype.type if data.pandera_schema.dtype is not None else None
+        schema = WindowDataDynamicSchema(idx, *self._levels, dtype=inherit_float_dtype(self._dtype, data_dtype))
+        return ArrayDataSchema.of(schema) if self._arrays else schema
+
+    @property
+    def chunkable(self) -> bool:
+        # windows at the boundary of a chunk need the overlap of the signal chunks (see StreamingExecutor)
+        return True
+
+    def chunk_reach(self, *reaches: tuple[float, float]) -> tuple[float, float]:
+        # the diff levels need samples before each window, which are only known if the sampling interval is given
+        before, after = super().chunk_reach(*reaches)
+        return before + (max(self._levels) * self._interval if self._interval is not None else 0.), after
 
     def new_function(self) -> WindowsFunc:
         return WindowsFunc(self._levels,
                            derivatives=self._derivatives,
                            derivative_change=self._derivate_change, use_time_offsets=self._use_time_offsets,
-                           interval=self._interval)
+                           interval=self._interval, dtype=self._dtype, arrays=self._arrays)
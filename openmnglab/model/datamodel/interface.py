@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from enum import Enum
 from typing import TypeVar, Generic
 
 T_co = TypeVar('T_co', covariant=True)
@@ -23,6 +24,20 @@ class IDataContainer(ABC, Generic[T_co]):
     def deep_copy(self) -> IDataContainer[T_co]:
         ...
 
+    def read_only(self) -> IDataContainer[T_co]:
+        """
+        :return: A container sharing the data of this container, which does not allow modifying it in place. Defaults
+            to the container itself.
+        """
+        return self
+
+    def cow_copy(self) -> IDataContainer[T_co]:
+        """
+        :return: A copy of this container which can be modified without affecting this container. Implementations
+            should only copy the data when it is modified (copy-on-write). Defaults to :meth:`deep_copy`.
+        """
+        return self.deep_copy()
+
 
 class ISchemaAcceptor(ABC):
     """
@@ -43,6 +58,18 @@ class ISchemaAcceptor(ABC):
         ...
 
 
+class ValidationLevel(Enum):
+    """How thoroughly an executor validates the outputs of a function against their schemas"""
+    OFF = "off"
+    """Outputs are not validated"""
+    STRUCTURAL = "structural"
+    """Only the structure (names, index levels and dtypes) is validated, which does not scan the data"""
+    SAMPLED = "sampled"
+    """The structure and a sample of the data is validated"""
+    FULL = "full"
+    """The complete data is validated"""
+
+
 class IDataSchema(ISchemaAcceptor, ABC):
     """
     Scheme for data that is produced by a function.
@@ -59,3 +86,18 @@ class IDataSchema(ISchemaAcceptor, ABC):
         :return: ``True`` if the data container conforms to this scheme, ``False`` otherwise.
         """
         ...
+
+    def validate_structure(self, data_container: IDataContainer) -> bool:
+        """Validates the structure of a data container without scanning its data, see :meth:`validate`.
+
+        Schemas which can not distinguish structure and data validate the complete data container.
+        """
+        return self.validate(data_container)
+
+    def validate_sampled(self, data_container: IDataContainer, sample_size: int) -> bool:
+        """Validates the structure and a sample of at most ``sample_size`` elements of a data container, see
+        :meth:`validate`.
+
+        Schemas which can not sample their data validate the complete data container.
+        """
+        return self.validate(data_container)
@@ -11,7 +11,10 @@ class IFunction(ABC):
     Implementation details
     ======================
     * :meth:`set_input` **should not validate the data**, but only store it internally so subsequent calls to :meth:`execute` or :meth:`validate_input` can access it.
-    * Implementations should assume that they have an *exclusive copy of the data* to work on and should not copy input data defensively
+    * The input data is shared with other functions. Implementations must not modify it in place, unless they declare
+      so by :attr:`mutates_input`. Executors then pass them a copy-on-write clone of the data instead (see
+      :meth:`~openmnglab.model.datamodel.interface.IDataContainer.cow_copy`). Implementations should not copy input data
+      defensively.
     * Implementations may perform additional validations for the data in :meth:`validate_input` for debugging purposes, but there is no guarantee that the method is called by the integration layer.
     """
 
@@ -31,6 +34,11 @@ class IFunction(ABC):
         """
         ...
 
+    @property
+    def mutates_input(self) -> bool:
+        """Whether :meth:`execute` modifies the input data in place. Defaults to ``False``."""
+        return False
+
 
 class ISourceFunction(IFunction, ABC):
 
@@ -67,6 +75,40 @@ class IFunctionDefinition(Generic[ProxyRet], ABC):
     def new_function(self) -> IFunction:
         ...
 
+    @property
+    def frozen(self) -> bool:
+        """Whether the definition can't be changed after its construction. Planners use frozen definitions as they
+        are instead of copying them and cache their configuration hash, acceptors and output schemas.
+        Defaults to ``False``."""
+        return False
+
+    @property
+    def chunkable(self) -> bool:
+        """Whether the function processes time chunks of its input independently: running it on consecutive time
+        chunks of the input and combining the outputs with :meth:`reduce_chunks` gives the same result as running it on
+        the complete input. Streaming executors split the execution of such functions into time chunks.
+        Defaults to ``False``."""
+        return False
+
+    def chunk_reach(self, *reaches: tuple[float, float]) -> tuple[float, float]:
+        """How far the data a :attr:`chunkable` function reads from continuous inputs or the events it outputs reach
+        beyond the events of its input, in seconds before and after them. Streaming executors check that their signal
+        chunks overlap at least this far.
+
+        :param reaches: the reach of each input, ``(0, 0)`` for inputs from outside of the chunked stages
+        :return: the reach of the function, defaults to the largest reach of its inputs
+        """
+        return max((before for before, _ in reaches), default=0.), max((after for _, after in reaches), default=0.)
+
+    def reduce_chunks(self, output: int, chunks: Sequence[IDataContainer]) -> Optional[IDataContainer]:
+        """Combines the outputs of the time chunks of a :attr:`chunkable` function.
+
+        :param output: position of the output
+        :param chunks: the output of each chunk, in the order of the chunks
+        :return: the combined output or ``None`` to let the executor concatenate the chunks, which is the default
+        """
+        return None
+
 
 class IStaticFunctionDefinition(Generic[ProxyRet], IFunctionDefinition[ProxyRet], ABC):
     @property
@@ -90,3 +132,19 @@ class ISourceFunctionDefinition(Generic[ProxyRet], IStaticFunctionDefinition[Pro
     @abstractmethod
     def new_function(self) -> ISourceFunction:
         ...
+
+
+class ITimeRangeSourceDefinition(Generic[ProxyRet], ISourceFunctionDefinition[ProxyRet], ABC):
+    """Definition of a source which can read only the data of a time range, i.e. a reader which decodes only a segment
+    of a file. Planners push time slices of its outputs down into it (see
+    :class:`~openmnglab.functions.processing.passes.PushDownTimeSlices`)."""
+
+    @abstractmethod
+    def with_time_range(self, start: float, end: float) -> "ITimeRangeSourceDefinition[ProxyRet]":
+        """A copy of the definition which reads only the data between two timestamps, intersected with the time range
+        it reads already. The copy reads at least all data between the timestamps (both inclusive).
+
+        :param start: first timestamp in seconds
+        :param end: last timestamp in seconds
+        """
+        ...
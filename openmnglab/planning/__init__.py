@@ -1 +1,16 @@
+from typing import TYPE_CHECKING
+
 from openmnglab.planning.default import DefaultPlanner
+from openmnglab.planning.optimizer import PlanOptimizer, PlanPass, DeadStageElimination, SharedStages
+from openmnglab.util.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from openmnglab.functions.processing.passes import FuseStaticWindows, PushDownTimeSlices
+
+# the passes of processing functions import these functions, so they are only imported on first access
+_EXPORTS = {
+    "FuseStaticWindows": "openmnglab.functions.processing.passes",
+    "PushDownTimeSlices": "openmnglab.functions.processing.passes",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
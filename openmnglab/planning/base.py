@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, Iterable, Mapping, Sequence
+from typing import TypeVar, Generic, Iterable, Mapping, Sequence, Optional
 
 from openmnglab.datamodel.exceptions import DataSchemaCompatibilityError
 from openmnglab.model.datamodel.interface import ISchemaAcceptor, IDataSchema
@@ -13,7 +13,15 @@ from openmnglab.util.iterables import ensure_sequence
 
 
 def check_input(expected_schemes: Sequence[ISchemaAcceptor] | ISchemaAcceptor | None,
-                actual_schemes: Sequence[IDataSchema] | IDataSchema | None):
+                actual_schemes: Sequence[IDataSchema] | IDataSchema | None,
+                accepted: Optional[set[tuple[ISchemaAcceptor, IDataSchema]]] = None):
+    """Checks that each acceptor accepts the schema at its position.
+
+    :param expected_schemes: the acceptors of the slots of a function
+    :param actual_schemes: the schemas of the data passed to the slots
+    :param accepted: pairs of acceptors and schemas known to be compatible, which are not compared again. Compatible
+        pairs are added to it. Acceptors and schemas are compared by identity.
+    """
     expected_schemes: Sequence[ISchemaAcceptor] = ensure_sequence(expected_schemes, ISchemaAcceptor)
     actual_schemes: Sequence[IDataSchema] = ensure_sequence(actual_schemes, IDataSchema)
     if len(expected_schemes) != len(actual_schemes):
@@ -21,11 +29,15 @@ def check_input(expected_schemes: Sequence[ISchemaAcceptor] | ISchemaAcceptor |
     for pos, (expected_scheme, actual_scheme) in enumerate(zip(expected_schemes, actual_schemes)):
         expected_scheme: ISchemaAcceptor
         actual_scheme: IDataSchema
+        if accepted is not None and (expected_scheme, actual_scheme) in accepted:
+            continue
         try:
             if not expected_scheme.accepts(actual_scheme):
                 raise DataSchemaCompatibilityError("Expected scheme is not compatible with actual scheme")
         except DataSchemaCompatibilityError as ds_compat_err:
             raise FunctionArgumentSchemaError(pos) from ds_compat_err
+        if accepted is not None:
+            accepted.add((expected_scheme, actual_scheme))
 
 
 class DataReference(IDataReference):
@@ -72,6 +84,19 @@ class PlannerBase(Generic[_FuncT, _DataT], IExecutionPlanner, ABC):
     def get_plan(self) -> ExecutionPlan:
         return ExecutionPlan(self._functions.copy(), self._data.copy())
 
+    def merge(self, other: IExecutionPlanner | IExecutionPlan):
+        """Adds the stages and data of another plan to this one. Stages which are part of both plans (i.e. reading
+        the same file or windowing the same data) have the same planning id and are only planned once, so analyses
+        planned independently share them. References into the other plan stay valid in this one.
+
+        :param other: a planner or its plan
+        """
+        plan = other.get_plan() if isinstance(other, IExecutionPlanner) else other
+        for planning_id, stage in plan.stages.items():
+            self._functions.setdefault(planning_id, stage)
+        for planning_id, data in plan.planned_data.items():
+            self._data.setdefault(planning_id, data)
+
     @abstractmethod
     def _add_function(self, function: IFunctionDefinition[ProxyRet], *inp_data: _DataT) -> ProxyRet:
         ...
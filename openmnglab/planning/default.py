@@ -1,29 +1,38 @@
 from __future__ import annotations
 
 from copy import deepcopy
+from typing import Optional, Sequence
 
-from openmnglab.model.datamodel.interface import IDataSchema
+from openmnglab.model.datamodel.interface import IDataSchema, ISchemaAcceptor
 from openmnglab.model.functions.interface import IFunctionDefinition, ProxyRet
 from openmnglab.model.planning.plan.interface import IStage, IVirtualData
 from openmnglab.planning.base import PlannerBase, check_input, DataReference
-from openmnglab.planning.exceptions import PlanningError
 from openmnglab.util.hashing import HashBuilder
 from openmnglab.util.iterables import ensure_iterable, unpack_sequence
 
 
 class Stage(IStage):
-    def __init__(self, definition: IFunctionDefinition, *data_in: VirtualData):
-        hashgen = HashBuilder()
-        hashgen.update(definition.config_hash)
-        for inp in data_in:
-            hashgen.update(inp.planning_id)
-        self._calculated_hash = hashgen.digest()
+    def __init__(self, definition: IFunctionDefinition, *data_in: VirtualData, planning_id: Optional[bytes] = None,
+                 schemas: Optional[Sequence[IDataSchema] | IDataSchema] = None):
+        self._calculated_hash = planning_id if planning_id is not None else self.hash_of(definition, *data_in)
         self._depth = max((d.depth for d in data_in), default=0)
         self._definition = definition
         self._data_in = data_in
+        if schemas is None:
+            schemas = definition.output_for(*(d.schema for d in data_in))
         self._data_out = tuple(VirtualData.from_function(self, out, i) for i, out in
-                               enumerate(
-                                   ensure_iterable(definition.output_for(*(d.schema for d in data_in)), IDataSchema)))
+                               enumerate(ensure_iterable(schemas, IDataSchema)))
+
+    @staticmethod
+    def hash_of(definition: IFunctionDefinition, *data_in: IVirtualData, config_hash: Optional[bytes] = None) -> bytes:
+        """The planning id of a stage running a function on the given data. The id of the function is part of it, so
+        definitions of different functions with the same configuration yield different stages."""
+        hashgen = HashBuilder()
+        hashgen.str(definition.identifier)
+        hashgen.update(config_hash if config_hash is not None else definition.config_hash)
+        for inp in data_in:
+            hashgen.update(inp.planning_id)
+        return hashgen.digest()
 
     @property
     def definition(self) -> IFunctionDefinition:
@@ -77,13 +86,43 @@ class VirtualData(IVirtualData):
 
 class DefaultPlanner(PlannerBase[Stage, VirtualData]):
 
+    def __init__(self):
+        super().__init__()
+        # caches for frozen definitions, definitions and schemas are compared by identity
+        self._config_hashes: dict[IFunctionDefinition, bytes] = dict()
+        self._acceptors: dict[IFunctionDefinition, Optional[Sequence[ISchemaAcceptor] | ISchemaAcceptor]] = dict()
+        self._outputs: dict[tuple[IFunctionDefinition, ...], Optional[Sequence[IDataSchema] | IDataSchema]] = dict()
+        self._accepted: set[tuple[ISchemaAcceptor, IDataSchema]] = set()
+
     def _add_function(self, function: IFunctionDefinition[ProxyRet], *inp_data: VirtualData) -> ProxyRet:
+        frozen = function.frozen
+        config_hash = self._config_hashes.get(function) if frozen else None
+        if config_hash is None:
+            config_hash = function.config_hash
+            if frozen:
+                self._config_hashes[function] = config_hash
+        # adding the same function on the same data again returns the outputs of the planned stage
+        planning_id = Stage.hash_of(function, *inp_data, config_hash=config_hash)
+        stage = self._functions.get(planning_id)
+        if stage is None:
+            plan_stage = self._plan_frozen if frozen else self._plan
+            stage = plan_stage(function, planning_id, *inp_data)
+            self._functions[stage.planning_id] = stage
+            for prod in stage.data_out:
+                self._data[prod.planning_id] = prod
+        return unpack_sequence(tuple(DataReference(o.planning_id) for o in stage.data_out))
+
+    def _plan(self, function: IFunctionDefinition, planning_id: bytes, *inp_data: VirtualData) -> Stage:
         function = deepcopy(function)
         check_input(function.slot_acceptors, tuple(d.schema for d in inp_data))
-        stage = Stage(function, *inp_data)
-        if stage.planning_id in self._functions:
-            raise PlanningError("A function with the same hash is already planned")
-        self._functions[stage.planning_id] = stage
-        for prod in stage.data_out:
-            self._data[prod.planning_id] = prod
-        return unpack_sequence(tuple(DataReference(o.planning_id) for o in stage.data_out))
+        return Stage(function, *inp_data, planning_id=planning_id)
+
+    def _plan_frozen(self, function: IFunctionDefinition, planning_id: bytes, *inp_data: VirtualData) -> Stage:
+        schemas = tuple(d.schema for d in inp_data)
+        if function not in self._acceptors:
+            self._acceptors[function] = function.slot_acceptors
+        check_input(self._acceptors[function], schemas, accepted=self._accepted)
+        key = (function, *schemas)
+        if key not in self._outputs:
+            self._outputs[key] = function.output_for(*schemas)
+        return Stage(function, *inp_data, planning_id=planning_id, schemas=self._outputs[key])
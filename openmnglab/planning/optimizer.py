@@ -0,0 +1,228 @@
+"""Rewrites execution plans before they are executed.
+
+A :class:`PlanOptimizer` applies a sequence of :class:`PlanPass` es to a plan and the data requested from it. Each pass
+returns a new plan and the data it replaced, the optimizer keeps track of where the requested data ends up and reports
+the stages each pass removed and added::
+
+    plan, report = PlanOptimizer().optimize(planner.get_plan(), features)
+    print(report)
+    executor.execute(plan)
+    result = executor.data[report.reference(features).referenced_data_id]
+
+The default passes restrict readers to the time range which is sliced from their outputs
+(:class:`~openmnglab.functions.processing.passes.PushDownTimeSlices`), fuse intervals and their windows
+(:class:`~openmnglab.functions.processing.passes.FuseStaticWindows`), share identical stages (:class:`SharedStages`) and
+remove the stages the requested data does not depend on (:class:`DeadStageElimination`). Passes rewriting stages of
+specific functions are defined next to these functions, so planning does not import any functions.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Mapping, Optional, Sequence
+
+from openmnglab.model.functions.interface import IFunctionDefinition
+from openmnglab.model.planning.interface import IDataReference
+from openmnglab.model.planning.plan.interface import IExecutionPlan, IStage, IVirtualData
+from openmnglab.planning.base import DataReference, ExecutionPlan
+from openmnglab.planning.default import Stage
+from openmnglab.planning.exceptions import PlanningError
+
+
+class PlanPass(ABC):
+    """A rewrite of execution plans. Passes must not modify the plan they are given, but return a new one."""
+
+    @property
+    def name(self) -> str:
+        """Name of the pass in reports, defaults to the name of its class"""
+        return type(self).__name__
+
+    @abstractmethod
+    def apply(self, plan: IExecutionPlan, outputs: Sequence[bytes]) -> tuple[IExecutionPlan, Mapping[bytes, bytes]]:
+        """Rewrites a plan.
+
+        :param plan: the plan
+        :param outputs: planning ids of the data requested from the plan
+        :return: the rewritten plan and the planning ids of the data the pass replaced, mapped to the planning ids of
+            their replacements. The requested data must be part of the rewritten plan or be replaced.
+        """
+        ...
+
+
+@dataclass(frozen=True)
+class PassReport:
+    """Changes of a plan by a pass"""
+    name: str
+    removed: tuple[IStage, ...] = ()
+    """stages of the plan which are not part of the rewritten plan"""
+    added: tuple[IStage, ...] = ()
+    """stages of the rewritten plan which were not part of the plan"""
+    replaced: Mapping[bytes, bytes] = field(default_factory=dict)
+    """planning ids of replaced data, mapped to the planning ids of their replacements"""
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.removed or self.added or self.replaced)
+
+    def __str__(self):
+        def describe(stages: Sequence[IStage]) -> str:
+            return ", ".join(f"{stage.definition.identifier} ({stage.planning_id.hex()[:8]})" for stage in stages)
+
+        lines = [f"{self.name}: removed {len(self.removed)} stages, added {len(self.added)} stages, "
+                 f"replaced {len(self.replaced)} data"]
+        if self.removed:
+            lines.append(f"  removed: {describe(self.removed)}")
+        if self.added:
+            lines.append(f"  added: {describe(self.added)}")
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class OptimizationReport:
+    """Changes of a plan by an optimizer"""
+    passes: tuple[PassReport, ...]
+    """the report of each pass, in the order they were applied"""
+    outputs: Mapping[bytes, bytes]
+    """planning ids of the requested data, mapped to the planning ids of the data in the optimized plan"""
+
+    @property
+    def removed(self) -> int:
+        """Difference in the number of stages between the plan and the optimized plan"""
+        return sum(len(report.removed) - len(report.added) for report in self.passes)
+
+    def reference(self, reference: IDataReference) -> DataReference:
+        """The reference to requested data in the optimized plan
+
+        :param reference: reference to the data in the plan passed to the optimizer
+        """
+        planning_id = self.outputs.get(reference.referenced_data_id)
+        if planning_id is None:
+            raise KeyError(f"data {reference.referenced_data_id.hex()} was not requested from the optimizer")
+        return DataReference(planning_id)
+
+    def __str__(self):
+        return "\n".join(str(report) for report in self.passes)
+
+
+def data_producers(plan: IExecutionPlan) -> dict[bytes, IStage]:
+    """The stages of a plan by the planning ids of their outputs"""
+    return {data.planning_id: stage for stage in plan.stages.values() for data in stage.data_out}
+
+
+def subplan(stages: Iterable[IStage]) -> ExecutionPlan:
+    """A plan of stages and their outputs"""
+    stages = tuple(stages)
+    return ExecutionPlan(stages, tuple(data for stage in stages for data in stage.data_out))
+
+
+class DeadStageElimination(PlanPass):
+    """Removes the stages whose outputs neither are requested nor are needed to compute requested data"""
+
+    def apply(self, plan: IExecutionPlan, outputs: Sequence[bytes]) -> tuple[ExecutionPlan, Mapping[bytes, bytes]]:
+        producers = data_producers(plan)
+        live: dict[bytes, IStage] = dict()
+        pending = [producers[data_id] for data_id in outputs]
+        while pending:
+            stage = pending.pop()
+            if stage.planning_id not in live:
+                live[stage.planning_id] = stage
+                pending.extend(producers[data.planning_id] for data in stage.data_in)
+        return subplan(stage for stage in plan.stages.values() if stage.planning_id in live), dict()
+
+
+def rebuild(plan: IExecutionPlan,
+             substitute: Callable[[IStage, tuple[IVirtualData, ...]],
+                                  Optional[tuple[IFunctionDefinition, tuple[IVirtualData, ...]]]]) \
+        -> tuple[ExecutionPlan, dict[bytes, bytes]]:
+    """Rebuilds the stages of a plan in the order of their depth. Stages are identified by
+    :meth:`~openmnglab.planning.default.Stage.hash_of`, identical stages are only kept once.
+
+    :param plan: the plan
+    :param substitute: called with each stage and its rebuilt inputs, returns the definition and inputs of the stage
+        replacing it or ``None`` to remove it, which requires its outputs not to be used by the rebuilt stages
+    :return: the rebuilt plan and the planning ids of the replaced data, mapped to the planning ids of their
+        replacements
+    """
+    stages: dict[bytes, IStage] = dict()
+    data: dict[bytes, IVirtualData] = dict()
+    replaced: dict[bytes, bytes] = dict()
+    for stage in sorted(plan.stages.values(), key=lambda s: s.depth):
+        substitution = substitute(stage, tuple(data.get(d.planning_id) for d in stage.data_in))
+        if substitution is None:
+            continue
+        definition, data_in = substitution
+        planning_id = Stage.hash_of(definition, *data_in)
+        rebuilt = stages.get(planning_id)
+        if rebuilt is None:
+            if definition is not stage.definition:
+                rebuilt = Stage(definition, *data_in, planning_id=planning_id)
+            elif planning_id == stage.planning_id and all(new is old for new, old in zip(data_in, stage.data_in)):
+                rebuilt = stage
+            else:
+                rebuilt = Stage(definition, *data_in, planning_id=planning_id,
+                                schemas=tuple(d.schema for d in stage.data_out))
+            stages[planning_id] = rebuilt
+        for old, new in zip(stage.data_out, rebuilt.data_out):
+            data[old.planning_id] = new
+            if old.planning_id != new.planning_id:
+                replaced[old.planning_id] = new.planning_id
+    return subplan(stages.values()), replaced
+
+
+class SharedStages(PlanPass):
+    """Replaces identical stages, which run the same function with the same configuration on the same data, by a
+    single stage. Stages are identified by :meth:`~openmnglab.planning.default.Stage.hash_of`, stages planned by
+    different planners or rewritten by other passes are rebuilt with these ids. Stages consuming the outputs of replaced
+    stages consume the outputs of the remaining stage instead, which may make them identical too."""
+
+    def apply(self, plan: IExecutionPlan, outputs: Sequence[bytes]) -> tuple[ExecutionPlan, Mapping[bytes, bytes]]:
+        return rebuild(plan, lambda stage, data_in: (stage.definition, data_in))
+
+
+class PlanOptimizer:
+    """Applies passes to execution plans.
+
+    :param passes: the passes to apply, in order. Defaults to
+        :class:`~openmnglab.functions.processing.passes.PushDownTimeSlices`,
+        :class:`~openmnglab.functions.processing.passes.FuseStaticWindows`, :class:`SharedStages` and
+        :class:`DeadStageElimination`.
+    """
+
+    def __init__(self, passes: Optional[Iterable[PlanPass]] = None):
+        if passes is None:
+            # the passes of the processing functions import them, which is deferred until an optimizer is created
+            from openmnglab.functions.processing.passes import FuseStaticWindows, PushDownTimeSlices
+            passes = (PushDownTimeSlices(), FuseStaticWindows(), SharedStages(), DeadStageElimination())
+        self._passes: tuple[PlanPass, ...] = tuple(passes)
+
+    @property
+    def passes(self) -> tuple[PlanPass, ...]:
+        return self._passes
+
+    def optimize(self, plan: IExecutionPlan, *outputs: IDataReference) -> tuple[IExecutionPlan, OptimizationReport]:
+        """Applies the passes to a plan.
+
+        :param plan: the plan
+        :param outputs: references to the data requested from the plan
+        :return: the optimized plan and a report of the changes, which also maps the requested data to the data in the
+            optimized plan (see :meth:`OptimizationReport.reference`)
+        """
+        requested = {output.referenced_data_id: output.referenced_data_id for output in outputs}
+        for data_id in requested:
+            if data_id not in plan.planned_data:
+                raise PlanningError(f"Requested data {data_id.hex()} is not part of the plan")
+        reports = []
+        for plan_pass in self._passes:
+            rewritten, replaced = plan_pass.apply(plan, tuple(requested.values()))
+            requested = {requested_id: replaced.get(data_id, data_id) for requested_id, data_id in requested.items()}
+            for data_id in requested.values():
+                if data_id not in rewritten.planned_data:
+                    raise PlanningError(f"Pass {plan_pass.name} removed the requested data {data_id.hex()}")
+            reports.append(PassReport(plan_pass.name,
+                                      removed=tuple(stage for planning_id, stage in plan.stages.items()
+                                                    if planning_id not in rewritten.stages),
+                                      added=tuple(stage for planning_id, stage in rewritten.stages.items()
+                                                  if planning_id not in plan.stages),
+                                      replaced=dict(replaced)))
+            plan = rewritten
+        return plan, OptimizationReport(tuple(reports), requested)
@@ -0,0 +1,70 @@
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+
+def read_only(values: np.ndarray) -> np.ndarray:
+    """Returns a view of the array which does not allow modifying it in place, or the array if it already is read only.
+    Array-likes which are not NumPy arrays (i.e. compressed chunks) can't be modified in place and are returned as is.
+
+    :param values: the array
+    :return: read only view of the array
+    """
+    if not isinstance(values, np.ndarray) or not values.flags.writeable:
+        return values
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+
+def rechunk(pieces: Iterable[tuple[np.ndarray, np.ndarray]], samples: Optional[int] = None,
+            duration: Optional[float] = None) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Splits consecutive pieces of a signal (i.e. the pages of a file) into chunks of a fixed number of samples or a
+    fixed duration. Only the pieces of the current chunk are held at once.
+
+    Chunks of a duration start at multiples of the duration after the first timestamp. Each chunk contains the samples
+    from its start up to (excluding) the start of the next chunk, chunks which would not contain any samples are
+    skipped.
+
+    :param pieces: the values and timestamps of each piece, in order
+    :param samples: number of samples of each chunk (the last one may contain fewer)
+    :param duration: duration of each chunk, in the time unit of the timestamps
+    :return: the values and timestamps of each chunk
+    """
+    if (samples is None) == (duration is None):
+        raise ValueError("Either the number of samples or the duration of the chunks must be given")
+    if samples is not None and samples < 1 or duration is not None and duration <= 0:
+        raise ValueError("The size of the chunks must be positive")
+    values_buffer, times_buffer, buffered = [], [], 0
+    origin, boundary, k = None, None, 0
+
+    def flush():
+        nonlocal values_buffer, times_buffer, buffered
+        chunk = (np.concatenate(values_buffer), np.concatenate(times_buffer)) if len(values_buffer) > 1 \
+            else (values_buffer[0], times_buffer[0])
+        values_buffer, times_buffer, buffered = [], [], 0
+        return chunk
+
+    for values, times in pieces:
+        while len(values) > 0:
+            if samples is not None:
+                split = min(samples - buffered, len(values))
+            else:
+                if origin is None:
+                    origin, k = times[0], 1
+                    boundary = origin + duration
+                split = int(np.searchsorted(times, boundary, side="left"))
+            if split > 0:
+                values_buffer.append(values[:split])
+                times_buffer.append(times[:split])
+                buffered += split
+                values, times = values[split:], times[split:]
+            if samples is not None and buffered == samples or duration is not None and len(values) > 0:
+                if buffered > 0:
+                    yield flush()
+                if duration is not None:
+                    # skip the boundaries of chunks without samples
+                    k = max(k + 1, int((times[0] - origin) // duration) + 1)
+                    boundary = origin + k * duration
+    if buffered > 0:
+        yield flush()
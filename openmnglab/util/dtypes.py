@@ -0,0 +1,32 @@
+from typing import Optional
+
+import numpy as np
+
+FLOAT_DTYPES = (np.float32, np.float64)
+"""Float dtypes signal values can be processed in. Timestamps are always kept as float64."""
+
+
+def float_dtype(dtype) -> Optional[type[np.floating]]:
+    """Normalizes a float dtype (i.e. ``float``, ``"float32"`` or ``np.float32``) to its numpy scalar type.
+
+    :param dtype: float32 or float64 dtype. ``None`` is passed through and lets a function inherit the dtype of its input
+    :return: the numpy scalar type of the dtype or ``None``
+    """
+    if dtype is None:
+        return None
+    dtype = np.dtype(dtype).type
+    assert dtype in FLOAT_DTYPES, f"Unsupported dtype {dtype}, must be one of {FLOAT_DTYPES}"
+    return dtype
+
+
+def inherit_float_dtype(dtype: Optional[type[np.floating]], input_dtype) -> type[np.floating]:
+    """Resolves the dtype a function computes its values in.
+
+    :param dtype: dtype configured for the function, ``None`` to inherit the dtype of the input
+    :param input_dtype: dtype of the input values
+    :return: ``dtype`` if configured, else ``input_dtype`` if it is a float dtype, else float64
+    """
+    if dtype is not None:
+        return dtype
+    input_dtype = np.dtype(input_dtype).type
+    return input_dtype if input_dtype in FLOAT_DTYPES else np.float64
@@ -6,6 +6,8 @@ from os import PathLike
 from pathlib import Path
 from typing import Self, Any
 
+import numpy as np
+
 try:
     from quantities import Quantity
 except ImportError as _:
@@ -75,6 +77,9 @@ class HashBuilder:
         self.str(str(q.units))
         return self
 
+    def dtype(self, d) -> Self:
+        return self.str(np.dtype(d).str)
+
     def bool(self, b: bool) -> Self:
         int_repr = int(b)
         self.update(struct.pack("<q", int_repr))
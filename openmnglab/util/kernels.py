@@ -0,0 +1,109 @@
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Iterable
+
+import numpy as np
+from numba import njit, types
+from numba.core.registry import CPUDispatcher
+
+from openmnglab.util.arrays import read_only
+
+# modules defining kernels, imported by warmup() so all kernels are registered
+KERNEL_MODULES = ("openmnglab.functions.helpers.general",
+                  "openmnglab.functions.input.readers.funcs.dapsys_reader",
+                  "openmnglab.functions.analysis.funcs.spdf_components",
+                  "openmnglab.functions.analysis.funcs.spdf_features")
+
+_KERNELS: dict[str, tuple[CPUDispatcher, tuple]] = dict()
+
+
+def array(dtype: types.Type, ndim: int = 1, layout: str = "C", readonly: bool = False) -> types.Array:
+    """Shorthand for the numba type of a numpy array, used to declare kernel signatures"""
+    return types.Array(dtype, ndim, layout, readonly=readonly)
+
+
+def input_array(dtype: types.Type, ndim: int = 1, layout: str = "C") -> types.Array:
+    """Numba type of an input array of a kernel. Kernels receive their inputs read only (see
+    :func:`~openmnglab.util.arrays.read_only`), as the data containers of an execution are shared between functions."""
+    return array(dtype, ndim, layout, readonly=True)
+
+
+# types of the (read-only) codes of a pandas index level, which depend on the number of distinct level values
+INDEX_CODES = tuple(array(dtype, readonly=True) for dtype in (types.int8, types.int16, types.int32))
+
+
+def index_codes(codes: np.ndarray) -> np.ndarray:
+    """Converts codes into one of the :data:`INDEX_CODES` types, like pandas stores the codes of a multiindex: the
+    smallest of int8, int16 and int32 which can hold them, read only."""
+    max_code = int(codes.max()) if len(codes) > 0 else 0
+    dtype = next(dtype for dtype in (np.int8, np.int16, np.int32) if max_code <= np.iinfo(dtype).max)
+    return read_only(np.ascontiguousarray(codes, dtype=dtype))
+
+
+def kernel(*signatures) -> Callable[[Callable], CPUDispatcher]:
+    """Decorator declaring a numba kernel of openMNGlab.
+
+    The kernel is compiled lazily on its first call like a plain ``njit`` function, but the compiled machine code is
+    cached on disk, so following processes only have to load it. The signatures are the argument types the kernel is
+    called with by openMNGlab and are compiled ahead of time by :func:`warmup`. Other argument types are still compiled
+    on demand.
+
+    Kernels follow numpy's error model, like the interpreted functions they replace: divisions by zero give inf or NaN
+    instead of raising a :class:`ZeroDivisionError`.
+
+    :param signatures: numba signatures (argument type tuples or signature strings) the kernel is called with
+    :return: decorator returning the numba dispatcher of the kernel
+    """
+
+    def decorate(func: Callable) -> CPUDispatcher:
+        dispatcher = njit(cache=True, error_model="numpy")(func)
+        _KERNELS[f"{func.__module__}:{func.__qualname__}"] = (dispatcher, signatures)
+        return dispatcher
+
+    return decorate
+
+
+def kernels() -> dict[str, tuple[CPUDispatcher, tuple]]:
+    """Imports all modules defining kernels.
+
+    :return: all registered kernels by their name (``module:qualname``), with the signatures they are compiled for by
+        :func:`warmup`
+    """
+    for module in KERNEL_MODULES:
+        importlib.import_module(module)
+    return dict(_KERNELS)
+
+
+def _compile(name: str) -> float:
+    importlib.import_module(name.partition(":")[0])
+    dispatcher, signatures = _KERNELS[name]
+    start = time.perf_counter()
+    for signature in signatures:
+        dispatcher.compile(signature)
+    return time.perf_counter() - start
+
+
+def warmup(names: Optional[Iterable[str]] = None, parallel: bool = True, max_workers: Optional[int] = None) \
+        -> dict[str, float]:
+    """Compiles the declared signatures of the kernels and writes them to the on-disk cache.
+
+    If ``parallel`` is set, the kernels are compiled in a process pool and only loaded from the cache by the calling
+    process afterwards. Kernels without declared signatures are skipped.
+
+    :param names: names of the kernels to compile (see :func:`kernels`), defaults to all kernels
+    :param parallel: compile the kernels in parallel worker processes
+    :param max_workers: maximum number of worker processes, defaults to the number of CPUs
+    :return: time in seconds spent compiling (or loading) each kernel
+    """
+    registered = kernels()
+    names = [name for name in (registered.keys() if names is None else names) if registered[name][1]]
+    max_workers = min(len(names), max_workers if max_workers is not None else os.cpu_count() or 1)
+    if parallel and max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            timings = dict(zip(names, pool.map(_compile, names)))
+        for name in names:
+            _compile(name)
+        return timings
+    return {name: _compile(name) for name in names}
@@ -0,0 +1,27 @@
+import importlib
+import sys
+from typing import Any, Callable, Mapping
+
+
+def lazy_exports(module_name: str, exports: Mapping[str, str]) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Creates a module level ``__getattr__`` and ``__dir__`` which import the exported names from their modules on first
+    access, so importing a namespace package does not import all of its (possibly heavy) dependencies. Resolved names
+    are stored in the module, later accesses are plain attribute lookups.
+
+    :param module_name: name of the module the functions are created for (i.e. ``__name__``)
+    :param exports: maps each exported name to the absolute name of the module it is defined in
+    :return: the ``__getattr__`` and ``__dir__`` functions for the module
+    """
+
+    def __getattr__(name: str) -> Any:
+        defining_module = exports.get(name)
+        if defining_module is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(defining_module), name)
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(exports.keys())
+
+    return __getattr__, __dir__
@@ -1,5 +1,6 @@
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
 
 
@@ -38,6 +39,18 @@ def pandas_names(inp: pd.Series | pd.DataFrame) -> Iterable[str]:
         raise TypeError("Passed index is neither a pandas series nor a pandas dataframe")
 
 
+def encode_labels(labels: Iterable[str], n: int) -> pd.Categorical:
+    """Dictionary-encodes string labels into a categorical with the labels in order of their first occurrence as
+    categories, without creating an intermediate list of strings.
+    :param labels: the labels to encode
+    :param n: number of labels
+    :return: categorical with one integer code per label
+    """
+    categories: dict[str, int] = dict()
+    codes = np.fromiter((categories.setdefault(label, len(categories)) for label in labels), dtype=np.int32, count=n)
+    return pd.Categorical.from_codes(codes, categories=list(categories.keys()))
+
+
 def iterdfcols(inp: pd.DataFrame) -> Iterable[tuple[str, pd.Series]]:
     for col_name in inp.columns:
         yield col_name, inp[col_name]
@@ -1,8 +1,6 @@
 from dataclasses import dataclass
 from typing import Sequence, Optional
 
-import seaborn as sns
-
 
 @dataclass
 class Theme:
@@ -16,7 +14,9 @@ class Theme:
     rc: Optional[dict] = None
 
     def __enter__(self):
+        import seaborn as sns
         sns.set_theme(self.context, self.style, self.palette, self.font, self.font_scale, self.color_codes, self.rc)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        import seaborn as sns
         sns.reset_orig()
@@ -0,0 +1,14 @@
+import time
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+
+
+def measure(func: Callable[..., T], *args, **kwargs) -> tuple[float, T]:
+    """Runs the function once and measures its wall time.
+
+    :return: The elapsed time in seconds and the return value of the function
+    """
+    start = time.perf_counter()
+    ret = func(*args, **kwargs)
+    return time.perf_counter() - start, ret
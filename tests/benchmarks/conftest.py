@@ -0,0 +1,2 @@
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: performance regression benchmarks (deselect with '-m \"not benchmark\"')")
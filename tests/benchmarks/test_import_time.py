@@ -0,0 +1,61 @@
+import re
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+# generous upper bound for the cumulative import time of the lazy namespace; importing the eager namespace took >1s
+IMPORT_BUDGET_US = 300_000
+# planning imports numpy and quantities for hashing (~0.3s), importing the functions along with it took >1.2s
+PLANNING_IMPORT_BUDGET_US = 600_000
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Runs the statement in a fresh interpreter with ``-X importtime``.
+
+    :return: cumulative import time in microseconds for each imported module
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True,
+                          check=True)
+    times = dict()
+    for match in re.finditer(r"^import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$", proc.stderr, re.MULTILINE):
+        times[match.group(2)] = int(match.group(1))
+    return times
+
+
+def test_functions_namespace_is_lazy():
+    times = import_times("import openmnglab.functions")
+    assert times["openmnglab.functions"] < IMPORT_BUDGET_US
+    for heavy in ("matplotlib", "seaborn", "numba", "pydapsys"):
+        assert heavy not in times
+
+
+def test_planning_does_not_import_functions():
+    times = import_times("import openmnglab.planning")
+    assert times["openmnglab.planning"] < PLANNING_IMPORT_BUDGET_US
+    for heavy in ("numba", "pandera", "openmnglab.functions.processing"):
+        assert heavy not in times
+
+
+@pytest.mark.parametrize("names", ["DapsysReader, Windows, SPDFComponents, SPDFFeatures, StaticIntervals",
+                                   "WaveformPlot"])
+def test_processing_does_not_import_plotting(names):
+    times = import_times(f"from openmnglab.functions import {names}")
+    assert "matplotlib" not in times
+    assert "seaborn" not in times
+
+
+def test_lazy_exports_resolve():
+    import openmnglab.functions as functions
+    from openmnglab.functions.processing.windows import Windows
+    assert functions.Windows is Windows
+    # resolved names are stored in the namespace, so they are not resolved again
+    assert vars(functions)["Windows"] is Windows
+    assert set(functions.__all__) <= set(dir(functions))
+    with pytest.raises(AttributeError):
+        functions.DoesNotExist
+    import openmnglab.planning as planning
+    from openmnglab.functions.processing.passes import FuseStaticWindows
+    assert planning.FuseStaticWindows is FuseStaticWindows
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+# compiles the first declared signature of each kernel and reports the time of this "first call"
+FIRST_CALL_SCRIPT = """
+import json, time
+from openmnglab.util.kernels import kernels
+timings = dict()
+for name, (dispatcher, signatures) in kernels().items():
+    if signatures:
+        start = time.perf_counter()
+        dispatcher.compile(signatures[0])
+        timings[name] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+
+def first_call_latencies(cache_dir) -> dict[str, float]:
+    env = dict(os.environ, NUMBA_CACHE_DIR=str(cache_dir))
+    proc = subprocess.run([sys.executable, "-c", FIRST_CALL_SCRIPT], capture_output=True, text=True, check=True,
+                          env=env)
+    return json.loads(proc.stdout)
+
+
+def test_cached_kernels_load_faster_than_compiling(tmp_path):
+    cold = first_call_latencies(tmp_path)
+    warm = first_call_latencies(tmp_path)
+    print()
+    for name in cold:
+        print(f"{name}: cold {cold[name] * 1e3:.1f}ms, warm {warm[name] * 1e3:.1f}ms")
+    assert sum(warm.values()) < sum(cold.values()) / 5
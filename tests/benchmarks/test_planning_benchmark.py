@@ -0,0 +1,47 @@
+import pytest
+import quantities as pq
+
+from openmnglab.functions.input.readers.dapsys_reader import DapsysReader
+from openmnglab.functions.processing.static_intervals import StaticIntervals
+from openmnglab.functions.processing.windows import Windows
+from openmnglab.planning import DefaultPlanner
+from tests.benchmarks import measure
+
+pytestmark = pytest.mark.benchmark
+
+STAGES_PER_FILE = 3
+BUDGET_PER_STAGE = 2e-4
+"""Seconds a frozen stage may take to plan"""
+
+
+def plan_batch(n_files: int, frozen: bool) -> DefaultPlanner:
+    """Plans reading, the intervals around the spikes and their windows for a batch of files"""
+
+    def freeze(definition):
+        return definition.freeze() if frozen else definition
+
+    planner = DefaultPlanner()
+    intervals = freeze(StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows"))
+    windows = freeze(Windows(0, derivative_base=pq.ms))
+    for i in range(n_files):
+        signal, _, tracks, _, _ = planner.add_source(freeze(DapsysReader(f"recording_{i}.dps")))
+        planner.add_stage(windows, planner.add_stage(intervals, tracks), signal)
+    return planner
+
+
+@pytest.mark.parametrize("n_stages", [10 ** 4, 10 ** 5], ids=["1e4 stages", "1e5 stages"])
+def test_frozen_planning(n_stages):
+    n_files = n_stages // STAGES_PER_FILE
+    frozen_time, planner = measure(plan_batch, n_files, True)
+    print(f"{n_files * STAGES_PER_FILE} frozen stages: {frozen_time:.3f}s")
+    assert len(planner.get_plan().stages) == n_files * STAGES_PER_FILE
+    assert frozen_time < BUDGET_PER_STAGE * n_stages
+
+
+def test_frozen_planning_matches_copying():
+    n_files = 10 ** 3
+    copying_time, copying = measure(plan_batch, n_files, False)
+    frozen_time, frozen = measure(plan_batch, n_files, True)
+    print(f"{n_files * STAGES_PER_FILE} stages: frozen {frozen_time:.3f}s, copied {copying_time:.3f}s")
+    assert copying.get_plan().stages.keys() == frozen.get_plan().stages.keys()
+    assert frozen_time < BUDGET_PER_STAGE * n_files * STAGES_PER_FILE
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from openmnglab.functions.helpers.general import slice_diffs_flat_np
+from openmnglab.functions.processing.funcs.windows import build_window_index
+from tests.benchmarks import measure
+
+pytestmark = pytest.mark.benchmark
+
+WINDOW_LEN = 10
+
+
+@pytest.fixture(scope="module", params=[10 ** 5, 10 ** 6], ids=["1e5 windows", "1e6 windows"])
+def windows(request):
+    n = request.param
+    recording_index = pd.Index(np.arange(n * WINDOW_LEN + WINDOW_LEN) / 1e4, name="timestamp")
+    values = np.random.default_rng(0).random(len(recording_index))
+    starts = np.arange(n) * WINDOW_LEN + 2
+    interval_ranges = np.stack([starts, starts + WINDOW_LEN])
+    intervals_index = pd.MultiIndex.from_arrays(
+        [np.arange(n), np.repeat(np.array(["a", "b"]), [n // 2, n - n // 2]), np.arange(n)],
+        names=["stimulus", "track", "spike"])
+    # compile the diff kernel outside the measurement
+    slice_diffs_flat_np(values, interval_ranges[:, :1], 2)
+    return intervals_index, interval_ranges, recording_index, values
+
+
+@pytest.mark.parametrize("use_time_offsets", [True, False], ids=["time offsets", "timestamps"])
+def test_index_construction_cheaper_than_diffs(windows, use_time_offsets):
+    intervals_index, interval_ranges, recording_index, values = windows
+    diff_time, diffs = measure(slice_diffs_flat_np, values, interval_ranges, 2)
+    index_time, index = measure(build_window_index, intervals_index, interval_ranges, recording_index,
+                                use_time_offsets=use_time_offsets)
+    print(f"{len(interval_ranges[0])} windows: index {index_time:.3f}s, diffs {diff_time:.3f}s")
+    assert len(index) == diffs.shape[1]
+    assert index_time < diff_time
@@ -0,0 +1,73 @@
+"""Small function definitions for planning and execution tests"""
+import pandas as pd
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.functions.base import FunctionBase, FunctionDefinitionBase, SourceFunctionBase, \
+    SourceFunctionDefinitionBase
+from openmnglab.util.hashing import HashBuilder
+from tests import synthetic
+
+
+class RecordingSourceFunc(SourceFunctionBase):
+    def execute(self) -> PandasContainer[pd.Series]:
+        return synthetic.recording(5)
+
+
+class RecordingSource(SourceFunctionDefinitionBase):
+    def __init__(self):
+        super().__init__("test.recording")
+
+    @property
+    def config_hash(self) -> bytes:
+        return HashBuilder().digest()
+
+    @property
+    def produces(self):
+        return schema.float_timeseries(schema.SIGNAL)
+
+    def new_function(self) -> RecordingSourceFunc:
+        return RecordingSourceFunc()
+
+
+class ZeroFirstFunc(FunctionBase):
+    """Sets the first sample of the recording to zero, in place if it declares to mutate its input"""
+
+    def __init__(self, mutates: bool):
+        self._mutates = mutates
+        self._recording: PandasContainer[pd.Series] = None
+
+    @property
+    def mutates_input(self) -> bool:
+        return self._mutates
+
+    def set_input(self, recording: PandasContainer[pd.Series]):
+        self._recording = recording
+
+    def execute(self) -> PandasContainer[pd.Series]:
+        recording = self._recording.data
+        if self._mutates:
+            recording.iloc[0] = 0.
+        else:
+            recording.values[0] = 0.
+        return PandasContainer(recording, self._recording.units)
+
+
+class ZeroFirst(FunctionDefinitionBase):
+    def __init__(self, mutates: bool):
+        super().__init__("test.zerofirst")
+        self._mutates = mutates
+
+    @property
+    def config_hash(self) -> bytes:
+        return HashBuilder().bool(self._mutates).digest()
+
+    @property
+    def slot_acceptors(self):
+        return schema.float_timeseries(schema.SIGNAL)
+
+    def output_for(self, recording):
+        return recording
+
+    def new_function(self) -> ZeroFirstFunc:
+        return ZeroFirstFunc(self._mutates)
@@ -0,0 +1,130 @@
+"""Synthetic recordings for tests which do not require any testdata"""
+import struct
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pandas as pd
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.model import PandasContainer
+
+
+def spike_times(n_spikes: int, spacing: float = 0.05, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return spacing + np.arange(n_spikes) * spacing + rng.uniform(0, spacing / 50, n_spikes)
+
+
+def recording(n_spikes: int, sampling_rate: float = 10000., spacing: float = 0.05, seed: int = 0,
+              dtype=np.float64) -> PandasContainer[pd.Series]:
+    """A noisy signal with a biphasic action potential every ``spacing`` seconds"""
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(int((n_spikes + 2) * spacing * sampling_rate)) / sampling_rate
+    values = rng.normal(0, 0.05, len(timestamps))
+    for ts in spike_times(n_spikes, spacing=spacing, seed=seed):
+        lo, hi = np.searchsorted(timestamps, (ts - 0.005, ts + 0.005))
+        t = timestamps[lo:hi]
+        values[lo:hi] += -np.exp(-((t - ts) / 0.0003) ** 2) + 0.5 * np.exp(-((t - ts - 0.0008) / 0.0005) ** 2)
+    series = pd.Series(values.astype(dtype), index=pd.Index(timestamps, name=schema.TIMESTAMP), name=schema.SIGNAL)
+    return PandasContainer(series, {schema.SIGNAL: pq.V, schema.TIMESTAMP: pq.s})
+
+
+def tracks(n_spikes: int, spacing: float = 0.05, seed: int = 0) -> PandasContainer[pd.Series]:
+    """Sorted spikes matching the action potentials of :func:`recording`, alternating between two tracks"""
+    spike_no = np.arange(n_spikes)
+    track = pd.Categorical.from_codes(1 - spike_no % 2, categories=["track a", "track b"])
+    index = pd.MultiIndex.from_arrays([spike_no, track, spike_no // 2],
+                                      names=[schema.STIM_IDX, schema.TRACK, schema.TRACK_SPIKE_IDX])
+    series = pd.Series(spike_times(n_spikes, spacing=spacing, seed=seed), index=index, name=schema.SPIKE_TS)
+    return PandasContainer(series, {schema.STIM_IDX: pq.dimensionless, schema.SPIKE_TS: pq.s,
+                                    schema.TRACK: pq.dimensionless, schema.TRACK_SPIKE_IDX: pq.dimensionless})
+
+
+def _dps_str(text: str) -> bytes:
+    encoded = text.encode("latin_1")
+    return struct.pack("<I", len(encoded)) + encoded
+
+
+def _dps_text_page(page_id: int, text: str, timestamp: float) -> bytes:
+    return struct.pack("<III", 3, page_id, 0) + _dps_str(text) + struct.pack("<dd", timestamp, timestamp)
+
+
+def _dps_waveform_page(page_id: int, values: np.ndarray, timestamps: np.ndarray, interval: float | None) -> bytes:
+    tail = struct.pack("<d", interval) if interval is not None else bytes.fromhex("CD" * 8)
+    return struct.pack("<III", 2, page_id, 0) + struct.pack("<I", len(values)) + values.astype("<f4").tobytes() + \
+        struct.pack("<I", len(timestamps)) + timestamps.astype("<f8").tobytes() + tail + bytes(24)
+
+
+def _dps_stream(name: str, entry_id: int, stream_type: int, page_ids: list[int]) -> bytes:
+    display = struct.pack("<IdII", 0, 0., 0, 0) + _dps_str("V") + struct.pack("<I", 0x15) + bytes(4) + \
+        struct.pack("<d", 0.)
+    return struct.pack("<I", 2) + _dps_str(name) + struct.pack("<III", 0, entry_id, stream_type) + display + \
+        struct.pack("<I", 1) + struct.pack("<I", len(page_ids)) + np.asarray(page_ids, dtype="<u4").tobytes()
+
+
+def _dps_folder(name: str, entry_id: int, children: list[bytes]) -> bytes:
+    return struct.pack("<I", 1) + _dps_str(name) + struct.pack("<III", 0, entry_id, len(children)) + b"".join(children)
+
+
+def dapsys_file(path: Path, n_spikes: int, page_size: int = 4000, seed: int = 0) -> Path:
+    """Writes the signal of :func:`recording` as the continuous recording of a minimal DAPSYS file, split into
+    regularly sampled pages, with a pulse before each spike and the spikes of :func:`tracks` as responses"""
+    signal, spikes = recording(n_spikes, seed=seed).data, tracks(n_spikes, seed=seed).data
+    pages, page_id = [], iter(range(1, 1 << 20))
+
+    def add(page: bytes) -> int:
+        pages.append(page)
+        return len(pages)
+
+    recording_ids = [add(_dps_waveform_page(next(page_id), signal.values[i:i + page_size],
+                                            signal.index.values[i:i + 1], 1e-4))
+                     for i in range(0, len(signal), page_size)]
+    pulse_ids = [add(_dps_text_page(next(page_id), "pulse", ts - 0.01)) for ts in spikes.values]
+    track_ids = {track: [add(_dps_text_page(next(page_id), "", ts)) for ts in spikes.xs(track, level=schema.TRACK)]
+                 for track in spikes.index.levels[1]}
+    stimdef_ids = [add(_dps_text_page(next(page_id), "stimulus", 0.))]
+    comment_ids = [add(_dps_text_page(next(page_id), "start", 0.))]
+    tracks_folder = _dps_folder("Tracks for all Responses", 6, [_dps_stream(track, 7 + i, 3, ids)
+                                                                 for i, (track, ids) in enumerate(track_ids.items())])
+    stim_folder = _dps_folder("NI Puls Stimulator", 1, [
+        _dps_stream("Continuous Recording", 2, 2, recording_ids), _dps_stream("pulses", 3, 3, pulse_ids),
+        _dps_stream("Stim Def Starts", 4, 3, stimdef_ids), _dps_folder("responses", 5, [tracks_folder])])
+    toc = _dps_str("root") + bytes(8) + struct.pack("<I", 2) + stim_folder + \
+        _dps_stream("comments", 20, 3, comment_ids) + _dps_str("footer")
+    path.write_bytes(bytes(0x30) + struct.pack("<I", len(pages)) + b"".join(pages) + toc)
+    return path
+
+
+def _mat_dataset(group: h5py.Group, name: str, value):
+    if isinstance(value, str):
+        dataset = group.create_dataset(name, data=np.frombuffer(value.encode("utf-16-le"), dtype="<u2")[:, None])
+        dataset.attrs["MATLAB_class"] = np.bytes_("char")
+    elif isinstance(value, np.ndarray) and value.dtype == np.int16:
+        dataset = group.create_dataset(name, data=np.atleast_2d(value))
+        dataset.attrs["MATLAB_class"] = np.bytes_("int16")
+    else:
+        dataset = group.create_dataset(name, data=np.atleast_2d(np.asarray(value, dtype=np.float64)))
+        dataset.attrs["MATLAB_class"] = np.bytes_("double")
+
+
+def spike2_file(path: Path, n_spikes: int, seed: int = 0, waveform: bool = False) -> Path:
+    """Writes the signal of :func:`recording` as the realwave channel of a minimal Spike2 MATLAB export, along with a
+    pulse before each spike and a comment. With ``waveform``, the signal is stored as a waveform channel of int16
+    samples with a scale of 1e-4 and an offset of 0.5 instead."""
+    signal, spikes = recording(n_spikes, seed=seed).data, tracks(n_spikes, seed=seed).data
+    signal_channel = dict(title="Signal", length=len(signal), start=signal.index[0], interval=1e-4,
+                          values=signal.values)
+    if waveform:
+        signal_channel.update(values=np.round((signal.values - 0.5) / 1e-4).astype(np.int16), scale=1e-4, offset=0.5,
+                              units="mV", times=signal.index.values)
+    channels = {"rec_Ch1": signal_channel,
+                "rec_Ch10": dict(title="Pulses", length=len(spikes), level=np.zeros(len(spikes)),
+                                 times=spikes.values - 0.01),
+                "rec_Ch30": dict(title="Comments", length=1, text="start", codes=np.zeros((1, 4)), times=[0.])}
+    with h5py.File(path, "w") as file:
+        for struct_name, fields in channels.items():
+            group = file.create_group(struct_name)
+            for name, value in fields.items():
+                _mat_dataset(group, name, value)
+    return path
@@ -0,0 +1,32 @@
+import pytest
+import quantities as pq
+
+from openmnglab.functions.processing.funcs.static_intervals import StaticIntervalsFunc
+from openmnglab.functions.processing.funcs.windows import WindowsFunc
+from tests import synthetic
+
+N_SPIKES = 60
+
+
+@pytest.fixture(scope="session")
+def recording():
+    return synthetic.recording(N_SPIKES)
+
+
+@pytest.fixture(scope="session")
+def tracks():
+    return synthetic.tracks(N_SPIKES)
+
+
+@pytest.fixture(scope="session")
+def intervals(tracks):
+    func = StaticIntervalsFunc(-2 * pq.ms, 3 * pq.ms, "spike_windows")
+    func.set_input(tracks)
+    return func.execute()
+
+
+@pytest.fixture(scope="session")
+def windows(intervals, recording):
+    func = WindowsFunc((0, 1, 2), derivatives=True, derivative_change=pq.ms)
+    func.set_input(intervals, recording)
+    return func.execute()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.array.model import ArrayContainer, ArrayDataSchema, IndexColumn
+from openmnglab.datamodel.exceptions import DataSchemaConformityError
+from openmnglab.functions.analysis.funcs.spdf_components import SPDFComponentsFunc
+from openmnglab.functions.analysis.funcs.spdf_features import FeatureFunc
+from openmnglab.functions.processing.funcs.static_intervals import StaticIntervalsFunc
+from openmnglab.functions.processing.funcs.windows import WindowsFunc
+from openmnglab.functions.processing.static_intervals import StaticIntervals
+from openmnglab.functions.processing.windows import Windows
+
+
+def run_pipeline(tracks, recording, arrays: bool, use_time_offsets=True):
+    intervals = StaticIntervalsFunc(-2 * pq.ms, 3 * pq.ms, "spike_windows", arrays=arrays)
+    intervals.set_input(tracks)
+    windows = WindowsFunc((0, 1, 2), derivatives=True, derivative_change=pq.ms, use_time_offsets=use_time_offsets,
+                          arrays=arrays)
+    windows.set_input(intervals.execute(), recording)
+    windows_container = windows.execute()
+    components = SPDFComponentsFunc(arrays=arrays)
+    components.set_input(windows_container)
+    components_container = components.execute()
+    features = FeatureFunc(arrays=arrays)
+    features.set_input(components_container, windows_container)
+    return windows_container, components_container, features.execute()
+
+
+@pytest.mark.parametrize("use_time_offsets", [True, False])
+def test_array_pipeline_matches_pandas(tracks, recording, use_time_offsets):
+    array_outputs = run_pipeline(tracks, recording, True, use_time_offsets=use_time_offsets)
+    pandas_outputs = run_pipeline(tracks, recording, False, use_time_offsets=use_time_offsets)
+    for array_output, pandas_output in zip(array_outputs, pandas_outputs):
+        assert isinstance(array_output, ArrayContainer)
+        assert array_output.units == pandas_output.units
+        pd.testing.assert_frame_equal(array_output.data, pandas_output.data, check_exact=True)
+
+
+def test_static_intervals_closed(tracks):
+    for arrays in (False, True):
+        func = StaticIntervalsFunc(-2 * pq.ms, 3 * pq.ms, "spike_windows", closed="left", arrays=arrays)
+        func.set_input(tracks)
+        assert func.execute().data.array.closed == "left"
+
+
+def test_extension_columns_are_kept(intervals):
+    assert isinstance(ArrayContainer.from_pandas(intervals).column("spike_windows"), pd.arrays.IntervalArray)
+
+
+def test_pandas_round_trip_does_not_copy(windows):
+    container = ArrayContainer.from_pandas(windows)
+    for name in windows.data.columns:
+        assert np.shares_memory(container.column(name), windows.data[name].values)
+    rebuilt = ArrayContainer(container.columns, container.index_columns, container.units).data
+    pd.testing.assert_frame_equal(rebuilt, windows.data, check_exact=True)
+    for name in windows.data.columns:
+        assert np.shares_memory(rebuilt[name].values, container.column(name))
+    for level, codes in zip(rebuilt.index.levels, rebuilt.index.codes):
+        assert any(np.shares_memory(codes, column.codes) for column in container.index_columns)
+
+
+def test_array_schema_checks_structure(tracks, recording):
+    intervals_schema = StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows", arrays=True) \
+        .output_for(schema.sorted_spikes())
+    windows_schema = Windows(0, 1, 2, derivative_base=pq.ms, arrays=True) \
+        .output_for(intervals_schema, schema.float_timeseries(schema.SIGNAL))
+    assert isinstance(windows_schema, ArrayDataSchema)
+    windows, _, _ = run_pipeline(tracks, recording, True)
+    assert windows_schema.validate_structure(windows)
+    assert windows_schema.validate_sampled(windows, 100)
+    assert windows_schema.validate(windows)
+    columns = dict(windows.columns)
+    columns.popitem()
+    with pytest.raises(DataSchemaConformityError):
+        windows_schema.validate_structure(ArrayContainer(columns, windows.index_columns, windows.units))
+    renamed = (*windows.index_columns[:-1], IndexColumn("other", windows.index_columns[-1].values))
+    with pytest.raises(DataSchemaConformityError):
+        windows_schema.validate_structure(ArrayContainer(windows.columns, renamed, {**windows.units, "other": pq.s}))
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from openmnglab.cli.convert import convert_file, find_files, main
+from openmnglab.datamodel.pandas.store import MANIFEST
+from openmnglab.functions.input.readers.dapsys_reader import DapsysReader
+from openmnglab.functions.input.readers.native_store_reader import NativeStoreReader
+from openmnglab.functions.input.readers.spike2_reader import Spike2Reader
+from tests import synthetic
+
+N_SPIKES = 20
+
+
+@pytest.fixture(scope="module")
+def directory(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("recordings")
+    synthetic.dapsys_file(directory / "a.dps", N_SPIKES)
+    (directory / "nested").mkdir()
+    synthetic.spike2_file(directory / "nested" / "b.mat", N_SPIKES)
+    return directory
+
+
+def execute(definition):
+    func = definition.new_function()
+    func.set_input()
+    return func.execute()
+
+
+def assert_same_outputs(store, original):
+    converted = execute(NativeStoreReader(store))
+    assert len(converted) == len(original)
+    for loaded, expected in zip(converted, original):
+        if expected is None:
+            assert loaded is None
+        elif isinstance(expected.data, pd.DataFrame):
+            pd.testing.assert_frame_equal(loaded.data, expected.data)
+        else:
+            pd.testing.assert_series_equal(loaded.data, expected.data)
+
+
+def test_find_files_keeps_relative_paths(directory, tmp_path):
+    assert list(find_files([directory], tmp_path)) == [(directory / "a.dps", tmp_path / "a"),
+                                                       (directory / "nested" / "b.mat", tmp_path / "nested" / "b")]
+
+
+def test_main_converts_directory(directory, tmp_path):
+    assert main([str(directory), "-o", str(tmp_path), "-j", "2"]) == 0
+    assert_same_outputs(tmp_path / "a", execute(DapsysReader(directory / "a.dps")))
+    assert_same_outputs(tmp_path / "nested" / "b", execute(Spike2Reader(directory / "nested" / "b.mat")))
+    # existing stores are skipped unless they are overwritten
+    manifest = (tmp_path / "a" / MANIFEST).stat().st_mtime_ns
+    assert main([str(directory / "a.dps"), "-o", str(tmp_path), "-j", "1"]) == 0
+    assert (tmp_path / "a" / MANIFEST).stat().st_mtime_ns == manifest
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_convert_quantized_file(directory, tmp_path, compression):
+    store = convert_file(directory / "a.dps", tmp_path / "a", quantized=True, compression=compression)
+    assert_same_outputs(store, execute(DapsysReader(directory / "a.dps", quantized=True)))
+
+
+def test_main_reports_failures(directory, tmp_path):
+    broken = tmp_path / "broken.dps"
+    broken.write_bytes(b"not a dapsys file")
+    assert main([str(broken), "-o", str(tmp_path / "stores"), "-j", "1"]) == 1
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.signal import ContinuousContainer
+from openmnglab.execution import SingleThreadedExecutor
+from openmnglab.execution.exceptions import FunctionExecutionError
+from openmnglab.planning import DefaultPlanner
+from tests.definitions import RecordingSource, ZeroFirst
+
+
+@pytest.fixture
+def planned():
+    planner = DefaultPlanner()
+    recording = planner.add_source(RecordingSource())
+    return planner, recording
+
+
+def test_mutating_function_gets_cow_clone(planned):
+    planner, recording = planned
+    zeroed = planner.add_stage(ZeroFirst(True), recording)
+    executor = SingleThreadedExecutor()
+    executor.execute(planner.get_plan())
+    original = executor.data[recording.referenced_data_id].data
+    assert original.iloc[0] != 0.
+    assert executor.data[zeroed.referenced_data_id].data.iloc[0] == 0.
+    assert not original.values.flags.writeable
+
+
+def test_shared_inputs_are_read_only(planned):
+    planner, recording = planned
+    planner.add_stage(ZeroFirst(False), recording)
+    with pytest.raises(FunctionExecutionError) as failure:
+        SingleThreadedExecutor().execute(planner.get_plan())
+    # the executor wraps the error numpy raises when writing to a read-only array
+    cause = failure.value
+    while cause.__context__ is not None:
+        cause = cause.__context__
+    assert isinstance(cause, ValueError)
+    # without copy-on-write, the function modifies the data of the source
+    executor = SingleThreadedExecutor(copy_on_write=False)
+    executor.execute(planner.get_plan())
+    assert executor.data[recording.referenced_data_id].data.iloc[0] == 0.
+
+
+def test_read_only_views_share_data(recording):
+    with pd.option_context("mode.copy_on_write", True):
+        view = recording.read_only()
+        assert np.shares_memory(view.data.values, recording.data.values)
+        clone = view.cow_copy()
+        assert np.shares_memory(clone.data.values, recording.data.values)
+        clone.data.iloc[0] = 1.
+        assert not np.shares_memory(clone.data.values, recording.data.values)
+    continuous = ContinuousContainer(recording.data.values.copy(), recording.data.index, schema.SIGNAL, recording.units)
+    continuous_view = continuous.read_only()
+    assert np.shares_memory(continuous_view.samples(), continuous.samples())
+    with pytest.raises(ValueError):
+        continuous_view.samples()[0] = 1.
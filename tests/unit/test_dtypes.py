@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.functions.analysis.spdf_components import SPDFComponents
+from openmnglab.functions.analysis.spdf_features import SPDFFeatures
+from openmnglab.functions.processing.static_intervals import StaticIntervals
+from openmnglab.functions.processing.windows import Windows
+from openmnglab.util.dtypes import float_dtype, inherit_float_dtype
+from tests import synthetic
+from tests.unit.conftest import N_SPIKES
+
+
+def execute(definition, inputs, input_schemas):
+    output_schema = definition.output_for(*input_schemas)
+    func = definition.new_function()
+    func.set_input(*inputs)
+    output = func.execute()
+    assert output_schema.validate(output)
+    return output, output_schema
+
+
+def run_pipeline(intervals, recording_dtype, windows_dtype=None):
+    recording = synthetic.recording(N_SPIKES, dtype=recording_dtype)
+    recording_schema = schema.float_timeseries(schema.SIGNAL, dtype=recording_dtype)
+    assert recording_schema.validate(recording)
+    intervals_schema = StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows").output_for(schema.sorted_spikes())
+    windows, windows_schema = execute(Windows(0, 1, 2, derivative_base=pq.ms, dtype=windows_dtype),
+                                      (intervals, recording), (intervals_schema, recording_schema))
+    components, components_schema = execute(SPDFComponents(), (windows,), (windows_schema,))
+    features, _ = execute(SPDFFeatures(), (components, windows), (components_schema, windows_schema))
+    return windows.data, components.data, features.data
+
+
+def test_float32_is_kept_through_the_pipeline(intervals):
+    windows32, components32, features32 = run_pipeline(intervals, np.float32)
+    windows64, components64, features64 = run_pipeline(intervals, np.float64)
+    assert (windows32.dtypes == np.float32).all()
+    assert (features32.dtypes == np.float32).all()
+    # components are timestamps and are always float64
+    assert (components32.dtypes == np.float64).all()
+    np.testing.assert_allclose(windows32.values, windows64.values, rtol=1e-3, atol=1e-4)
+    pd.testing.assert_frame_equal(components32, components64)
+    pd.testing.assert_frame_equal(features32, features64.astype(np.float32), rtol=1e-3, check_exact=False)
+
+
+def test_windows_dtype_overrides_recording(intervals):
+    windows, _, features = run_pipeline(intervals, np.float32, windows_dtype=np.float64)
+    assert (windows.dtypes == np.float64).all()
+    assert (features.dtypes == np.float64).all()
+
+
+def test_dtype_in_config_hash():
+    assert Windows(0, 1, dtype=np.float32).config_hash != Windows(0, 1).config_hash
+    assert Windows(0, 1, dtype=np.float32).config_hash == Windows(0, 1, dtype="float32").config_hash
+    assert SPDFFeatures(dtype=np.float64).config_hash != SPDFFeatures().config_hash
+
+
+def test_float_dtype():
+    assert float_dtype(float) is np.float64
+    assert float_dtype("float32") is np.float32
+    assert float_dtype(None) is None
+    with pytest.raises(AssertionError):
+        float_dtype(np.int16)
+    assert inherit_float_dtype(None, np.float32) is np.float32
+    assert inherit_float_dtype(None, np.int16) is np.float64
+    assert inherit_float_dtype(np.float64, np.float32) is np.float64
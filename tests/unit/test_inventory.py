@@ -0,0 +1,63 @@
+import json
+import math
+
+import pytest
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.cli.inventory import CACHE, scan_directory, scan_file
+from openmnglab.functions.input.readers.funcs.dapsys_reader import DapsysReaderFunc
+from tests import synthetic
+
+N_SPIKES = 20
+
+
+@pytest.fixture(scope="module")
+def directory(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("recordings")
+    synthetic.dapsys_file(directory / "a.dps", N_SPIKES)
+    (directory / "nested").mkdir()
+    synthetic.spike2_file(directory / "nested" / "b.mat", N_SPIKES)
+    return directory
+
+
+def test_dapsys_scan_matches_loaded_file(directory):
+    func = DapsysReaderFunc(directory / "a.dps")
+    summary = func.scan()
+    signal, pulses, tracks, comments, _ = func.execute()
+    times = signal.time_index
+    assert summary["samples"] == len(times)
+    assert summary["start"] == times[0] and summary["end"] == pytest.approx(times[-1])
+    assert summary["sampling_rate"] == pytest.approx(1e4)
+    assert summary["pulses"] == len(pulses.data) == N_SPIKES
+    assert summary["tracks"] == len(tracks.data.index.get_level_values(schema.TRACK).categories)
+    assert summary["comments"] == len(comments.data)
+    assert "NI Puls Stimulator/Continuous Recording" in summary["channels"]
+
+
+def test_spike2_scan(directory):
+    summary = scan_file(directory / "nested" / "b.mat")
+    recording = synthetic.recording(N_SPIKES).data
+    assert summary["format"] == "spike2"
+    assert summary["channels"] == ("Signal", "Pulses", "Comments")
+    assert summary["samples"] == len(recording)
+    assert summary["duration"] == pytest.approx(recording.index[-1] - recording.index[0])
+    assert summary["pulses"] == N_SPIKES and summary["comments"] == 1 and summary["tracks"] == 0
+
+
+def test_scan_directory_caches_by_fingerprint(directory):
+    inventory = scan_directory(directory, jobs=2)
+    assert list(inventory.index) == ["a.dps", "nested/b.mat"]
+    assert inventory["error"].isna().all()
+    cache = json.loads((directory / CACHE).read_text())
+    assert set(cache) == {"a.dps", "nested/b.mat"}
+    # unchanged files are taken from the cache
+    cache["a.dps"]["summary"]["pulses"] = -1
+    (directory / CACHE).write_text(json.dumps(cache))
+    assert scan_directory(directory, jobs=1).loc["a.dps", "pulses"] == -1
+    # changed files are scanned again, broken ones are reported
+    synthetic.dapsys_file(directory / "a.dps", N_SPIKES - 2)
+    (directory / "broken.dps").write_bytes(b"not a dapsys file")
+    inventory = scan_directory(directory, jobs=1)
+    assert inventory.loc["a.dps", "pulses"] == N_SPIKES - 2
+    assert isinstance(inventory.loc["broken.dps", "error"], str) and math.isnan(inventory.loc["broken.dps", "start"])
+    assert "broken.dps" not in json.loads((directory / CACHE).read_text())
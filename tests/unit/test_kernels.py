@@ -0,0 +1,30 @@
+from numba import types
+
+from openmnglab.functions.analysis.funcs.spdf_components import SPDFComponentsFunc
+from openmnglab.functions.analysis.funcs.spdf_features import FeatureFunc
+from openmnglab.util.kernels import kernel, kernels, warmup
+
+
+@kernel((types.int64,))
+def _increment(x):
+    return x + 1
+
+
+def test_declared_signatures_cover_calls(windows):
+    components_func = SPDFComponentsFunc()
+    components_func.set_input(windows)
+    features_func = FeatureFunc()
+    features_func.set_input(components_func.execute(), windows)
+    features_func.execute()
+    for name, (dispatcher, signatures) in kernels().items():
+        if signatures:
+            assert set(dispatcher.signatures) <= set(signatures), name
+
+
+def test_warmup_compiles_declared_signatures():
+    name = f"{__name__}:_increment"
+    assert name in kernels()
+    timings = warmup([name], parallel=False)
+    assert set(timings) == {name}
+    assert _increment.signatures == [(types.int64,)]
+    assert _increment(1) == 2
@@ -0,0 +1,80 @@
+import pickle
+
+import h5py
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.lazy import HDF5Array, LazyArray
+from openmnglab.datamodel.pandas.signal import ContinuousContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+from openmnglab.functions.helpers.general import coalesce_ranges
+from openmnglab.functions.input.readers.funcs.spike2_reader import Spike2ReaderFunc
+from openmnglab.functions.processing.funcs.static_intervals import StaticIntervalsFunc
+from openmnglab.functions.processing.funcs.windows import WindowsFunc
+from tests import synthetic
+
+
+class RecordedReads(LazyArray):
+    """Array in memory which records the ranges read from it"""
+
+    def __init__(self, values: np.ndarray):
+        super().__init__(len(values), values.dtype)
+        self.values = values
+        self.reads: list[tuple[int, int]] = []
+
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        self.reads.append((start, stop))
+        return self.values[start:stop]
+
+
+def test_hdf5_array_reads_ranges(tmp_path):
+    values = np.arange(1000, dtype=np.int16)
+    with h5py.File(tmp_path / "values.h5", "w") as file:
+        file.create_dataset("row", data=values[None, :])
+        file.create_dataset("column", data=values[:, None])
+    for dataset in ("row", "column"):
+        array = HDF5Array(tmp_path / "values.h5", dataset, start=100, stop=900, dtype=np.float32)
+        assert len(array) == 800 and array.dtype == np.float32
+        np.testing.assert_array_equal(array[10:20], values[110:120])
+        assert array[-1] == 899
+        np.testing.assert_array_equal(np.asarray(pickle.loads(pickle.dumps(array))), values[100:900])
+
+
+def test_coalesce_ranges():
+    starts, stops = np.array([0, 10, 100, 105, 5000]), np.array([5, 20, 110, 120, 5010])
+    np.testing.assert_array_equal(coalesce_ranges(starts, stops, 50, 1000), [0, 2, 4, 5])
+    np.testing.assert_array_equal(coalesce_ranges(starts, stops, 50, 15), [0, 1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(coalesce_ranges(starts[:0], stops[:0], 50, 15), [0])
+
+
+def test_windows_of_sparse_spikes_read_few_samples():
+    # one spike per second, so most of the recording is between the windows
+    recording, tracks = synthetic.recording(20, spacing=1.), synthetic.tracks(20, spacing=1.)
+    intervals = StaticIntervalsFunc(-2 * pq.ms, 3 * pq.ms, "spike_windows")
+    intervals.set_input(tracks)
+    intervals = intervals.execute()
+    series = recording.data
+    values = RecordedReads(series.values)
+    time_base = RegularTimeBase.regular(series.index[0], 1e-4, len(series), name=schema.TIMESTAMP)
+    lazy_signal = ContinuousContainer(values, time_base, schema.SIGNAL, recording.units)
+    results = []
+    for signal in (recording, lazy_signal):
+        func = WindowsFunc((0, 1, 2), derivatives=False, derivative_change=None, interval=1e-4)
+        func.set_input(intervals, signal)
+        results.append(func.execute().data)
+    pd.testing.assert_frame_equal(results[0], results[1])
+    assert len(values.reads) == 20
+    assert sum(stop - start for start, stop in values.reads) < 0.01 * len(series)
+
+
+def test_lazy_spike2_signal(tmp_path):
+    path = synthetic.spike2_file(tmp_path / "recording.mat", 10)
+    eager = Spike2ReaderFunc(path, start=0.1, end=0.4).execute()[0]
+    lazy = Spike2ReaderFunc(path, start=0.1, end=0.4, lazy=True).execute()[0]
+    assert isinstance(lazy._values, HDF5Array)
+    np.testing.assert_array_equal(lazy.samples(), eager.samples())
+    np.testing.assert_allclose(lazy.times(), eager.times())
+    np.testing.assert_array_equal(lazy.samples(100, 110), eager.samples(100, 110))
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.array.model import ArrayContainer
+from openmnglab.datamodel.pandas.persistence import save, load
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer, SignalContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+
+
+def assert_units_equal(loaded, expected):
+    assert loaded.keys() == expected.keys()
+    for name, unit in expected.items():
+        assert loaded[name].dimensionality == unit.dimensionality and loaded[name].magnitude == unit.magnitude
+
+
+@pytest.mark.parametrize("container_name", ["recording", "tracks", "intervals", "windows"])
+def test_round_trip(request, tmp_path, container_name):
+    container = request.getfixturevalue(container_name)
+    loaded = load(save(container, tmp_path / container_name))
+    assert type(loaded) is PandasContainer
+    if isinstance(container.data, pd.Series):
+        pd.testing.assert_series_equal(loaded.data, container.data, check_exact=True)
+    else:
+        pd.testing.assert_frame_equal(loaded.data, container.data, check_exact=True)
+    assert_units_equal(loaded.units, container.units)
+
+
+def test_strings_and_array_container(tmp_path, windows):
+    comments = PandasContainer(pd.Series(["start", "", "stimulus changed"], name=schema.COMMENT,
+                                         index=pd.Index([0.5, 1., 7.25], name=schema.TIMESTAMP)),
+                               {schema.COMMENT: pq.dimensionless, schema.TIMESTAMP: pq.s})
+    pd.testing.assert_series_equal(load(save(comments, tmp_path / "comments")).data, comments.data)
+    arrays = ArrayContainer.from_pandas(windows)
+    loaded = load(save(arrays, tmp_path / "arrays"))
+    assert isinstance(loaded, ArrayContainer)
+    pd.testing.assert_frame_equal(loaded.data, windows.data, check_exact=True)
+
+
+def test_signal_is_memory_mapped(tmp_path):
+    time_base = RegularTimeBase.from_segments([1000, 500], [0., 2.], [1e-3, 5e-4], name=schema.TIMESTAMP)
+    units = {schema.SIGNAL: pq.V, schema.TIMESTAMP: pq.s}
+    raw = np.random.default_rng(0).integers(-2 ** 15, 2 ** 15, len(time_base), dtype=np.int16)
+    signal = SignalContainer(raw, time_base, schema.SIGNAL, units, 1 / 2 ** 12, 0.25, dtype=np.float32)
+    loaded = load(save(signal, tmp_path / "signal"))
+    assert isinstance(loaded, SignalContainer) and isinstance(loaded.time_index, RegularTimeBase)
+    assert isinstance(loaded.raw.base, np.memmap) and not loaded.raw.flags.writeable
+    assert (loaded.scale, loaded.offset, loaded.dtype) == (signal.scale, signal.offset, signal.dtype)
+    pd.testing.assert_series_equal(loaded.data, signal.data, check_exact=True)
+    continuous = ContinuousContainer(signal.samples(), signal.index, schema.SIGNAL, units)
+    loaded = load(save(continuous, tmp_path / "continuous"), mmap=False)
+    assert type(loaded) is ContinuousContainer and not isinstance(loaded.samples().base, np.memmap)
+    pd.testing.assert_series_equal(loaded.data, continuous.data, check_exact=True)
+
+
+def test_rejects_other_directories(tmp_path):
+    (tmp_path / "container.json").write_text('{"format": "other"}')
+    with pytest.raises(ValueError):
+        load(tmp_path)
@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.execution import SingleThreadedExecutor
+from openmnglab.functions.base import SourceFunctionBase, SourceFunctionDefinitionBase
+from openmnglab.functions.input.readers.dapsys_reader import DapsysReader
+from openmnglab.functions.input.readers.spike2_reader import Spike2Reader
+from openmnglab.functions.processing.static_intervals import StaticIntervals
+from openmnglab.functions.processing.time_slice import TimeSlice
+from openmnglab.functions.processing.windows import Windows
+from openmnglab.planning import DefaultPlanner, PlanOptimizer, PlanPass, DeadStageElimination, SharedStages
+from openmnglab.planning.base import DataReference, ExecutionPlan
+from openmnglab.planning.default import Stage
+from openmnglab.planning.exceptions import PlanningError
+from openmnglab.util.hashing import HashBuilder
+from tests import synthetic
+from tests.definitions import RecordingSource, ZeroFirst
+
+
+def test_readding_a_stage_returns_its_references():
+    planner = DefaultPlanner()
+    recording = planner.add_source(RecordingSource())
+    zeroed = planner.add_stage(ZeroFirst(False), recording)
+    n_stages = len(planner.get_plan().stages)
+    assert planner.add_source(RecordingSource()).referenced_data_id == recording.referenced_data_id
+    assert planner.add_stage(ZeroFirst(False), recording).referenced_data_id == zeroed.referenced_data_id
+    assert len(planner.get_plan().stages) == n_stages
+    # a different configuration is a different stage
+    assert planner.add_stage(ZeroFirst(True), recording).referenced_data_id != zeroed.referenced_data_id
+    assert len(planner.get_plan().stages) == n_stages + 1
+
+
+def test_merge_shares_common_stages():
+    def analysis(mutates: bool):
+        planner = DefaultPlanner()
+        recording = planner.add_source(RecordingSource())
+        return planner, recording, planner.add_stage(ZeroFirst(mutates), recording)
+
+    first, recording, zeroed = analysis(True)
+    second, _, zeroed_again = analysis(True)
+    first.merge(second)
+    plan = first.get_plan()
+    assert len(plan.stages) == 2
+    assert zeroed_again.referenced_data_id == zeroed.referenced_data_id
+    executor = SingleThreadedExecutor()
+    executor.execute(plan)
+    assert recording.referenced_data_id in executor.data and zeroed.referenced_data_id in executor.data
+    # stages only part of the merged plan are added, references into it stay valid
+    third, _, zeroed_in_view = analysis(False)
+    first.merge(third.get_plan())
+    assert len(first.get_plan().stages) == 3
+    assert first.add_stage(ZeroFirst(False), recording).referenced_data_id == zeroed_in_view.referenced_data_id
+
+
+def test_windows_planned_twice_are_planned_once():
+    planner = DefaultPlanner()
+    recording = planner.add_source(RecordingSource())
+    windows = [planner.add_stage(Windows(0, derivative_base=pq.ms), planner.add_stage(
+        StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows"), recording), recording) for _ in range(2)]
+    assert windows[0].referenced_data_id == windows[1].referenced_data_id
+
+
+def test_frozen_definitions_are_planned_without_copies():
+    planner = DefaultPlanner()
+    recording = planner.add_source(RecordingSource())
+    intervals = StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows").freeze()
+    windows = Windows(0, derivative_base=pq.ms).freeze()
+    with pytest.raises(AttributeError):
+        windows._levels = (1,)
+    frozen = planner.add_stage(windows, planner.add_stage(intervals, recording), recording)
+    copied = planner.add_stage(Windows(0, derivative_base=pq.ms),
+                               planner.add_stage(StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows"), recording),
+                               recording)
+    assert frozen.referenced_data_id == copied.referenced_data_id
+    stage = planner.get_plan().planned_data[frozen.referenced_data_id].produced_by
+    assert stage.definition is windows
+
+
+def plan_windows():
+    planner = DefaultPlanner()
+    recording = planner.add_source(RecordingSource())
+    intervals = planner.add_stage(StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows"), recording)
+    zeroed = planner.add_stage(ZeroFirst(True), recording)
+    windows = planner.add_stage(Windows(0, derivative_base=pq.ms), intervals, recording)
+    return planner.get_plan(), windows, zeroed
+
+
+def test_optimizer_removes_dead_stages():
+    plan, windows, zeroed = plan_windows()
+    optimized, report = PlanOptimizer([DeadStageElimination()]).optimize(plan, zeroed)
+    assert len(optimized.stages) == 2 and report.removed == len(plan.stages) - 2
+    assert {stage.definition.identifier for stage in report.passes[-1].removed} == {"openmnglab.windowdata",
+                                                                                    "openmnglab.windowing"}
+    assert report.reference(zeroed).referenced_data_id == zeroed.referenced_data_id
+    executor = SingleThreadedExecutor()
+    executor.execute(optimized)
+    assert zeroed.referenced_data_id in executor.data and windows.referenced_data_id not in executor.data
+
+
+def test_optimizer_shares_identical_stages():
+    plan, windows, _ = plan_windows()
+    # a copy of the windows and the intervals they consume under different ids, as a rewriting pass could add them
+    windows_stage = plan.planned_data[windows.referenced_data_id].produced_by
+    intervals, recording = windows_stage.data_in
+    intervals_stage = intervals.produced_by
+    intervals_copy = Stage(intervals_stage.definition, *intervals_stage.data_in, planning_id=b"intervals copy")
+    windows_copy = Stage(windows_stage.definition, intervals_copy.data_out[0], recording, planning_id=b"windows copy")
+    plan = ExecutionPlan((*plan.stages.values(), intervals_copy, windows_copy),
+                         (*plan.planned_data.values(), *intervals_copy.data_out, *windows_copy.data_out))
+    copied = DataReference(windows_copy.data_out[0].planning_id)
+    optimized, report = PlanOptimizer([SharedStages(), DeadStageElimination()]).optimize(plan, windows, copied)
+    assert len(optimized.stages) == len(plan.stages) - 3
+    assert report.reference(copied).referenced_data_id == windows.referenced_data_id
+    assert report.passes[0].replaced[intervals_copy.data_out[0].planning_id] == intervals_stage.data_out[0].planning_id
+
+
+def test_passes_must_keep_the_requested_data():
+    class DropEverything(PlanPass):
+        def apply(self, plan, outputs):
+            return ExecutionPlan((), ()), dict()
+
+    plan, windows, _ = plan_windows()
+    with pytest.raises(PlanningError):
+        PlanOptimizer([DropEverything()]).optimize(plan, windows)
+    optimized, report = PlanOptimizer([DropEverything()]).optimize(plan)
+    assert len(optimized.stages) == 0 and len(report.passes[0].removed) == len(plan.stages)
+
+
+class TracksSourceFunc(SourceFunctionBase):
+    def execute(self) -> PandasContainer[pd.Series]:
+        return synthetic.tracks(5)
+
+
+class TracksSource(SourceFunctionDefinitionBase):
+    def __init__(self):
+        super().__init__("test.tracks")
+
+    @property
+    def config_hash(self) -> bytes:
+        return HashBuilder().digest()
+
+    @property
+    def produces(self):
+        return schema.sorted_spikes()
+
+    def new_function(self) -> TracksSourceFunc:
+        return TracksSourceFunc()
+
+
+def test_optimizer_fuses_intervals_and_their_windows():
+    planner = DefaultPlanner()
+    recording, tracks = planner.add_source(RecordingSource()), planner.add_source(TracksSource())
+    intervals = planner.add_stage(StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows"), tracks)
+    windows = planner.add_stage(Windows(0, 1, derivative_base=pq.ms), intervals, recording)
+    plan = planner.get_plan()
+    optimized, report = PlanOptimizer().optimize(plan, windows)
+    assert [stage.definition.identifier for stage in report.passes[1].added] == ["openmnglab.staticwindows"]
+    assert len(optimized.stages) == len(plan.stages) - 1
+    fused = report.reference(windows)
+    assert optimized.planned_data[fused.referenced_data_id].schema.pandera_schema == \
+           plan.planned_data[windows.referenced_data_id].schema.pandera_schema
+    executor = SingleThreadedExecutor()
+    executor.execute(plan)
+    executor.execute(optimized)
+    pd.testing.assert_frame_equal(executor.data[fused.referenced_data_id].data,
+                                  executor.data[windows.referenced_data_id].data)
+    # intervals which are requested or used otherwise are kept
+    _, report = PlanOptimizer().optimize(plan, windows, intervals)
+    assert not report.passes[1].changed
+
+
+def test_time_slice_selects_samples_and_events_in_range():
+    signal = TimeSlice(100 * pq.ms, 0.2 * pq.s).new_function()
+    signal.set_input(synthetic.recording(5))
+    sliced = signal.execute().data
+    assert sliced.index[0] == pytest.approx(0.1) and sliced.index[-1] == pytest.approx(0.2)
+    spikes = synthetic.tracks(5)
+    events = TimeSlice(100 * pq.ms, 0.2 * pq.s).new_function()
+    events.set_input(spikes)
+    times = spikes.data.values
+    assert np.array_equal(events.execute().data.values, times[(times >= 0.1) & (times <= 0.2)])
+
+
+@pytest.mark.parametrize("reader", ["spike2", "dapsys"])
+def test_optimizer_pushes_time_slices_into_readers(tmp_path, reader):
+    source = Spike2Reader(synthetic.spike2_file(tmp_path / "a.mat", 20)) if reader == "spike2" else \
+        DapsysReader(synthetic.dapsys_file(tmp_path / "a.dps", 20))
+    planner = DefaultPlanner()
+    outputs = planner.add_source(source)
+    ranges = ((100 * pq.ms, 0.2 * pq.s), (0.3 * pq.s, 600 * pq.ms))
+    slices = [planner.add_stage(TimeSlice(*ranges[i % 2]), output) for i, output in enumerate(outputs)]
+    plan = planner.get_plan()
+    optimized, report = PlanOptimizer().optimize(plan, *slices)
+    # the slices are kept on top of the restricted reader
+    restricted, *slice_stages = sorted(report.passes[0].added, key=lambda stage: stage.depth)
+    assert [stage.definition.identifier for stage in slice_stages] == ["openmnglab.timeslice"] * len(outputs)
+    assert restricted.definition.config_hash != source.config_hash
+    assert (restricted.definition._start, restricted.definition._end) == (pytest.approx(0.1), pytest.approx(0.6))
+    executor = SingleThreadedExecutor()
+    executor.execute(plan)
+    executor.execute(optimized)
+    for sliced in slices:
+        expected = executor.data[sliced.referenced_data_id].data
+        pd.testing.assert_series_equal(executor.data[report.reference(sliced).referenced_data_id].data, expected)
+    pulses = slices[4 if reader == "spike2" else 1]
+    assert len(executor.data[pulses.referenced_data_id].data) > 0
+    # readers whose outputs are requested or used otherwise read everything
+    _, report = PlanOptimizer().optimize(plan, slices[0], outputs[1])
+    assert not report.passes[0].changed
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from openmnglab.functions.input.readers.dapsys_reader import DapsysReader
+from openmnglab.functions.input.readers.funcs.dapsys_reader import DapsysReaderFunc
+from openmnglab.functions.input.readers.funcs.spike2_reader import Spike2ReaderFunc
+from openmnglab.functions.input.readers.spike2_reader import Spike2Reader
+from openmnglab.util.arrays import rechunk
+from tests import synthetic
+
+# three pages, the last one after a gap and with a different sampling interval
+PAGES = dict(lengths=[12000, 9000, 14000], starts=[0.0, 1.2, 2.5], intervals=[1e-4, 1e-4, 5e-5])
+N_SPIKES = 20
+
+
+def _pages():
+    for n, start, interval in zip(PAGES["lengths"], PAGES["starts"], PAGES["intervals"]):
+        times = start + np.arange(n) * interval
+        yield times * 10, times
+
+
+def test_rechunk_by_samples():
+    values, times = (np.concatenate(arrays) for arrays in zip(*_pages()))
+    chunks = list(rechunk(_pages(), samples=10000))
+    assert [len(chunk_values) for chunk_values, _ in chunks] == [10000, 10000, 10000, 5000]
+    np.testing.assert_array_equal(np.concatenate([chunk_values for chunk_values, _ in chunks]), values)
+    np.testing.assert_array_equal(np.concatenate([chunk_times for _, chunk_times in chunks]), times)
+
+
+def test_rechunk_by_duration():
+    times = np.concatenate([page_times for _, page_times in _pages()])
+    chunks = list(rechunk(_pages(), duration=0.2))
+    np.testing.assert_array_equal(np.concatenate([chunk_times for _, chunk_times in chunks]), times)
+    # the chunk [2.2, 2.4) lies in the gap between the second and the third page and is skipped
+    assert len(chunks) == 15
+    assert not any(2.2 <= chunk_times[0] < 2.4 for _, chunk_times in chunks)
+    for _, chunk_times in chunks:
+        assert chunk_times[-1] - chunk_times[0] < 0.2
+    with pytest.raises(ValueError):
+        next(rechunk(_pages(), samples=10, duration=0.5))
+
+
+@pytest.fixture(scope="module")
+def files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("recordings")
+    return synthetic.dapsys_file(directory / "a.dps", N_SPIKES, page_size=3000), \
+        synthetic.spike2_file(directory / "b.mat", N_SPIKES)
+
+
+def assert_chunks_match(chunks, signal, samples=None, duration=None):
+    if samples is not None:
+        assert all(len(chunk.samples()) == samples for chunk in chunks[:-1])
+    if duration is not None:
+        assert all(chunk.times()[-1] - chunk.times()[0] < duration for chunk in chunks)
+    np.testing.assert_array_equal(np.concatenate([chunk.samples() for chunk in chunks]), signal.samples())
+    np.testing.assert_allclose(np.concatenate([chunk.times() for chunk in chunks]), signal.times())
+
+
+@pytest.mark.parametrize("time_range", [{}, dict(start=0.2, end=0.65)], ids=["full", "range"])
+@pytest.mark.parametrize("chunking", [dict(samples=2500), dict(duration=0.15)], ids=["samples", "duration"])
+def test_dapsys_iter_signal_matches_read(files, time_range, chunking):
+    path, _ = files
+    chunks = list(DapsysReader(path, **time_range).iter_signal(**chunking))
+    assert_chunks_match(chunks, DapsysReaderFunc(path, **time_range).execute()[0], **chunking)
+
+
+@pytest.mark.parametrize("time_range", [{}, dict(start=0.2, end=0.65)], ids=["full", "range"])
+@pytest.mark.parametrize("chunking", [dict(samples=2500), dict(duration=0.15)], ids=["samples", "duration"])
+def test_spike2_iter_signal_matches_read(files, time_range, chunking):
+    _, path = files
+    chunks = list(Spike2Reader(path, **time_range).iter_signal(**chunking))
+    assert_chunks_match(chunks, Spike2ReaderFunc(path, **time_range).execute()[0], **chunking)
+
+
+def test_spike2_iter_sig_chan_reads_blocks(files):
+    _, path = files
+    func = Spike2ReaderFunc(path, start=0.1)
+    chunks = list(func.iter_sig_chan("Signal", func._signal_unit, samples=700, block_size=1000))
+    assert_chunks_match(chunks, Spike2ReaderFunc(path, start=0.1).execute()[0], samples=700)
+    # the chunks are named after the channel
+    assert chunks[0].name == "Signal"
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import SignalContainer, dequantize, infer_quantization, quantize
+from openmnglab.functions.input.readers.funcs.spike2_reader import Spike2ReaderFunc
+from openmnglab.functions.processing.funcs import windows as windows_funcs
+from openmnglab.functions.processing.funcs.windows import WindowsFunc
+from tests import synthetic
+
+SCALE = 1 / 3276.8
+OFFSET = 0.25
+
+
+@pytest.fixture(scope="module", params=[np.float32, np.float64])
+def quantized(recording, request):
+    raw = np.rint((recording.data.values - OFFSET) / SCALE).astype(np.int16)
+    return SignalContainer(raw, recording.data.index, schema.SIGNAL, recording.units, SCALE, OFFSET,
+                           dtype=request.param)
+
+
+def test_dequantize_applies_scale_and_offset():
+    raw = np.array([-2, 0, 3], dtype=np.int16)
+    np.testing.assert_array_equal(dequantize(raw, 0.5, 1.), [0., 1., 2.5])
+    assert dequantize(raw, 0.5, 1., dtype=np.float32).dtype == np.float32
+
+
+def test_from_series_round_trips_losslessly(quantized):
+    signal = SignalContainer.from_series(quantized.data, quantized.units)
+    assert signal.raw.dtype == np.int16
+    pd.testing.assert_series_equal(signal.data, quantized.data, check_exact=True)
+
+
+def test_unquantized_values_are_rejected(recording):
+    assert infer_quantization(recording.data.values) is None
+    with pytest.raises(ValueError):
+        SignalContainer.from_series(recording.data, recording.units)
+    with pytest.raises(ValueError):
+        quantize(recording.data.values, SCALE, OFFSET)
+
+
+def test_validates_without_dequantizing(quantized):
+    signal = SignalContainer(quantized.raw, quantized.index, quantized.name, quantized.units, quantized.scale,
+                             quantized.offset, dtype=quantized.dtype)
+    assert schema.float_timeseries(schema.SIGNAL, dtype=signal.dtype.type).validate(signal)
+    assert signal._data is None
+
+
+@pytest.mark.parametrize("block", [windows_funcs.QUANTIZATION_BLOCK, 997])
+def test_windows_dequantize_blockwise(quantized, intervals, monkeypatch, block):
+    monkeypatch.setattr(windows_funcs, "QUANTIZATION_BLOCK", block)
+    signal = SignalContainer(quantized.raw, quantized.index, quantized.name, quantized.units, quantized.scale,
+                             quantized.offset, dtype=quantized.dtype)
+    dense = PandasContainer(quantized.data, quantized.units)
+    for derivatives in (False, True):
+        results = []
+        for recording in (signal, dense):
+            func = WindowsFunc((0, 1, 2), derivatives=derivatives, derivative_change=pq.ms if derivatives else None)
+            func.set_input(intervals, recording)
+            results.append(func.execute())
+        pd.testing.assert_frame_equal(results[0].data, results[1].data, check_exact=True)
+        assert results[0].units == results[1].units
+    assert signal._data is None
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_spike2_waveform_scale_is_only_applied_if_requested(tmp_path, lazy):
+    path = synthetic.spike2_file(tmp_path / "recording.mat", 5, waveform=True)
+    stored = np.round((synthetic.recording(5).data.values - 0.5) / 1e-4)
+    raw, quantized, scaled, scaled_quantized = (Spike2ReaderFunc(path, quantized=quantized, scaled=scaled, lazy=lazy)
+                                                .execute()[0]
+                                                for scaled in (False, True) for quantized in (False, True))
+    np.testing.assert_array_equal(raw.samples(), stored)
+    assert isinstance(quantized, SignalContainer) and (quantized.scale, quantized.offset) == (1., 0.)
+    np.testing.assert_array_equal(quantized.samples(), stored)
+    np.testing.assert_allclose(scaled.samples(), stored * 1e-4 + 0.5)
+    assert (scaled_quantized.scale, scaled_quantized.offset) == (1e-4, 0.5)
+    np.testing.assert_array_equal(scaled_quantized.samples(), scaled.samples())
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from openmnglab.functions.analysis.funcs.spdf_components import spdf_components, get_principle_components, \
+    get_principle_components_alt1, SPDFComponentsFunc, SPDF_COMPONENTS
+from openmnglab.functions.helpers.general import window_bounds
+from openmnglab.functions.processing.funcs.windows import LEVEL_COLUMN
+
+REFERENCE = {"alt1": get_principle_components_alt1, "original": get_principle_components}
+
+
+@pytest.mark.parametrize("algorithm", ["alt1", "original"])
+def test_kernel_matches_reference(algorithm):
+    rng = np.random.default_rng(42)
+    lens = rng.integers(2, 40, 2000)
+    diff1 = rng.normal(size=lens.sum())
+    diff1[rng.integers(0, len(diff1), 100)] = 0.
+    bounds = np.append(0, np.cumsum(lens))
+    codes = np.concatenate([np.arange(n) for n in lens])
+    level_values = np.arange(lens.max()) * 0.1
+    components = spdf_components(diff1, level_values, codes, bounds, algorithm=algorithm)
+    assert components.shape == (6, len(lens))
+    compared = 0
+    for i, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        try:
+            expected = REFERENCE[algorithm](level_values[:stop - start], diff1[start:stop])
+        except (ValueError, AssertionError, UnboundLocalError):
+            # the reference implementations fail on some degenerated windows
+            continue
+        np.testing.assert_array_equal(components[:, i], np.array(expected, dtype=float))
+        compared += 1
+    assert compared > len(lens) // 2
+
+
+@pytest.mark.parametrize("algorithm", ["alt1", "original"])
+def test_components_func(windows, algorithm):
+    func = SPDFComponentsFunc(algorithm=algorithm)
+    func.set_input(windows)
+    components = func.execute().data
+    grouped = windows.data.groupby(level=list(range(windows.data.index.nlevels - 1)), sort=False, observed=True)
+    assert components.index.equals(windows.data.index.droplevel(-1).unique())
+    assert tuple(components.columns) == SPDF_COMPONENTS
+    for (loc, group), (_, row) in zip(grouped, components.iterrows()):
+        expected = REFERENCE[algorithm](group.index.get_level_values(-1), group[LEVEL_COLUMN[1]].values)
+        np.testing.assert_array_equal(row.values, np.array(expected, dtype=float))
+
+
+def test_window_bounds(windows):
+    bounds = window_bounds(windows.data.index)
+    sizes = windows.data.groupby(level=list(range(windows.data.index.nlevels - 1)), sort=False, observed=True).size().values
+    np.testing.assert_array_equal(np.diff(bounds), sizes)
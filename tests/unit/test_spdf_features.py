@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.functions.analysis.funcs.spdf_components import SPDFComponentsFunc, SPDF_COMPONENTS
+from openmnglab.functions.analysis.funcs.spdf_features import FeatureFunc, calc_features, SPDF_FEATURES
+from openmnglab.functions.processing.funcs.windows import LEVEL_COLUMN
+
+
+def reference_features(components: pd.DataFrame, diffs: pd.DataFrame) -> np.ndarray:
+    expected = np.empty((len(components), len(SPDF_FEATURES)))
+    for i, (spike_loc, spike_components) in enumerate(components.iterrows()):
+        diff = diffs.loc[spike_loc]
+        expected[i] = calc_features(diff[LEVEL_COLUMN[1]], diff[LEVEL_COLUMN[2]],
+                                    *(spike_components[component] for component in SPDF_COMPONENTS))
+    return expected
+
+
+def compute_components(windows, algorithm):
+    func = SPDFComponentsFunc(algorithm=algorithm)
+    func.set_input(windows)
+    return func.execute()
+
+
+def compute_features(components, windows):
+    func = FeatureFunc()
+    func.set_input(components, windows)
+    return func.execute().data
+
+
+@pytest.mark.parametrize("algorithm", ["alt1", "original"])
+def test_features_match_reference(windows, algorithm):
+    components = compute_components(windows, algorithm)
+    features = compute_features(components, windows)
+    assert tuple(features.columns) == SPDF_FEATURES
+    assert features.index.equals(components.data.index)
+    np.testing.assert_allclose(features.values, reference_features(components.data, windows.data), rtol=1e-9,
+                               equal_nan=True)
+
+
+@pytest.mark.filterwarnings("ignore:invalid value encountered:RuntimeWarning")
+def test_features_missing_components(windows):
+    components = compute_components(windows, "alt1")
+    rng = np.random.default_rng(0)
+    data = components.data.copy()
+    data.values[rng.random(data.shape) < 0.2] = np.nan
+    components = PandasContainer(data, components.units)
+    np.testing.assert_allclose(compute_features(components, windows).values,
+                               reference_features(components.data, windows.data), rtol=1e-9, equal_nan=True)
+
+
+def test_features_reordered_components(windows):
+    components = compute_components(windows, "alt1")
+    shuffled = components.data.sample(frac=1, random_state=0)
+    features = compute_features(PandasContainer(shuffled, components.units), windows)
+    assert features.index.equals(shuffled.index)
+    np.testing.assert_allclose(features.values, reference_features(shuffled, windows.data), rtol=1e-9,
+                               equal_nan=True)
+
+
+@pytest.mark.parametrize("selected", [("F1",), ("F8", "F17"), ("F20", "F22", "F24"), ("F2", "F10", "F16", "F17")])
+def test_selected_features_match_all_features(windows, selected):
+    components = compute_components(windows, "alt1")
+    all_features = compute_features(components, windows)
+    func = FeatureFunc(features=selected)
+    func.set_input(components, windows)
+    result = func.execute()
+    assert tuple(result.data.columns) == selected
+    assert set(result.units) == {*selected, *components.data.index.names}
+    pd.testing.assert_frame_equal(result.data, all_features[list(selected)])
+
+
+def test_features_definition(windows):
+    import quantities as pq
+    import openmnglab.datamodel.pandas.schemas as schema
+    from openmnglab.functions.analysis.spdf_components import SPDFComponents
+    from openmnglab.functions.analysis.spdf_features import SPDFFeatures
+    from openmnglab.functions.processing.static_intervals import StaticIntervals
+    from openmnglab.functions.processing.windows import Windows
+
+    intervals_schema = StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows").output_for(schema.sorted_spikes())
+    windows_schema = Windows(0, 1, 2).output_for(intervals_schema, schema.float_timeseries(schema.SIGNAL))
+    components_schema = SPDFComponents().output_for(windows_schema)
+    definition = SPDFFeatures(features=["F24", "F1"], dtype=np.float32)
+    assert definition.config_hash != SPDFFeatures(features=["F24", "F1"]).config_hash
+    assert definition.config_hash == SPDFFeatures(features=["F1", "F24"], dtype="float32").config_hash
+    output_schema = definition.output_for(components_schema, windows_schema)
+    assert tuple(output_schema.pandera_schema.columns) == ("F1", "F24")
+
+    result = definition.new_function().set_input(compute_components(windows, "alt1"), windows).execute()
+    assert (result.data.dtypes == np.float32).all()
+    assert output_schema.validate(result)
+    with pytest.raises(AssertionError):
+        SPDFFeatures(features=["F25"])
+    with pytest.raises(AssertionError):
+        SPDFFeatures(dtype=np.int32)
@@ -0,0 +1,106 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.chunks import CODECS, ChunkedArray, decode, encode, filters_for
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer, SignalContainer
+from openmnglab.datamodel.pandas.store import MANIFEST, RecordingStore, write_store, find_stores
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+from openmnglab.functions.input.readers.native_store_reader import NativeStoreReader
+from openmnglab.functions.processing.funcs.windows import WindowsFunc
+
+
+@pytest.fixture(scope="module")
+def outputs(recording, tracks):
+    time_base = RegularTimeBase.from_segments([700, 1300], [0., 0.2], [1e-4, 2e-4], name=schema.TIMESTAMP)
+    raw = np.arange(len(time_base), dtype=np.int16)
+    signal = SignalContainer(raw, time_base, schema.MASS, {schema.MASS: pq.g, schema.TIMESTAMP: pq.s}, 0.5, 1.)
+    comments = PandasContainer(pd.Series(["start", "stimulus changed"], name=schema.COMMENT,
+                                         index=pd.Index([0.5, 1.25], name=schema.TIMESTAMP)),
+                               {schema.COMMENT: pq.dimensionless, schema.TIMESTAMP: pq.s})
+    containers = (recording, signal, tracks, comments, None)
+    schemas = (schema.float_timeseries(schema.SIGNAL), schema.float_timeseries(schema.MASS), schema.sorted_spikes(),
+               schema.str_eventseries(schema.COMMENT), schema.str_eventseries("unused"))
+    return containers, schemas
+
+
+@pytest.fixture(scope="module", params=[None, "zlib"])
+def store(request, tmp_path_factory, outputs):
+    return write_store(tmp_path_factory.mktemp("stores") / "recording", *outputs, source="recording.dps",
+                       chunk_size=500, compression=request.param)
+
+
+def test_round_trip(store, outputs):
+    containers, schemas = outputs
+    loaded = RecordingStore(store).load()
+    assert isinstance(loaded[0], ContinuousContainer) and isinstance(loaded[1], SignalContainer)
+    assert isinstance(loaded[1].time_index, RegularTimeBase)
+    assert loaded[-1] is None
+    for container, loaded_container, data_schema in zip(containers[:-1], loaded, schemas):
+        pd.testing.assert_series_equal(loaded_container.data, container.data, check_exact=True)
+        assert data_schema.validate(loaded_container)
+    assert list(find_stores(store.parent)) == [store]
+
+
+@pytest.mark.parametrize("start, end", [(0.0123, 0.5), (0.05, 0.0699), (0.2, 0.35), (-1., 0.001), (2.5, np.inf)])
+def test_time_range(store, outputs, start, end):
+    containers, _ = outputs
+    loaded = RecordingStore(store).load(start, end)
+    for container, loaded_container in zip(containers[:2], loaded):
+        pd.testing.assert_series_equal(loaded_container.data, container.data.loc[start:end], check_exact=True)
+    spikes = containers[2].data
+    pd.testing.assert_series_equal(loaded[2].data, spikes[(spikes >= start) & (spikes <= end)])
+    comments = containers[3].data
+    pd.testing.assert_series_equal(loaded[3].data, comments.loc[start:end])
+
+
+def test_reader_definition(store, outputs):
+    _, schemas = outputs
+    definition = NativeStoreReader(store, start=0.1, end=0.2)
+    for produced, data_schema in zip(definition.produces, schemas):
+        assert produced.pandera_schema.name == data_schema.pandera_schema.name
+        assert str(produced.pandera_schema.dtype) == str(data_schema.pandera_schema.dtype)
+    assert definition.config_hash != NativeStoreReader(store).config_hash
+    func = definition.new_function()
+    func.set_input()
+    signal = func.execute()[0]
+    assert signal.times()[0] >= 0.1 and signal.times()[-1] <= 0.2
+
+
+@pytest.mark.parametrize("codec", list(CODECS))
+@pytest.mark.parametrize("values", [np.arange(-300, 300, 7, dtype=np.int16), np.linspace(0, 1, 100),
+                                    np.array([np.iinfo(np.int32).min, np.iinfo(np.int32).max, 0], dtype=np.int32),
+                                    np.empty(0, dtype=np.float32)])
+def test_codecs_are_lossless(codec, values):
+    decoded = decode(encode(values, codec, filters_for(values.dtype)), values.dtype, codec, filters_for(values.dtype))
+    assert decoded.dtype == values.dtype
+    np.testing.assert_array_equal(decoded, values)
+
+
+def test_compressed_windows_decompress_touched_chunks(tmp_path, recording, intervals):
+    store = write_store(tmp_path / "recording", (recording,), (schema.float_timeseries(schema.SIGNAL),),
+                        chunk_size=1000, compression="zlib")
+    signal = RecordingStore(store, threads=2).load_output(0, 0.01, 0.2)
+    assert isinstance(signal._values, ChunkedArray)
+    pd.testing.assert_series_equal(pd.Series(signal.samples(500, 2500), name=schema.SIGNAL),
+                                   pd.Series(recording.data.loc[0.01:0.2].values[500:2500], name=schema.SIGNAL))
+    assert set(signal._values._cache) == {0, 1, 2}
+    func = WindowsFunc((0, 1), derivatives=True, derivative_change=pq.ms)
+    func.set_input(intervals, RecordingStore(store).load_output(0))
+    expected = WindowsFunc((0, 1), derivatives=True, derivative_change=pq.ms)
+    expected.set_input(intervals, recording)
+    pd.testing.assert_frame_equal(func.execute().data, expected.execute().data, check_exact=True)
+
+
+@pytest.mark.parametrize("compression, version", [(None, 1), ("zlib", 2)])
+def test_version_is_only_bumped_by_compression(tmp_path, recording, compression, version):
+    store = write_store(tmp_path / "recording", (recording,), (schema.float_timeseries(schema.SIGNAL),),
+                        compression=compression)
+    with open(store / MANIFEST) as manifest_file:
+        assert json.load(manifest_file)["version"] == version
+    pd.testing.assert_series_equal(RecordingStore(store).load_output(0).data, recording.data)
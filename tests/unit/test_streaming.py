@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.slicing import EventSlicer, slice_events
+from openmnglab.datamodel.pandas.store import write_store
+from openmnglab.execution import SingleThreadedExecutor, StreamingExecutor
+from openmnglab.functions.analysis.spdf_components import SPDFComponents
+from openmnglab.functions.analysis.spdf_features import SPDFFeatures
+from openmnglab.functions.input.readers.native_store_reader import NativeStoreReader
+from openmnglab.functions.processing.static_intervals import StaticIntervals
+from openmnglab.functions.processing.windows import Windows
+from openmnglab.planning import DefaultPlanner
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory, recording, tracks):
+    # spikes grouped by their track like DAPSYS loads them, so they are not in the order of their timestamps
+    grouped = PandasContainer(tracks.data.sort_index(level=schema.TRACK, sort_remaining=False), tracks.units)
+    return write_store(tmp_path_factory.mktemp("streaming") / "recording", (recording, grouped),
+                       (schema.float_timeseries(schema.SIGNAL), schema.sorted_spikes()), chunk_size=4096)
+
+
+def plan(store, arrays=False):
+    planner = DefaultPlanner()
+    signal, tracks = planner.add_source(NativeStoreReader(store))
+    intervals = planner.add_stage(StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows", arrays=arrays), tracks)
+    windows = planner.add_stage(Windows(0, 1, 2, derivative_base=pq.ms, interval=1e-4, arrays=arrays), intervals, signal)
+    components = planner.add_stage(SPDFComponents(arrays=arrays), windows)
+    features = planner.add_stage(SPDFFeatures(arrays=arrays), components, windows)
+    return planner.get_plan(), windows, features
+
+
+@pytest.mark.parametrize("arrays", [False, True])
+@pytest.mark.parametrize("chunk_duration", [0.1, 0.37, 10.])
+def test_streaming_matches_full_execution(store, arrays, chunk_duration):
+    execution_plan, windows, features = plan(store, arrays=arrays)
+    expected = SingleThreadedExecutor()
+    expected.execute(execution_plan)
+    streaming = StreamingExecutor(chunk_duration, overlap=0.01)
+    streaming.execute(execution_plan)
+    pd.testing.assert_frame_equal(streaming.get(features).data,
+                                  expected.get(features).data, check_exact=True)
+    # the windows are only consumed by other chunked stages
+    assert not streaming.has_computed(windows)
+    streaming.execute(execution_plan)
+    assert not streaming.has_computed(windows)
+
+
+def test_streaming_keeps_outputs_of_non_chunkable_consumers(store):
+    planner = DefaultPlanner()
+    signal, tracks = planner.add_source(NativeStoreReader(store))
+    intervals = planner.add_stage(StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows"), tracks)
+    windows = planner.add_stage(Windows(0, derivative_base=pq.ms, interval=1e-4), intervals, signal)
+    executor = StreamingExecutor(0.5, overlap=0.01)
+    executor.execute(planner.get_plan())
+    expected = SingleThreadedExecutor()
+    expected.execute(planner.get_plan())
+    pd.testing.assert_frame_equal(executor.get(windows).data, expected.get(windows).data,
+                                  check_exact=True)
+
+
+def test_event_slicer_matches_masks(tracks):
+    grouped = PandasContainer(tracks.data.sort_index(level=schema.TRACK, sort_remaining=False), tracks.units)
+    slicer = EventSlicer(grouped)
+    times = grouped.data.values
+    for start, end in ((0., 0.5), (0.5, 1.), (1., np.inf)):
+        expected = grouped.data[(times >= start) & (times < end)]
+        pd.testing.assert_series_equal(slicer.slice(start, end, closed="left").data, expected)
+        assert len(slice_events(grouped, start, end, closed="left").data) == len(expected)
+
+
+def test_streaming_rejects_overlap_smaller_than_windows(store):
+    execution_plan, _, _ = plan(store)
+    with pytest.raises(ValueError, match="overlap"):
+        StreamingExecutor(0.1, overlap=0.002).execute(execution_plan)
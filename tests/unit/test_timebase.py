@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+from openmnglab.functions.helpers.general import get_interval_locs
+from openmnglab.functions.processing.funcs.windows import WindowsFunc
+
+# three pages, the last one after a gap and with a different sampling interval
+PAGES = dict(lengths=[12000, 9000, 14000], starts=[0.0, 1.2, 2.5], intervals=[1e-4, 1e-4, 5e-5])
+
+
+@pytest.fixture(scope="module")
+def time_base():
+    return RegularTimeBase.from_segments(**PAGES, name=schema.TIMESTAMP)
+
+
+def test_materializes_page_timestamps(time_base):
+    expected = np.concatenate([start + np.arange(n) * interval for n, start, interval in
+                               zip(PAGES["lengths"], PAGES["starts"], PAGES["intervals"])])
+    index = time_base.to_index()
+    np.testing.assert_array_equal(index.values, expected)
+    assert index.name == schema.TIMESTAMP
+    assert time_base[-1] == expected[-1] and time_base[12000] == expected[12000]
+    np.testing.assert_array_equal(time_base.timestamps(11990, 12010), expected[11990:12010])
+
+
+def test_slice_locs_match_index(time_base):
+    index = time_base.to_index()
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.uniform(-0.1, 3.3, 500), index.values[rng.integers(0, len(index), 500)],
+                             [2.1, 2.5, 1.2, 0.0]])
+    for value in values:
+        assert time_base.slice_locs(value, value) == index.slice_locs(value, value)
+
+
+def test_interval_locs_match_index(time_base):
+    index = time_base.to_index()
+    for left, right in ((0.1, 0.1005), (1.19995, 1.2003), (2.0, 2.6), (2.50001, 2.5002)):
+        for closed in ("left", "right", "both", "neither"):
+            interval = pd.Interval(left, right, closed=closed)
+            assert get_interval_locs(interval, time_base) == get_interval_locs(interval, index)
+
+
+def test_windows_on_time_base(time_base, intervals):
+    values = np.random.default_rng(1).normal(0, 0.05, len(time_base))
+    units = {schema.SIGNAL: pq.V, schema.TIMESTAMP: pq.s}
+    lazy = ContinuousContainer(values, time_base, schema.SIGNAL, units)
+    dense = PandasContainer(pd.Series(values, index=time_base.to_index(), name=schema.SIGNAL), units)
+    assert schema.float_timeseries(schema.SIGNAL).validate(lazy)
+    for use_time_offsets in (True, False):
+        results = []
+        for recording in (lazy, dense):
+            func = WindowsFunc((0, 1, 2), derivatives=True, derivative_change=pq.ms, use_time_offsets=use_time_offsets)
+            func.set_input(intervals, recording)
+            results.append(func.execute().data)
+        pd.testing.assert_frame_equal(results[0], results[1], check_exact=True)
+    assert lazy._data is None
+
+
+def test_slice_keeps_timestamps(time_base):
+    index = time_base.to_index()
+    for start, stop in ((0, 100), (11990, 12010), (15000, 30000), (20999, None), (5, 5)):
+        sliced = time_base.slice(start, stop)
+        np.testing.assert_array_equal(sliced.timestamps(), index.values[start:stop])
+        values = index.values[start:stop]
+        if len(values) > 0:
+            for value in (values[0], values[len(values) // 2], values[-1] + 1e-6, values[0] - 1e-6):
+                assert sliced.slice_locs(value, value) == pd.Index(values).slice_locs(value, value)
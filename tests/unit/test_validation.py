@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+import openmnglab.datamodel.pandas.schemas as schema
+from openmnglab.datamodel.exceptions import DataSchemaConformityError
+from openmnglab.datamodel.pandas.model import PandasContainer
+from openmnglab.datamodel.pandas.signal import ContinuousContainer
+from openmnglab.datamodel.pandas.timebase import RegularTimeBase
+from openmnglab.execution import SingleThreadedExecutor, ValidationLevel
+from openmnglab.functions.processing.static_intervals import StaticIntervals
+from openmnglab.functions.processing.windows import Windows
+from openmnglab.util.pandas import encode_labels
+
+
+@pytest.fixture(scope="module")
+def windows_schema():
+    intervals_schema = StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows").output_for(schema.sorted_spikes())
+    return Windows(0, 1, 2, derivative_base=pq.ms).output_for(intervals_schema, schema.float_timeseries(schema.SIGNAL))
+
+
+def validators(sample_size=100):
+    return (lambda s, c: s.validate(c), lambda s, c: s.validate_structure(c),
+            lambda s, c: s.validate_sampled(c, sample_size))
+
+
+@pytest.mark.parametrize("validate", validators())
+def test_valid_outputs_pass(validate, windows, windows_schema, recording, intervals):
+    assert validate(windows_schema, windows)
+    assert validate(schema.float_timeseries(schema.SIGNAL), recording)
+    assert validate(StaticIntervals(-2 * pq.ms, 3 * pq.ms, "spike_windows").output_for(schema.sorted_spikes()),
+                    intervals)
+
+
+@pytest.mark.parametrize("validate", validators())
+def test_structural_errors_fail(validate, windows, windows_schema, recording):
+    renamed = PandasContainer(recording.data.rename("other"), {**recording.units, "other": pq.V})
+    wrong_dtype = PandasContainer(recording.data.astype(np.float32), recording.units)
+    missing_column = PandasContainer(windows.data.drop(columns=windows.data.columns[-1]), windows.units)
+    wrong_index = PandasContainer(windows.data.droplevel(0), windows.units)
+    for container, data_schema in ((renamed, schema.float_timeseries(schema.SIGNAL)),
+                                   (wrong_dtype, schema.float_timeseries(schema.SIGNAL)),
+                                   (missing_column, windows_schema), (wrong_index, windows_schema)):
+        with pytest.raises(DataSchemaConformityError):
+            validate(data_schema, container)
+
+
+def test_structural_does_not_scan_data(recording):
+    with_nan = recording.data.copy()
+    with_nan.iloc[len(with_nan) // 2] = np.nan
+    container = PandasContainer(with_nan, recording.units)
+    float_schema = schema.float_timeseries(schema.SIGNAL)
+    assert float_schema.validate_structure(container)
+    assert float_schema.validate_sampled(container, 10)
+    with pytest.raises(DataSchemaConformityError):
+        float_schema.validate(container)
+    with pytest.raises(DataSchemaConformityError):
+        float_schema.validate_sampled(container, len(with_nan))
+
+
+def test_structural_keeps_continuous_data_lazy():
+    time_base = RegularTimeBase.regular(0., 1e-4, 10 ** 7, name=schema.TIMESTAMP)
+    container = ContinuousContainer(np.broadcast_to(np.zeros(1), len(time_base)), time_base, schema.SIGNAL,
+                                    {schema.SIGNAL: pq.V, schema.TIMESTAMP: pq.s})
+    assert schema.float_timeseries(schema.SIGNAL).validate_structure(container)
+    assert container._data is None
+
+
+@pytest.mark.parametrize("regular", [True, False], ids=["time base", "index"])
+def test_continuous_nan_fails(regular):
+    time_base = RegularTimeBase.regular(0., 1e-4, 1000, name=schema.TIMESTAMP)
+    values = np.zeros(len(time_base))
+    values[500] = np.nan
+    container = ContinuousContainer(values, time_base if regular else time_base.to_index(), schema.SIGNAL,
+                                    {schema.SIGNAL: pq.V, schema.TIMESTAMP: pq.s})
+    float_schema = schema.float_timeseries(schema.SIGNAL)
+    assert float_schema.validate_structure(container)
+    with pytest.raises(DataSchemaConformityError):
+        float_schema.validate(container)
+    with pytest.raises(DataSchemaConformityError):
+        float_schema.validate_sampled(container, len(values))
+    assert container._data is None
+
+
+def test_executor_validation_level():
+    assert SingleThreadedExecutor().validation is ValidationLevel.STRUCTURAL
+    assert SingleThreadedExecutor(validation="full").validation is ValidationLevel.FULL
+
+
+def test_categorical_track_level(tracks):
+    spikes_schema = schema.sorted_spikes()
+    assert spikes_schema.validate_structure(tracks) and spikes_schema.validate(tracks)
+    labels = encode_labels(iter(["b", "a", "b", "b"]), 4)
+    assert list(labels.categories) == ["b", "a"]
+    np.testing.assert_array_equal(labels.codes, [0, 1, 0, 0])
+    for dtype in (object, "string"):
+        str_levels = tracks.data.copy()
+        str_levels.index = str_levels.index.set_levels(str_levels.index.levels[1].astype(dtype), level=1)
+        str_tracks = PandasContainer(str_levels, tracks.units)
+        assert spikes_schema.validate_structure(str_tracks) and spikes_schema.validate(str_tracks)
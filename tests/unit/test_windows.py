@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+import quantities as pq
+
+from openmnglab.functions.processing.funcs.static_intervals import StaticIntervalsFunc
+from openmnglab.functions.processing.funcs.static_windows import StaticWindowsFunc
+from openmnglab.functions.processing.funcs.windows import window_positions, offset_timestamps, extend_multiindex, \
+    build_window_index, WindowsFunc
+
+
+@pytest.fixture
+def ranges():
+    return np.array([[0, 4, 5, 30], [3, 5, 9, 31]])
+
+
+def test_window_positions(ranges):
+    expected = np.concatenate([np.arange(start, stop) for start, stop in ranges.T])
+    np.testing.assert_array_equal(window_positions(ranges[0], ranges[1] - ranges[0]), expected)
+
+
+def test_window_positions_empty_windows():
+    np.testing.assert_array_equal(window_positions(np.array([2, 7, 7]), np.array([0, 2, 0])), [7, 8])
+    assert len(window_positions(np.empty(0, dtype=int), np.empty(0, dtype=int))) == 0
+
+
+def test_offset_timestamps(ranges):
+    timestamps = np.sort(np.random.default_rng(0).random(40))
+    expected = np.concatenate([timestamps[start:stop] - timestamps[start] for start, stop in ranges.T])
+    np.testing.assert_array_equal(offset_timestamps(timestamps, ranges), expected)
+
+
+def test_extend_multiindex(ranges):
+    level_codes, positions = extend_multiindex([np.array([3, 2, 1, 0], dtype=np.int8)], ranges)
+    np.testing.assert_array_equal(level_codes, [3, 3, 3, 2, 1, 1, 1, 1, 0])
+    assert level_codes.dtype == np.int8
+    np.testing.assert_array_equal(positions, [0, 1, 2, 4, 5, 6, 7, 8, 30])
+
+
+@pytest.mark.parametrize("use_time_offsets", [True, False])
+def test_build_window_index(ranges, use_time_offsets):
+    recording_index = pd.Index(np.arange(40) * 0.5, name="timestamp")
+    intervals_index = pd.MultiIndex.from_arrays([[0, 1, 2, 3], ["a", "b", "a", "b"]], names=["stimulus", "track"])
+    index = build_window_index(intervals_index, ranges, recording_index, use_time_offsets=use_time_offsets)
+    expected = pd.MultiIndex.from_tuples(
+        [(*intervals_index[i], (pos - start if use_time_offsets else pos) * 0.5)
+         for i, (start, stop) in enumerate(ranges.T) for pos in range(start, stop)],
+        names=["stimulus", "track", "timestamp"])
+    assert index.equals(expected)
+    assert list(index.names) == list(expected.names)
+
+
+@pytest.mark.parametrize("closed", ["right", "left", "both", "neither"])
+@pytest.mark.parametrize("arrays", [False, True], ids=["pandas", "arrays"])
+def test_static_windows_match_intervals_and_windows(tracks, recording, closed, arrays):
+    intervals = StaticIntervalsFunc(-2 * pq.ms, 3 * pq.ms, "spike_windows", closed=closed)
+    intervals.set_input(tracks)
+    windows = WindowsFunc((0, 1, 2), derivatives=True, derivative_change=pq.ms, arrays=arrays)
+    windows.set_input(intervals.execute(), recording)
+    fused = StaticWindowsFunc(-2 * pq.ms, 3 * pq.ms, (0, 1, 2), derivatives=True, derivative_change=pq.ms,
+                              arrays=arrays, closed=closed)
+    fused.set_input(tracks, recording)
+    expected, actual = windows.execute(), fused.execute()
+    pd.testing.assert_frame_equal(actual.data, expected.data)
+    assert actual.units == expected.units
+
+
+def test_derivatives_of_window_at_first_sample(tracks, recording):
+    # the overhang before the first sample has no time deltas, which must not fail the compiled kernels
+    cropped = recording.data.loc[0.1:]
+    spikes = tracks.data.iloc[:1].copy()
+    spikes.iloc[0] = 0.10027
+    intervals = StaticIntervalsFunc(-2 * pq.ms, 3 * pq.ms, "spike_windows")
+    intervals.set_input(type(tracks)(spikes, tracks.units))
+    windows = WindowsFunc((0, 1, 2), derivatives=True, derivative_change=pq.ms)
+    windows.set_input(intervals.execute(), type(recording)(cropped, recording.units))
+    result = windows.execute().data
+    assert result.index.get_level_values(-1)[0] == 0
+    np.testing.assert_array_equal(result.iloc[:, 0].values, cropped.values[:len(result)])